@@ -0,0 +1 @@
+"""Offline benchmarks. Run from the repo root, e.g. ``python -m benchmarks.tts_warm``."""
@@ -0,0 +1,67 @@
+"""Compose time for the stream-copy path vs the re-encode path, side by side.
+
+    python -m benchmarks.compose_paths --seconds 10 --audio-seconds 12
+
+Needs ffmpeg and ffprobe on PATH.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from src.utils.executors import shutdown_executors
+from src.video_editor import VideoEditor
+
+
+def make_inputs(directory: Path, seconds: float, audio_seconds: float):
+    video = directory / 'clip.mp4'
+    audio = directory / 'voice.wav'
+    subprocess.run([
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'testsrc2=size=1080x1920:rate=30:duration={seconds}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p', str(video)
+    ], check=True)
+    subprocess.run([
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'sine=frequency=220:sample_rate=48000:duration={audio_seconds}',
+        str(audio)
+    ], check=True)
+    return video, audio
+
+
+async def run(video, audio):
+    editor = VideoEditor({})
+    timings = {}
+    for mode in ('copy', 'encode'):
+        final = await editor.compose(video, audio, '', mode=mode)
+        timings[mode] = (editor.timings['seconds'], final)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--audio-seconds', type=float, default=12)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp())
+    os.chdir(directory)
+    video, audio = make_inputs(directory, args.seconds, args.audio_seconds)
+    try:
+        timings = asyncio.run(run(video, audio))
+    finally:
+        shutdown_executors()
+
+    copy, encode = timings['copy'][0], timings['encode'][0]
+    print(f'copy: {copy:.2f}s   encode: {encode:.2f}s   speed-up: {encode / copy:.1f}x')
+    for mode, (_, final) in timings.items():
+        probe = subprocess.run(['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                                '-of', 'csv=p=0', str(final)], capture_output=True, text=True)
+        print(f'{mode:>6}: {final} ({float(probe.stdout):.2f}s long)')
+
+
+if __name__ == '__main__':
+    main()
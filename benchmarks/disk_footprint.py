@@ -0,0 +1,69 @@
+"""Disk used by output/ over a long run, with and without output retention.
+
+    python -m benchmarks.disk_footprint --videos 8 --budget-mb 40
+
+Each setup makes ``--videos`` videos end to end (fake Ollama, tone stand-in
+TTS, piped placeholder frames at a small size) and prints the size of
+output/ after every video. With retention on, the budget is enforced after
+each video (no grace period), so usage should level off instead of growing.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+
+from src.pipeline import ContentPipeline
+from src.utils.outputs import OutputStore
+from src.voice_synthesis.engine import get_engine
+
+from .fake_servers import FakeOllama
+from .standins import tone_loader
+from .streaming_tts import SCRIPT
+
+
+async def run(config, videos):
+    usage = []
+    async with ContentPipeline(config) as pipeline:
+        for i in range(videos):
+            if await pipeline.generate_video(f'космос #{i}', duration=45) is None:
+                raise RuntimeError('video failed')
+            usage.append(sum(OutputStore(config).usage().values()))
+    return usage
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--videos', '-n', type=int, default=8)
+    parser.add_argument('--budget-mb', type=float, default=40)
+    parser.add_argument('--script-chars', type=int, default=200, help='script length, sets the video length')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    get_engine('ru', 'standin', loader=tone_loader(0.0))
+    rows = {}
+    with FakeOllama(latency=0.0, response=SCRIPT[:args.script_chars]) as ollama:
+        for name, budget in (('unbounded', 1e9), ('retention', args.budget_mb)):
+            os.chdir(tempfile.mkdtemp(prefix='bench-disk-'))
+            config = {
+                'ollama_host': ollama.url,
+                'ollama_model': 'fake',
+                'silero_model': 'standin',
+                'video_api_provider': 'placeholder',
+                'cache_enabled': False,
+                'http2': False,
+                'video': {'resolution': {'width': 270, 'height': 480}, 'fps': 30},
+                'output_max_mb': budget,
+                'output_gc_interval': 0,
+                'output_grace': 0
+            }
+            rows[name] = asyncio.run(run(config, args.videos))
+
+    print(f'{"video":<7}' + ''.join(f'{name:>12}' for name in rows) + '   (MB in output/)')
+    for i in range(args.videos):
+        print(f'{i + 1:<7}' + ''.join(f'{usage[i] / 2**20:>12.1f}' for usage in rows.values()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Buffered (requests.get().content) vs streamed, resumable download of a large output file.
+
+Each mode runs in its own process so peak RSS is measured independently.
+
+    python -m benchmarks.download --size-mb 200 --drop-after-mb 50
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .fake_servers import FakeFileServer
+
+
+def _peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def buffered(url: str, dest: Path):
+    import requests
+    response = requests.get(url)
+    dest.write_bytes(response.content)
+
+
+def streamed(url: str, dest: Path, sha256: str):
+    from src.utils.download import download
+    from src.utils.executors import shutdown_executors
+    from src.utils.http import create_http_client
+
+    async def run():
+        client = create_http_client({'http2': False})
+        try:
+            await download(client, url, dest, sha256=sha256, backoff=0.05)
+        finally:
+            await client.aclose()
+
+    try:
+        asyncio.run(run())
+    finally:
+        shutdown_executors()
+
+
+def child(mode: str, url: str, dest: str, sha256: str):
+    baseline = _peak_rss_mib()
+    start = time.perf_counter()
+    if mode == 'buffered':
+        buffered(url, Path(dest))
+    else:
+        streamed(url, Path(dest), sha256)
+    print(json.dumps({
+        'seconds': time.perf_counter() - start,
+        'peak_rss_mib': _peak_rss_mib(),
+        'baseline_rss_mib': baseline
+    }))
+
+
+def sha256_of(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=200)
+    parser.add_argument('--drop-after-mb', type=int, default=0,
+                        help='cut the first streamed response after this many MB to exercise resume')
+    parser.add_argument('--child', nargs=4, metavar=('MODE', 'URL', 'DEST', 'SHA256'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = Path(directory) / 'source.mp4'
+        with open(source, 'wb') as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1 << 20))
+        checksum = sha256_of(source)
+
+        for mode in ('buffered', 'streamed'):
+            drops = 1 if mode == 'streamed' and args.drop_after_mb else 0
+            with FakeFileServer(source, drop_first=drops, drop_after=args.drop_after_mb * 2**20) as server:
+                dest = Path(directory) / f'{mode}.mp4'
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.download', '--child',
+                     mode, f'{server.url}/video.mp4', str(dest), checksum],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                stats = json.loads(output.strip().splitlines()[-1])
+                requests_made, ranged = server.stats['requests'], server.stats.get('range_requests', 0)
+
+            intact = sha256_of(dest) == checksum
+            print(f'{mode:>8}: {stats["seconds"]:.2f}s, peak RSS {stats["peak_rss_mib"]:.0f} MiB '
+                  f'(+{stats["peak_rss_mib"] - stats["baseline_rss_mib"]:.0f} MiB over imports), '
+                  f'{requests_made} request(s), {ranged} ranged, checksum {"ok" if intact else "MISMATCH"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Fact pool vs one LLM call per video, against the fake Ollama.
+
+The fake answers fact batches with generated facts, ``--repeat-rate`` of them
+reworded copies of earlier ones (upper-cased, a word dropped). Two setups draw
+the same number of facts:
+
+- single: batch of 1, no dedupe (what FactGenerator did before the pool)
+- pool: batches of ``--batch-size`` with the MinHash index dropping repeats
+
+    python -m benchmarks.fact_pool --videos 60 --topics 3 --repeat-rate 0.2
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from src.fact_generator import FactGenerator
+from src.fact_generator.pool import FactPool
+from src.utils.http import create_http_client
+
+from .fake_servers import FakeOllama
+
+TOPICS = ['космос', 'океан', 'животные', 'история', 'природа']
+
+
+async def draw(config, videos, topics):
+    client = create_http_client(config)
+    try:
+        generator = FactGenerator(config, client=client, pool=FactPool(config))
+        facts = []
+        start = time.perf_counter()
+        for i in range(videos):
+            facts.append(await generator.generate(topics[i % len(topics)]))
+        return facts, time.perf_counter() - start, generator.pool.stats()
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--videos', '-n', type=int, default=60)
+    parser.add_argument('--topics', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--repeat-rate', type=float, default=0.2, help='share of reworded repeats in LLM replies')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='seconds per LLM call')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    topics = TOPICS[:args.topics]
+    setups = {
+        'single': {'fact_batch_size': 1, 'fact_dedupe_threshold': 1.01},
+        'pool': {'fact_batch_size': args.batch_size, 'fact_dedupe_threshold': 0.5}
+    }
+
+    print(f'{"setup":<8}{"facts":>7}{"LLM calls":>11}{"per video":>11}{"dropped":>9}{"leaked":>8}{"s/fact":>8}')
+    for name, overrides in setups.items():
+        with tempfile.TemporaryDirectory(prefix='bench-facts-') as workdir, \
+                FakeOllama(latency=args.llm_latency, repeat_rate=args.repeat_rate) as ollama:
+            # A batch of 1 can only repeat across calls; the fake decides per fact either way
+            ollama.batch_size = overrides['fact_batch_size']
+            config = {
+                'ollama_host': ollama.url,
+                'ollama_model': 'fake',
+                'fact_pool_db': str(Path(workdir) / 'facts.db'),
+                'http2': False,
+                **overrides
+            }
+            facts, elapsed, stats = asyncio.run(draw(config, args.videos, topics))
+            got = [fact for fact in facts if fact]
+            # The fake marks its reworded repeats by shouting them
+            leaked = sum(1 for fact in got if fact.endswith('!'))
+            print(f'{name:<8}{len(got):>7}{stats["llm_calls"]:>11}{stats["llm_calls_per_video"] or 0:>11.2f}'
+                  f'{stats["duplicate_rate"]:>9.0%}{leaked:>8}{elapsed / max(len(got), 1):>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+"""Local stand-ins for the HTTP services the pipeline talks to."""
+
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FACT = ('Осьминоги имеют три сердца и голубую кровь. Два сердца качают кровь через жабры, '
+        'а третье — по всему телу.')
+
+_SUBJECTS = ['Осьминоги', 'Медузы', 'Пчёлы', 'Вороны', 'Кометы', 'Вулканы', 'Ледники', 'Кораллы',
+             'Муравьи', 'Дельфины', 'Кальмары', 'Сурикаты', 'Астероиды', 'Гейзеры', 'Лишайники', 'Совы']
+_CLAIMS = ['живут дольше, чем думали учёные', 'видят ультрафиолет', 'меняют цвет за секунды',
+           'выдерживают давление океанских глубин', 'общаются с помощью вибраций', 'светятся в темноте',
+           'путешествуют на тысячи километров', 'запоминают лица людей', 'спят с открытыми глазами',
+           'переживают заморозку', 'строят сложные подземные города', 'ориентируются по магнитному полю']
+_DETAILS = ['Это выяснили в {year} году.', 'Рекорд составляет {n} километров.', 'Их насчитывают около {n} видов.',
+            'Эксперимент длился {n} дней.', 'Учёные наблюдали {n} особей.', 'Первое описание появилось в {year} году.']
+
+
+def _words(text: str):
+    return text.split()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.fake.count('connections')
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeServer:
+    handler_class = _Handler
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.stats = {'connections': 0, 'requests': 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self.handler_class)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _OllamaHandler(_Handler):
+    def do_POST(self):
+        fake = self.server.fake
+        fake.count('requests')
+        if self.path != '/api/generate':
+            self.send_json({'error': 'not found'}, status=404)
+            return
+        request = self.read_json()
+        timings = fake.prepare(request)
+        if not request.get('prompt'):
+            # A prompt-less request only loads the model
+            fake.loaded(request)
+            self.send_json({'model': request.get('model'), 'response': '', 'done': True, 'done_reason': 'load'})
+            return
+        fake.work(fake.latency)
+        if request.get('format') == 'json':
+            for _ in fake.tokens():
+                pass
+            response = json.dumps({'facts': fake.facts()}, ensure_ascii=False)
+            self.send_json({'model': request.get('model'), 'response': response, 'done': True,
+                            **fake.finish(request, response), **timings})
+            return
+        if not request.get('stream', True):
+            for _ in fake.tokens():
+                pass
+            self.send_json({'model': request.get('model'), 'response': fake.response, 'done': True,
+                            **fake.finish(request, fake.response), **timings})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for token in fake.tokens():
+            self.send_chunk({'model': request.get('model'), 'response': token, 'done': False})
+        self.send_chunk({'model': request.get('model'), 'response': '', 'done': True,
+                         **fake.finish(request, fake.response), **timings})
+        self.wfile.write(b'0\r\n\r\n')
+
+    def send_chunk(self, payload):
+        line = json.dumps(payload, ensure_ascii=False).encode() + b'\n'
+        self.wfile.write(f'{len(line):x}\r\n'.encode() + line + b'\r\n')
+        self.wfile.flush()
+
+
+class FakeOllama(FakeServer):
+    """Ollama-compatible ``/api/generate`` with a fixed response.
+
+    ``latency`` is paid before the first byte; with ``stream`` the response is
+    sent as NDJSON, one word-token every ``token_delay`` seconds (the
+    non-streaming reply waits for the same total generation time).
+
+    JSON-format requests (fact batches) get ``batch_size`` generated facts,
+    ``repeat_rate`` of them lightly reworded copies of facts sent earlier.
+
+    With ``capacity`` the ``latency`` is work shared by the requests in
+    flight, like one GPU: past ``capacity`` each request gets a smaller share
+    and every extra one costs ``thrash`` of the total rate (KV-cache
+    swapping), so overload lowers throughput instead of just queueing.
+    Requests whose client gave up keep working, as Ollama does once a
+    request has started.
+
+    With ``load_time`` the model has to be loaded first and is unloaded
+    ``keep_alive`` seconds after the last request (the request's own
+    ``keep_alive``, else ``default_keep_alive``). With ``prompt_rate`` every
+    prompt word costs 1 / prompt_rate seconds, except a prefix that matches
+    the ``context`` of the previous reply, which stays cached. Replies carry
+    Ollama's ``context``, ``load_duration`` and ``prompt_eval_*`` fields.
+    """
+
+    handler_class = _OllamaHandler
+
+    def __init__(self, latency: float = 0.0, response: str = FACT, token_delay: float = 0.0,
+                 batch_size: int = 10, repeat_rate: float = 0.0, seed: int = 0,
+                 capacity: int = 0, thrash: float = 0.5, load_time: float = 0.0,
+                 default_keep_alive: float = 300.0, prompt_rate: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.load_time = load_time
+        self.default_keep_alive = default_keep_alive
+        self.prompt_rate = prompt_rate
+        self.loaded_until = 0.0
+        self.cached_context = []
+        self.requests = []
+        self.latency = latency
+        self.capacity = capacity
+        self.thrash = thrash
+        self.active = 0
+        self.response = response
+        self.token_delay = token_delay
+        self.batch_size = batch_size
+        self.repeat_rate = repeat_rate
+        self.sent = []
+        self.repeats_sent = 0
+        self._random = random.Random(seed)
+
+    def facts(self):
+        batch = []
+        with self._lock:
+            for _ in range(self.batch_size):
+                if self.sent and self._random.random() < self.repeat_rate:
+                    # Same fact, different surface: case, punctuation and a dropped word
+                    words = self._random.choice(self.sent).rstrip('.').split(' ')
+                    del words[self._random.randrange(1, len(words))]
+                    batch.append(' '.join(words).upper() + '!')
+                    self.repeats_sent += 1
+                    continue
+                detail = self._random.choice(_DETAILS).format(
+                    year=self._random.randint(1700, 2024), n=self._random.randint(2, 90000)
+                )
+                fact = (f'{self._random.choice(_SUBJECTS)} {self._random.choice(_CLAIMS)}, '
+                        f'а {self._random.choice(_SUBJECTS).lower()} {self._random.choice(_CLAIMS)}. {detail}')
+                self.sent.append(fact)
+                batch.append(fact)
+        return batch
+
+    def prepare(self, request):
+        """Loads the model if needed and processes the prompt; returns Ollama's timing fields."""
+        load = 0.0
+        with self._lock:
+            if self.load_time and time.monotonic() > self.loaded_until:
+                load = self.load_time
+            # Loading holds the model for the whole request
+            self.loaded_until = float('inf')
+            context = request.get('context') or []
+            reused = len(context) if context and context == self.cached_context[:len(context)] else 0
+        time.sleep(load)
+        tokens = len(context) - reused + len(_words(request.get('prompt', '')))
+        prompt_eval = tokens / self.prompt_rate if self.prompt_rate else 0.0
+        time.sleep(prompt_eval)
+        self.requests.append({'load': load, 'prompt_tokens': tokens, 'prompt_eval': prompt_eval,
+                              'context': bool(context)})
+        return {'load_duration': int(load * 1e9), 'prompt_eval_count': tokens,
+                'prompt_eval_duration': int(prompt_eval * 1e9)}
+
+    def loaded(self, request):
+        keep_alive = request.get('keep_alive', self.default_keep_alive)
+        if isinstance(keep_alive, str):
+            value = float(re.sub(r'[a-z]+$', '', keep_alive) or 0)
+            keep_alive = value * {'h': 3600, 'm': 60}.get(keep_alive[-1:], 1)
+        with self._lock:
+            self.loaded_until = float('inf') if keep_alive < 0 else time.monotonic() + keep_alive
+
+    def finish(self, request, response: str):
+        """The reply's context: everything the model has seen, which stays cached until the next request."""
+        self.loaded(request)
+        context = list(request.get('context') or []) + [
+            zlib.crc32(word.encode()) for word in _words(request.get('prompt', '') + ' ' + response)
+        ]
+        with self._lock:
+            self.cached_context = context
+        return {'context': context}
+
+    def work(self, seconds: float, tick: float = 0.01):
+        if not self.capacity:
+            time.sleep(seconds)
+            return
+        with self._lock:
+            self.active += 1
+            self.stats['peak_active'] = max(self.stats.get('peak_active', 0), self.active)
+        try:
+            done = 0.0
+            while done < seconds:
+                time.sleep(tick)
+                active = self.active
+                share = min(1.0, self.capacity / active)
+                done += tick * share / (1 + self.thrash * max(0, active - self.capacity))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def tokens(self):
+        for i, word in enumerate(self.response.split(' ')):
+            time.sleep(self.token_delay)
+            yield word if i == 0 else ' ' + word
+
+
+class _UploadHandler(_Handler):
+    def do_POST(self):
+        fake = self.server.fake
+        fake.count('requests')
+        remaining = int(self.headers.get('Content-Length') or 0)
+        received = 0
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            received += len(chunk)
+            remaining -= len(chunk)
+            # Simulates a bandwidth-limited upload link
+            if fake.bytes_per_second:
+                time.sleep(len(chunk) / fake.bytes_per_second)
+        fake.count('bytes', received)
+
+        if fake.take_failure():
+            self.send_json({'error': 'try again'}, status=503)
+            return
+        time.sleep(fake.latency)
+        self.send_json({'status': 'ok', 'bytes': received})
+
+
+class FakeUpload(FakeServer):
+    """Blotato-like ``/v1/upload`` that drains the body; the first ``fail_first`` requests get a 503."""
+
+    handler_class = _UploadHandler
+
+    def __init__(self, latency: float = 0.0, bytes_per_second: float = 0.0, fail_first: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self.failures_left = fail_first
+
+    def take_failure(self) -> bool:
+        with self._lock:
+            if self.failures_left > 0:
+                self.failures_left -= 1
+                return True
+            return False
+
+
+class _FileHandler(_Handler):
+    def do_GET(self):
+        fake = self.server.fake
+        fake.count('requests')
+        size = fake.path.stat().st_size
+        start = 0
+        match = re.match(r'bytes=(\d+)-', self.headers.get('Range') or '')
+        if match and fake.ranges:
+            start = int(match.group(1))
+            if start >= size:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{size - 1}/{size}')
+            fake.count('range_requests')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(size - start))
+        self.end_headers()
+
+        drop_at = fake.take_drop()
+        sent = 0
+        with open(fake.path, 'rb') as f:
+            f.seek(start)
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+                if drop_at is not None and sent + len(chunk) > drop_at:
+                    # Simulates a connection reset mid-body
+                    self.wfile.write(chunk[:drop_at - sent])
+                    self.close_connection = True
+                    return
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if fake.bytes_per_second:
+                    time.sleep(len(chunk) / fake.bytes_per_second)
+        fake.count('bytes', sent)
+
+
+class FakeFileServer(FakeServer):
+    """Serves one file at any path, with ``Range: bytes=N-`` support.
+
+    The first ``drop_first`` responses are cut off after ``drop_after`` bytes,
+    so clients have to resume.
+    """
+
+    handler_class = _FileHandler
+
+    def __init__(self, path, ranges: bool = True, bytes_per_second: float = 0.0,
+                 drop_first: int = 0, drop_after: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.ranges = ranges
+        self.bytes_per_second = bytes_per_second
+        self.drops_left = drop_first
+        self.drop_after = drop_after
+
+    def take_drop(self):
+        with self._lock:
+            if self.drops_left > 0:
+                self.drops_left -= 1
+                return self.drop_after
+            return None
@@ -0,0 +1,48 @@
+"""Connection reuse of the shared pipeline HTTP client against a local fake Ollama.
+
+    python -m benchmarks.http_reuse --videos 10
+"""
+
+import argparse
+import asyncio
+import time
+
+from src.fact_generator import FactGenerator
+from src.script_writer import ScriptWriter
+from src.utils.http import create_http_client
+
+from .fake_servers import FakeOllama
+
+
+async def run(config, videos, shared):
+    client = create_http_client(config) if shared else None
+    try:
+        fact_gen = FactGenerator(config, client=client)
+        script_writer = ScriptWriter(config, client=client)
+        for _ in range(videos):
+            fact = await fact_gen.generate('космос')
+            await script_writer.write(fact, 45)
+    finally:
+        if client is not None:
+            await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--videos', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    for shared in (False, True):
+        with FakeOllama(latency=args.latency) as server:
+            config = {'ollama_host': server.url, 'ollama_model': 'fake'}
+            start = time.perf_counter()
+            asyncio.run(run(config, args.videos, shared))
+            elapsed = time.perf_counter() - start
+            requests, connections = server.stats['requests'], server.stats['connections']
+            print(f'{"shared" if shared else "per-request":>11}: {requests} requests, '
+                  f'{connections} connections, {requests - connections} reused, {elapsed:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Goodput of the LLM client under overload: fixed vs adaptive concurrency.
+
+A fake Ollama that thrashes past ``--capacity`` requests in flight is called
+by ``--callers`` concurrent fact requests for ``--seconds``. The fixed setup
+lets all of them through (LLM_LIMIT_MIN = LLM_LIMIT_MAX = callers), the
+adaptive one starts at 2 and follows latency. Both use the same per-attempt
+timeout and retries; the circuit breaker is off unless ``--breaker`` is set,
+so only the limit differs.
+
+    python -m benchmarks.llm_goodput --seconds 30 --callers 16 --capacity 4
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from src.utils.http import create_http_client
+from src.utils.llm import LLMClient, LLMError
+
+from .fake_servers import FakeOllama
+
+
+async def run(config, callers, seconds):
+    client = create_http_client(config)
+    llm = LLMClient(config, client)
+    latencies, failures = [], 0
+    end = time.monotonic() + seconds
+
+    async def caller():
+        nonlocal failures
+        while time.monotonic() < end:
+            start = time.monotonic()
+            try:
+                await llm.generate('Найди интересный факт', op='fact')
+            except LLMError:
+                failures += 1
+            else:
+                latencies.append(time.monotonic() - start)
+
+    try:
+        await asyncio.gather(*(caller() for _ in range(callers)))
+    finally:
+        await client.aclose()
+    return latencies, failures, llm.backend.limit.limit
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=30.0)
+    parser.add_argument('--callers', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=1.0, help='Seconds per request at or below capacity')
+    parser.add_argument('--capacity', type=int, default=4)
+    parser.add_argument('--thrash', type=float, default=0.5)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--retries', type=int, default=2)
+    parser.add_argument('--breaker', type=int, default=0, help='Breaker threshold (0 = off)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    setups = {
+        'fixed': {'llm_limit_min': args.callers, 'llm_limit_max': args.callers},
+        'adaptive': {'llm_limit_min': 1, 'llm_limit_max': args.callers},
+    }
+    for name, limits in setups.items():
+        with FakeOllama(latency=args.latency, capacity=args.capacity, thrash=args.thrash) as server:
+            config = {
+                'ollama_host': server.url, 'ollama_model': 'fake',
+                'llm_timeout': args.timeout, 'llm_retries': args.retries, 'llm_backoff': 0.5,
+                'llm_breaker_threshold': args.breaker or 10 ** 9, **limits
+            }
+            latencies, failures, limit = asyncio.run(run(config, args.callers, args.seconds))
+            p50 = f'{statistics.median(latencies):.2f}s' if latencies else '-'
+            print(f'{name:>8}: {len(latencies) * 60 / args.seconds:6.1f} ok/min, {failures} failed, '
+                  f'p50 {p50}, {server.stats["requests"]} requests to Ollama, '
+                  f'peak {server.stats.get("peak_active", 0)} in flight, limit {limit:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Time to first token of the fact and script calls across scheduled slots.
+
+A fake Ollama unloads the model ``--unload-after`` seconds after the last
+call (Ollama's 5 minutes, scaled down) and takes ``--load-time`` to load it
+again; prompt words cost 1 / ``--prompt-rate`` seconds unless they continue
+the cached context of the previous reply. Slots are ``--gap`` seconds apart.
+
+- default: no keep_alive, a fresh script prompt, no warm-up
+- managed: keep_alive through the next slot (as ContentScheduler plans it),
+  a warm-up ``--lead`` seconds before each slot, script continuing the
+  fact's context (single fact calls, as with FACT_POOL_ENABLED=false)
+
+    python -m benchmarks.llm_warm --slots 4 --gap 3 --load-time 2
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from src.fact_generator import FactGenerator
+from src.script_writer import ScriptWriter
+from src.utils.http import create_http_client
+from src.utils.llm import LLMClient
+
+from .fake_servers import FACT, FakeOllama
+
+
+async def run(config, slots, gap, lead, managed):
+    client = create_http_client(config)
+    llm = LLMClient(config, client)
+    fact_gen = FactGenerator(config, client=client)
+    script_writer = ScriptWriter(config, client=client)
+    slot_times = []
+    try:
+        for slot in range(slots):
+            if managed:
+                llm.keep_loaded(time.time() + gap + lead)
+                await asyncio.sleep(gap - lead)
+                await llm.warm()
+                await asyncio.sleep(lead)
+            else:
+                await asyncio.sleep(gap)
+            start = time.monotonic()
+            fact = await fact_gen.generate(f'космос #{slot}')
+            await script_writer.write(fact or FACT, 45)
+            slot_times.append(time.monotonic() - start)
+    finally:
+        await client.aclose()
+    return slot_times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--slots', type=int, default=4)
+    parser.add_argument('--gap', type=float, default=3.0, help='Seconds between slots')
+    parser.add_argument('--lead', type=float, default=1.0, help='Warm-up this many seconds before a slot')
+    parser.add_argument('--unload-after', type=float, default=1.0)
+    parser.add_argument('--load-time', type=float, default=2.0)
+    parser.add_argument('--prompt-rate', type=float, default=100.0, help='Prompt words per second')
+    parser.add_argument('--latency', type=float, default=0.2)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    for managed in (False, True):
+        with FakeOllama(latency=args.latency, load_time=args.load_time, default_keep_alive=args.unload_after,
+                        prompt_rate=args.prompt_rate) as server:
+            config = {
+                'ollama_host': server.url, 'ollama_model': 'fake',
+                'llm_reuse_context': managed
+            }
+            slot_times = asyncio.run(run(config, args.slots, args.gap, args.lead, managed))
+            calls = [request for request in server.requests if request['prompt_tokens']]
+            facts, scripts = calls[0::2], calls[1::2]
+
+            def ttft(requests):
+                return statistics.mean(r['load'] + r['prompt_eval'] for r in requests)
+
+            print(f'{"managed" if managed else "default":>8}: fact TTFT {ttft(facts):.2f}s, '
+                  f'script TTFT {ttft(scripts):.2f}s ({statistics.mean(r["prompt_tokens"] for r in scripts):.0f} '
+                  f'prompt words), {sum(1 for r in server.requests if r["load"])} loads '
+                  f'({sum(1 for r in calls if r["load"])} in a slot), slot {statistics.mean(slot_times):.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Maximum event-loop lag while blocking stages run inline vs through the executor layer.
+
+    python -m benchmarks.loop_lag
+"""
+
+import asyncio
+import os
+import subprocess
+import tempfile
+import time
+
+from src.utils.executors import configure_executors, run_blocking, run_cpu, shutdown_executors
+from src.utils.loop_monitor import LoopLagMonitor
+from src.video_generator.frames import render_placeholder
+
+PROMPT = 'Осьминоги имеют три сердца'
+
+
+def blocking_io():
+    # Stands in for requests.get / ffmpeg.run: a subprocess the caller waits on
+    subprocess.run(['sleep', '0.5'], check=True)
+
+
+async def inline(path):
+    render_placeholder(PROMPT, path, total_frames=60)
+    blocking_io()
+
+
+async def offloaded(path):
+    await asyncio.gather(
+        run_cpu(render_placeholder, PROMPT, path, total_frames=60),
+        run_blocking(blocking_io)
+    )
+
+
+async def measure(mode, path):
+    async with LoopLagMonitor(interval=0.005) as monitor:
+        # Let the monitor arm its first timer, and afterwards record the tick that was held up
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        await mode(path)
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.05)
+    return elapsed, monitor
+
+
+def main():
+    configure_executors({'cpu_workers': 1})
+    path = os.path.join(tempfile.mkdtemp(), 'placeholder.mp4')
+    try:
+        for name, mode in (('inline', inline), ('executors', offloaded)):
+            elapsed, monitor = asyncio.run(measure(mode, path))
+            print(f'{name:>9}: {elapsed:.2f}s, max loop lag {monitor.max_lag * 1000:.1f} ms, '
+                  f'mean {monitor.mean_lag * 1000:.2f} ms over {monitor.samples} ticks')
+    finally:
+        shutdown_executors()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Frames per second and peak memory of the placeholder renderer, old loop vs batched engine.
+
+    python -m benchmarks.placeholder_frames --frames 300 --encode
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from src.video_generator.frames import PlaceholderRenderer
+
+PROMPT = 'Осьминоги имеют три сердца и голубую кровь'
+WIDTH, HEIGHT, FPS = 1080, 1920, 30
+
+
+def legacy_frames(prompt, total):
+    for i in range(total):
+        frame = np.random.randint(0, 255, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+        color = (50 + i % 200, 100, 150)
+        cv2.rectangle(frame, (100, 100), (WIDTH - 100, HEIGHT - 100), color, -1)
+        text = f'AI Video: {prompt[:30]}...'
+        cv2.putText(frame, text, (150, HEIGHT // 2),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+        yield frame
+
+
+def run(name, frames, total, encode):
+    writer = None
+    path = None
+    if encode:
+        fd, path = tempfile.mkstemp(suffix='.mp4')
+        os.close(fd)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), FPS, (WIDTH, HEIGHT))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = 0
+    for frame in frames:
+        if writer is not None:
+            writer.write(frame)
+        count += 1
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if writer is not None:
+        writer.release()
+        os.unlink(path)
+    assert count == total
+    print(f'{name:>8}: {total / elapsed:8.1f} fps, {elapsed:6.2f}s, peak {peak / 2**20:7.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--encode', action='store_true', help='also write an mp4v file')
+    args = parser.parse_args()
+
+    run('legacy', legacy_frames(PROMPT, args.frames), args.frames, args.encode)
+    renderer = PlaceholderRenderer(PROMPT, WIDTH, HEIGHT, args.batch_size, args.workers or None)
+    run('batched', renderer.frames(args.frames), args.frames, args.encode)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Sequential vs concurrent multi-platform publishing against a local fake upload endpoint.
+
+    python -m benchmarks.publish --size-mb 50 --bandwidth-mb 100 --fail-first 1
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import tempfile
+import time
+
+from src.publisher import ContentPublisher
+from src.utils.executors import shutdown_executors
+from src.utils.http import create_http_client
+
+from .fake_servers import FakeUpload
+
+PLATFORMS = ['tiktok', 'instagram', 'youtube']
+
+
+async def run(config):
+    client = create_http_client(config)
+    try:
+        publisher = ContentPublisher(config, client=client)
+        start = time.perf_counter()
+        results = await publisher.publish(config['video_path'], PLATFORMS)
+        return time.perf_counter() - start, results
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=50)
+    parser.add_argument('--bandwidth-mb', type=float, default=100.0, help='per-upload link speed, MB/s')
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--fail-first', type=int, default=0)
+    args = parser.parse_args()
+
+    fd, video_path = tempfile.mkstemp(suffix='.mp4')
+    with os.fdopen(fd, 'wb') as f:
+        for _ in range(args.size_mb):
+            f.write(os.urandom(1 << 20))
+
+    try:
+        for concurrency in (1, len(PLATFORMS)):
+            with FakeUpload(latency=args.latency, bytes_per_second=args.bandwidth_mb * 2**20,
+                            fail_first=args.fail_first) as server:
+                config = {
+                    'blotato_api_key': 'fake',
+                    'blotato_upload_url': f'{server.url}/v1/upload',
+                    'publish_concurrency': concurrency,
+                    'publish_backoff': 0.1,
+                    'video_path': video_path
+                }
+                elapsed, results = asyncio.run(run(config))
+            print(f'concurrency {concurrency}: {elapsed:.2f}s, '
+                  f'max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB')
+            for platform, result in results.items():
+                print(f'  {platform:>9}: {result.status}, {result.bytes_sent} bytes, '
+                      f'{result.latency:.2f}s, {result.attempts} attempt(s)')
+    finally:
+        shutdown_executors()
+        os.unlink(video_path)
+
+
+if __name__ == '__main__':
+    main()
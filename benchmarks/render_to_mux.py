@@ -0,0 +1,76 @@
+"""Placeholder video: mp4v file + re-encode vs frames piped into the final encode.
+
+    python -m benchmarks.render_to_mux --width 270 --height 480
+
+Every setup voices the same script with the tone stand-in, then times
+VideoGenerator.generate + VideoEditor.compose and reports what was written to
+disk besides the final MP4 (clip and WAV) and whether the video length follows
+the audio. ``mux+pcm`` also hands the voice-over over in memory.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.utils.executors import shutdown_executors
+from src.video_editor import VideoEditor
+from src.video_generator import VideoGenerator
+from src.voice_synthesis import VoiceSynthesizer
+from src.voice_synthesis.engine import get_engine
+
+from .standins import tone_loader
+from .streaming_tts import SCRIPT
+
+PROMPT = 'Осьминоги имеют три сердца и голубую кровь'
+
+
+def _size(*directories: Path) -> int:
+    return sum(path.stat().st_size for directory in directories for path in directory.glob('*') if path.is_file())
+
+
+async def run(config):
+    import ffmpeg
+
+    synth = VoiceSynthesizer(config)
+    start = time.perf_counter()
+    try:
+        audio = await synth.synthesize(SCRIPT)
+        video = await VideoGenerator(config).generate(PROMPT, 45)
+        final = await VideoEditor(config).compose(video, audio, SCRIPT, segments=synth.segments)
+    finally:
+        shutdown_executors()
+    elapsed = time.perf_counter() - start
+    if final is None:
+        raise RuntimeError('compose failed')
+    streams = {stream['codec_type']: float(stream['duration']) for stream in ffmpeg.probe(str(final))['streams']}
+    return elapsed, _size(Path('output/video'), Path('output/audio')), final.stat().st_size, streams
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--width', type=int, default=270)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    get_engine('ru', 'standin', loader=tone_loader(0.0))
+    print(f'{"setup":<10}{"seconds":>9}{"temp MB":>9}{"final MB":>10}{"video s":>9}{"audio s":>9}')
+    for name, mux, pcm in (('file', False, False), ('mux', True, False), ('mux+pcm', True, True)):
+        os.chdir(tempfile.mkdtemp(prefix='bench-mux-'))
+        config = {
+            'silero_model': 'standin',
+            'cache_enabled': False,
+            'video_api_provider': 'placeholder',
+            'render_to_mux': mux,
+            'audio_in_memory': pcm,
+            'video': {'resolution': {'width': args.width, 'height': args.height}, 'fps': 30}
+        }
+        elapsed, temp, final, streams = asyncio.run(run(config))
+        print(f'{name:<10}{elapsed:>9.1f}{temp / 1e6:>9.1f}{final / 1e6:>10.1f}'
+              f'{streams.get("video", 0):>9.2f}{streams.get("audio", 0):>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
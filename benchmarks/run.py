@@ -0,0 +1,243 @@
+"""Offline benchmark suite: every pipeline stage and the whole pipeline against local stand-ins.
+
+Ollama and Blotato are replaced by the fake servers, Silero by the tone model,
+Replicate by the placeholder renderer. The artifact cache is disabled so every
+iteration does the real work. Results are printed and written as JSON.
+
+    python -m benchmarks.run --iterations 5 --llm-latency 0.3 --token-rate 50
+    python -m benchmarks.run --stages fact script audio --output results/baseline.json
+
+Peak memory is the RSS of this process plus its children (render workers,
+ffmpeg), sampled every 10 ms while the stage runs.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from src.fact_generator import FactGenerator
+from src.pipeline import ContentPipeline
+from src.publisher import ContentPublisher
+from src.script_writer import ScriptWriter
+from src.utils.executors import configure_executors, shutdown_executors
+from src.utils.http import create_http_client
+from src.utils.metrics import tree_rss
+from src.video_editor import VideoEditor
+from src.video_generator import VideoGenerator
+from src.voice_synthesis import VoiceSynthesizer
+from src.voice_synthesis.engine import get_engine, release_engines
+
+from .fake_servers import FakeOllama, FakeUpload
+from .standins import tone_loader
+from .streaming_tts import SCRIPT
+
+STAGES = ['fact', 'script', 'audio', 'video', 'compose', 'publish']
+PLATFORMS = ['tiktok', 'instagram', 'youtube']
+TOPICS = ['космос', 'наука', 'технологии', 'история', 'психология', 'природа']
+
+
+class PeakMemory:
+    """Samples the RSS of the process tree in a background thread."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        pid = os.getpid()
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss(pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = tree_rss(os.getpid())
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, name: str, seconds: float, peak_rss=None, ok: bool = True):
+        sample = self.samples.setdefault(name, {'seconds': [], 'peak_rss': [], 'failures': 0})
+        sample['seconds'].append(seconds)
+        if peak_rss is not None:
+            sample['peak_rss'].append(peak_rss)
+        if not ok:
+            sample['failures'] += 1
+
+    async def measure(self, name: str, coro, ok=lambda value: value is not None):
+        with PeakMemory() as memory:
+            start = time.perf_counter()
+            value = await coro
+            elapsed = time.perf_counter() - start
+        self.add(name, elapsed, memory.peak, ok(value))
+        return value
+
+    def report(self):
+        report = {}
+        for name, sample in self.samples.items():
+            seconds = np.array(sample['seconds'])
+            report[name] = {
+                'runs': len(seconds),
+                'failures': sample['failures'],
+                'mean_s': float(seconds.mean()),
+                'p50_s': float(np.percentile(seconds, 50)),
+                'p95_s': float(np.percentile(seconds, 95)),
+                'max_s': float(seconds.max()),
+                'throughput_per_hour': float(3600 * len(seconds) / seconds.sum()) if seconds.sum() else 0.0,
+                'peak_rss_mib': max(sample['peak_rss']) / 2**20 if sample['peak_rss'] else None
+            }
+        return report
+
+
+def published(results) -> bool:
+    return bool(results) and all(result.ok for result in results.values())
+
+
+async def bench_stages(config, stages, iterations, recorder):
+    # Stage by stage the video has to be a file: piped into the encode, render time would land in compose
+    config = {**config, 'render_to_mux': False}
+    client = create_http_client(config)
+    try:
+        fact_gen = FactGenerator(config, client=client)
+        script_writer = ScriptWriter(config, client=client)
+        voice_synth = VoiceSynthesizer(config)
+        video_gen = VideoGenerator(config, client=client)
+        editor = VideoEditor(config)
+        publisher = ContentPublisher(config, client=client)
+
+        for i in range(iterations):
+            topic = TOPICS[i % len(TOPICS)]
+            fact, script, audio, video, final = f'{topic}: {SCRIPT[:120]}', SCRIPT, None, None, None
+
+            if 'fact' in stages:
+                fact = await recorder.measure('fact', fact_gen.generate(topic)) or fact
+            if 'script' in stages:
+                script = await recorder.measure('script', script_writer.write(fact, 45)) or script
+            if {'audio', 'compose'} & set(stages):
+                audio = await recorder.measure('audio', voice_synth.synthesize(script))
+            if {'video', 'compose', 'publish'} & set(stages):
+                video = await recorder.measure('video', video_gen.generate(f'{fact} #{i}', 45))
+            if {'compose', 'publish'} & set(stages) and audio and video:
+                final = await recorder.measure(
+                    'compose', editor.compose(video, audio, script, segments=voice_synth.segments)
+                )
+            if 'publish' in stages and (final or video):
+                await recorder.measure('publish', publisher.publish(final or video, PLATFORMS), ok=published)
+    finally:
+        await client.aclose()
+
+
+async def bench_pipeline(config, iterations, recorder):
+    async with ContentPipeline(config) as pipeline:
+        for i in range(iterations):
+            async def end_to_end():
+                final = await pipeline.generate_video(f'{TOPICS[i % len(TOPICS)]} #{i}', duration=45)
+                if final is None:
+                    return None
+                return final if published(await pipeline.publish(final, PLATFORMS)) else None
+
+            await recorder.measure('pipeline', end_to_end())
+            # Per-stage durations inside the graph, where stages overlap
+            for name, timing in pipeline.stage_timings.items():
+                recorder.add(f'pipeline.{name}', timing['duration'])
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', '-n', type=int, default=3)
+    parser.add_argument('--stages', nargs='*', default=STAGES, choices=STAGES)
+    parser.add_argument('--no-pipeline', action='store_true', help='skip the end-to-end runs')
+    parser.add_argument('--llm-latency', type=float, default=0.3, help='seconds before the first token')
+    parser.add_argument('--token-rate', type=float, default=50.0, help='tokens per second, 0 = instant')
+    parser.add_argument('--tts-cost', type=float, default=0.05, help='synthesis seconds per audio second')
+    parser.add_argument('--upload-mbps', type=float, default=100.0, help='fake upload link speed, MB/s')
+    parser.add_argument('--output', '-o', type=Path, help='JSON file (default benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    output = args.output or Path('benchmarks/results') / f'{datetime.now():%Y%m%d_%H%M%S}.json'
+    output = output.resolve()
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    os.chdir(workdir)
+
+    get_engine('ru', 'standin', loader=tone_loader(0.0, cost_per_second=args.tts_cost)).load()
+    recorder = Recorder()
+    token_delay = 1 / args.token_rate if args.token_rate else 0.0
+
+    try:
+        with FakeOllama(latency=args.llm_latency, response=SCRIPT, token_delay=token_delay) as ollama, \
+                FakeUpload(bytes_per_second=args.upload_mbps * 2**20) as upload:
+            config = {
+                'ollama_host': ollama.url,
+                'ollama_model': 'fake',
+                'silero_model': 'standin',
+                'video_api_provider': 'placeholder',
+                'blotato_api_key': 'fake',
+                'blotato_upload_url': f'{upload.url}/v1/upload',
+                'cache_enabled': False,
+                'http2': False
+            }
+            configure_executors(config)
+            asyncio.run(bench_stages(config, args.stages, args.iterations, recorder))
+            if not args.no_pipeline:
+                asyncio.run(bench_pipeline(config, args.iterations, recorder))
+    finally:
+        shutdown_executors()
+        release_engines()
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parameters': {key: value for key, value in vars(args).items() if key != 'output'},
+        'results': recorder.report()
+    }
+
+    print(f'{"stage":<18}{"runs":>5}{"fail":>5}{"p50 s":>9}{"p95 s":>9}{"per hour":>10}{"peak MiB":>10}')
+    for name, row in results['results'].items():
+        peak = f'{row["peak_rss_mib"]:.0f}' if row['peak_rss_mib'] is not None else '-'
+        print(f'{name:<18}{row["runs"]:>5}{row["failures"]:>5}{row["p50_s"]:>9.2f}{row["p95_s"]:>9.2f}'
+              f'{row["throughput_per_hour"]:>10.0f}{peak:>10}')
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f'Results: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Wall-clock time per video with sequential vs concurrent stages, using local stand-ins.
+
+    python -m benchmarks.stage_graph --llm-latency 0.5 --tts-cost 0.2
+
+Compose is the same in both modes, so the interesting figure is the time until
+compose can start: the sum of all stages when sequential, the longest branch
+(video vs script + voice) when concurrent.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from src.pipeline import ContentPipeline
+from src.voice_synthesis.engine import get_engine
+
+from .fake_servers import FakeOllama
+from .standins import tone_loader
+from .streaming_tts import SCRIPT
+
+
+async def run(config):
+    async with ContentPipeline(config) as pipeline:
+        start = time.perf_counter()
+        final = await pipeline.generate_video('космос', duration=45)
+        return time.perf_counter() - start, final, pipeline.stage_timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--llm-latency', type=float, default=0.5)
+    parser.add_argument('--tts-cost', type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(tempfile.mkdtemp())
+    get_engine('ru', 'standin', loader=tone_loader(0.0, cost_per_second=args.tts_cost)).load()
+
+    for concurrent in (False, True):
+        with FakeOllama(latency=args.llm_latency, response=SCRIPT) as server:
+            config = {
+                'ollama_host': server.url,
+                'ollama_model': 'fake',
+                'silero_model': 'standin',
+                'video_api_provider': 'placeholder',
+                'concurrent_stages': concurrent
+            }
+            wall, final, timings = asyncio.run(run(config))
+        stages = ', '.join(f'{name} {t["duration"]:.2f}s' for name, t in timings.items())
+        print(f'{"concurrent" if concurrent else "sequential":>10}: '
+              f'compose starts at {timings["final"]["start"]:.2f}s, wall {wall:.2f}s [{stages}] -> {final}')
+
+
+if __name__ == '__main__':
+    main()
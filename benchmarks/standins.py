@@ -0,0 +1,37 @@
+"""Small local stand-ins for the heavy models used by the pipeline."""
+
+import time
+
+import numpy as np
+
+
+class ToneModel:
+    """Mimics Silero's ``apply_tts``: returns a tone whose length follows the text.
+
+    The cost is either slept (``cost_per_second``, like inference on a GPU or
+    in threads that release the GIL) or burned on the CPU (``work_per_second``
+    passes of NumPy math over 1M samples, which also release the GIL).
+    """
+
+    def __init__(self, seconds_per_char: float = 0.06, cost_per_second: float = 0.005, work_per_second: int = 0):
+        self.seconds_per_char = seconds_per_char
+        self.cost_per_second = cost_per_second
+        self.work_per_second = work_per_second
+
+    def apply_tts(self, text: str, speaker: str, sample_rate: int):
+        seconds = max(len(text), 1) * self.seconds_per_char
+        if self.work_per_second:
+            scratch = np.linspace(0, 1, 1_000_000, dtype=np.float32)
+            for _ in range(int(seconds * self.work_per_second)):
+                np.sin(scratch, out=scratch)
+        else:
+            time.sleep(seconds * self.cost_per_second)
+        t = np.arange(int(seconds * sample_rate), dtype=np.float32) / sample_rate
+        return (0.1 * np.sin(2 * np.pi * 220.0 * t)).astype(np.float32)
+
+
+def tone_loader(load_delay: float = 1.5, **model_kwargs):
+    def load(language: str, model_id: str):
+        time.sleep(load_delay)
+        return ToneModel(**model_kwargs)
+    return load
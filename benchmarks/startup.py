@@ -0,0 +1,111 @@
+"""Cold-start cost of every entry point, from ``python -X importtime``.
+
+Each command runs in a fresh interpreter (and a scratch working directory, so
+nothing touches the checkout) several times; the report gives the median
+wall time, the median total import time and the slowest top-level imports.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --commands cli-help worker --output results/startup.json
+
+Import-only entries stop right after the imports; ``cli.py`` commands are
+the real invocations.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    'cli-help': [str(ROOT / 'cli.py'), '--help'],
+    'cli-init': [str(ROOT / 'cli.py'), 'init'],
+    'jobs-list': [str(ROOT / 'cli.py'), 'jobs', 'list'],
+    'worker-help': [str(ROOT / 'cli.py'), 'worker', '--help'],
+    'main-import': ['-c', 'import main'],
+    'pipeline-import': ['-c', 'import src.pipeline'],
+    'scheduler-import': ['-c', 'import src.scheduler'],
+    'worker-import': ['-c', 'import src.worker']
+}
+
+# Heavy modules that should never load just to start a command
+HEAVY = ('torch', 'torchaudio', 'cv2', 'replicate', 'numpy', 'ffmpeg', 'httpx', 'apscheduler', 'rich')
+
+
+def parse_importtime(stderr: str):
+    """Returns {module: cumulative microseconds} for top-level imports, plus every module seen."""
+    top, seen = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        seen.add(module)
+        # Nesting is shown by two spaces per level
+        if len(name) - len(name.lstrip()) <= 1:
+            top[module] = top.get(module, 0) + int(cumulative)
+    return top, seen
+
+
+def measure(args, runs: int, workdir: Path):
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    (workdir / '.env.example').write_text('', encoding='utf-8')
+    walls, imports, top_runs, seen = [], [], [], set()
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', *args],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+        walls.append(time.perf_counter() - start)
+        top, modules = parse_importtime(result.stderr)
+        imports.append(sum(top.values()) / 1e6)
+        top_runs.append(top)
+        seen |= modules
+    slowest = sorted(top_runs[-1].items(), key=lambda item: item[1], reverse=True)[:8]
+    return {
+        'exit_code': result.returncode,
+        'wall_s': statistics.median(walls),
+        'import_s': statistics.median(imports),
+        'slowest_imports_ms': {module: us / 1000 for module, us in slowest},
+        'heavy_loaded': sorted(module for module in seen if module in HEAVY)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', '-n', type=int, default=5)
+    parser.add_argument('--commands', nargs='*', default=list(COMMANDS), choices=list(COMMANDS))
+    parser.add_argument('--output', '-o', type=Path, help='JSON file (default benchmarks/results/startup_<timestamp>.json)')
+    args = parser.parse_args()
+
+    output = args.output or Path('benchmarks/results') / f'startup_{datetime.now():%Y%m%d_%H%M%S}.json'
+    results = {}
+    for name in args.commands:
+        with tempfile.TemporaryDirectory(prefix='bench-startup-') as workdir:
+            results[name] = measure(COMMANDS[name], args.runs, Path(workdir))
+
+    print(f'{"command":<18}{"exit":>5}{"wall s":>9}{"import s":>10}  heavy modules')
+    for name, row in results.items():
+        print(f'{name:<18}{row["exit_code"]:>5}{row["wall_s"]:>9.3f}{row["import_s"]:>10.3f}  '
+              f'{", ".join(row["heavy_loaded"]) or "-"}')
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'results': results
+    }, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f'Results: {output}')
+
+
+if __name__ == '__main__':
+    main()
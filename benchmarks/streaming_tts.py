@@ -0,0 +1,74 @@
+"""Serial vs streaming script + TTS against a fake Ollama that emits tokens with a delay.
+
+    python -m benchmarks.streaming_tts --token-delay 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from src.script_writer import ScriptWriter
+from src.utils.http import create_http_client
+from src.voice_synthesis import VoiceSynthesizer
+from src.voice_synthesis.engine import get_engine
+
+from .fake_servers import FakeOllama
+from .standins import tone_loader
+
+SCRIPT = ' '.join([
+    'Знаете ли вы, что у осьминога три сердца?',
+    'Два из них качают кровь через жабры, а третье гонит её по всему телу.',
+    'Когда осьминог плывёт, главное сердце останавливается.',
+    'Поэтому он предпочитает ползать, а не плавать.',
+    'А ещё его кровь голубая из-за меди в гемоцианине.',
+    'Подпишитесь, чтобы узнать больше удивительных фактов!',
+] * 2)
+
+
+async def serial(config, client):
+    writer = ScriptWriter(config, client=client)
+    synth = VoiceSynthesizer(config)
+    start = time.perf_counter()
+    script = await writer.write('fact', 45)
+    await synth.synthesize(script)
+    return time.perf_counter() - start, None
+
+
+async def streaming(config, client):
+    writer = ScriptWriter(config, client=client)
+    synth = VoiceSynthesizer(config)
+    start = time.perf_counter()
+    await synth.synthesize_stream(writer.stream('fact', 45))
+    return time.perf_counter() - start, synth.timings['first_audio']
+
+
+async def run(mode, config):
+    client = create_http_client(config)
+    try:
+        return await mode(config, client)
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--token-delay', type=float, default=0.02)
+    parser.add_argument('--tts-cost', type=float, default=0.03, help='stand-in seconds of work per second of audio')
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())
+    engine = get_engine('ru', 'standin', loader=tone_loader(0.0, cost_per_second=args.tts_cost))
+    engine.load()
+
+    for name, mode in (('serial', serial), ('streaming', streaming)):
+        with FakeOllama(response=SCRIPT, token_delay=args.token_delay) as server:
+            config = {'ollama_host': server.url, 'ollama_model': 'fake', 'silero_model': 'standin'}
+            total, first_audio = asyncio.run(run(mode, config))
+        first = f', first audio {first_audio:.2f}s' if first_audio is not None else ''
+        print(f'{name:>9}: end-to-end {total:.2f}s{first}')
+
+
+if __name__ == '__main__':
+    main()
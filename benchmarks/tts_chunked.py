@@ -0,0 +1,71 @@
+"""Whole-script vs sentence-chunked TTS on 1..N model replicas, using the tone stand-in.
+
+    python -m benchmarks.tts_chunked --mode cpu --workers 1 2 4
+    python -m benchmarks.tts_chunked --mode sleep
+
+``cpu`` burns NumPy work per audio second, so chunked synthesis can only
+scale up to the number of cores; ``sleep`` stands for inference that waits
+(GPU, remote) and scales with the replicas alone.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from src.voice_synthesis import VoiceSynthesizer
+from src.voice_synthesis.engine import get_engine, release_engines
+
+from .standins import tone_loader
+from .streaming_tts import SCRIPT
+
+
+async def synthesize(config, runs):
+    seconds = []
+    for _ in range(runs):
+        synth = VoiceSynthesizer(config)
+        start = time.perf_counter()
+        path = await synth.synthesize(SCRIPT)
+        seconds.append(time.perf_counter() - start)
+        if path is None:
+            raise RuntimeError('synthesis failed')
+    return statistics.median(seconds), len(synth.segments)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=['cpu', 'sleep'], default='cpu')
+    parser.add_argument('--workers', nargs='*', type=int, default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--runs', '-n', type=int, default=3)
+    parser.add_argument('--work', type=int, default=4, help='cpu mode: 1M-sample passes per audio second')
+    parser.add_argument('--cost', type=float, default=0.05, help='sleep mode: seconds per audio second')
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='bench-tts-'))
+    model = {'work_per_second': args.work} if args.mode == 'cpu' else {'cost_per_second': args.cost}
+    setups = [('whole', False, 1)] + [(f'chunked x{n}', True, n) for n in args.workers]
+
+    print(f'{os.cpu_count()} CPU cores, {args.mode} mode')
+    print(f'{"setup":<14}{"chunks":>7}{"seconds":>9}{"speedup":>9}')
+    baseline = None
+    for name, chunked, workers in setups:
+        release_engines()
+        # The loader is shared by every replica of the pool
+        get_engine('ru', 'standin', loader=tone_loader(0.0, **model))
+        config = {
+            'silero_model': 'standin',
+            'tts_chunked': chunked,
+            'tts_workers': workers,
+            'cache_enabled': False
+        }
+        # First call loads the replicas; measured calls are warm
+        asyncio.run(synthesize(config, 1))
+        seconds, chunks = asyncio.run(synthesize(config, args.runs))
+        baseline = baseline or seconds
+        print(f'{name:<14}{chunks:>7}{seconds:>9.2f}{baseline / seconds:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""Cold vs warm latency of the resident Silero engine, using a local stand-in model.
+
+    python -m benchmarks.tts_warm --calls 5 --load-delay 1.5
+"""
+
+import argparse
+import time
+
+from src.voice_synthesis.engine import get_engine, release_engines
+
+from .standins import tone_loader
+
+TEXT = 'Осьминоги имеют три сердца и голубую кровь. Два сердца качают кровь через жабры.'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=5)
+    parser.add_argument('--load-delay', type=float, default=1.5)
+    args = parser.parse_args()
+
+    release_engines()
+    engine = get_engine('ru', 'standin', loader=tone_loader(args.load_delay))
+
+    for i in range(args.calls):
+        start = time.perf_counter()
+        load_time = engine.load()
+        engine.synthesize(TEXT, 'xenia', 48000)
+        total = time.perf_counter() - start
+        kind = 'cold' if i == 0 else 'warm'
+        print(f'call {i + 1} ({kind}): total {total:.3f}s, load {load_time:.3f}s, '
+              f'synthesis {total - load_time:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Worker-mode throughput: the same batch of jobs with 1, 2, ... worker processes per stage kind.
+
+Every run gets a fresh job database and working directory, submits the jobs
+through the Coordinator and waits until they are all done or failed. Ollama
+and Blotato are the fake servers, Silero the tone model (installed in every
+worker by ``install_standins``), video the placeholder renderer.
+
+    python -m benchmarks.worker_scaling --jobs 6 --workers 1 2 --duration 10
+
+Only stages that wait on something (LLM latency, uploads) scale past the
+number of CPU cores; render and encode are CPU-bound.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.pipeline import ContentPipeline
+from src.voice_synthesis.engine import get_engine
+from src.worker import KINDS, Coordinator, WorkerPool
+
+from .fake_servers import FakeOllama, FakeUpload
+from .standins import tone_loader
+from .streaming_tts import SCRIPT
+
+TTS_COST = float(os.environ.get('BENCH_TTS_COST', '0.05'))
+
+
+def install_standins():
+    get_engine('ru', 'standin', loader=tone_loader(0.0, cost_per_second=TTS_COST)).load()
+
+
+async def run_jobs(config, jobs: int, duration: int, counts):
+    pool = WorkerPool(config, counts, idle_exit=5.0, initializer='benchmarks.worker_scaling:install_standins')
+    async with ContentPipeline(config) as pipeline:
+        coordinator = Coordinator(pipeline, pool)
+        start = time.perf_counter()
+        job_ids = [await coordinator.submit(f'факт #{i}', duration, publish=True) for i in range(jobs)]
+        pool.start()
+        try:
+            finished = await coordinator.wait(job_ids)
+        finally:
+            elapsed = time.perf_counter() - start
+            pool.stop()
+    done = sum(1 for job in finished.values() if job.status == 'done')
+    return done, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', '-n', type=int, default=4)
+    parser.add_argument('--workers', nargs='*', type=int, default=[1, 2], help='processes per kind, one run each')
+    parser.add_argument('--duration', '-d', type=int, default=10, help='video seconds')
+    parser.add_argument('--llm-latency', type=float, default=2.0, help='seconds before the first token')
+    parser.add_argument('--upload-mbps', type=float, default=10.0, help='fake upload link speed, MB/s')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    os.chdir(tempfile.mkdtemp(prefix='bench-workers-'))
+
+    rows = []
+    with FakeOllama(latency=args.llm_latency, response=SCRIPT) as ollama, \
+            FakeUpload(bytes_per_second=args.upload_mbps * 2**20) as upload:
+        for count in args.workers:
+            workdir = Path(f'run-{count}').resolve()
+            workdir.mkdir()
+            # Workers are spawned with this working directory, so output/ lands here too
+            os.chdir(workdir)
+            config = {
+                'ollama_host': ollama.url,
+                'ollama_model': 'fake',
+                'silero_model': 'standin',
+                'video_api_provider': 'placeholder',
+                'blotato_api_key': 'fake',
+                'blotato_upload_url': f'{upload.url}/v1/upload',
+                'publish_to_tiktok': True,
+                'cache_enabled': False,
+                'burn_captions': False,
+                'http2': False,
+                'video': {'resolution': {'width': 270, 'height': 480}},
+                'jobs_enabled': True,
+                'jobs_db': str(workdir / 'jobs.db'),
+                'tracing_enabled': False,
+                'worker_poll': 0.2
+            }
+            done, elapsed = asyncio.run(run_jobs(config, args.jobs, args.duration, {kind: count for kind in KINDS}))
+            os.chdir(workdir.parent)
+            rows.append((count, done, elapsed))
+            print(f'{count} per kind: {done}/{args.jobs} jobs in {elapsed:.1f}s '
+                  f'({3600 * done / elapsed:.0f} videos/hour)', flush=True)
+
+    print(f'\n{"workers/kind":<14}{"done":>6}{"seconds":>10}{"per hour":>10}')
+    for count, done, elapsed in rows:
+        print(f'{count:<14}{done:>6}{elapsed:>10.1f}{3600 * done / elapsed:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 """CLI interface for AI Content Automation"""
 
-import asyncio
 import click
 from pathlib import Path
-from rich.console import Console
 
-console = Console()
+
+class _LazyConsole:
+    """Imports rich on the first print, so `--help` and quick commands start fast."""
+    _console = None
+
+    def __getattr__(self, name):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+
+console = _LazyConsole()
 
 @click.group()
 def cli():
@@ -18,6 +28,7 @@ def cli():
 @click.option('--duration', '-d', default=45, type=int, help='Duration')
 def generate(topic, duration):
     """Generate a single video"""
+    import asyncio
     console.print(f"[cyan]🎬 Generating video: {topic}[/cyan]")
     
     async def run():
@@ -25,12 +36,12 @@ def generate(topic, duration):
         from src.utils.config import load_config
         
         config = load_config()
-        pipeline = ContentPipeline(config)
-        
-        video_path = await pipeline.generate_video(
-            topic=topic,
-            duration=duration
-        )
+        async with ContentPipeline(config) as pipeline:
+            video_path = await pipeline.generate_video(
+                topic=topic,
+                duration=duration,
+                publish=False
+            )
         
         if video_path:
             console.print(f"[green]✅ Video: {video_path}[/green]")
@@ -39,6 +50,202 @@ def generate(topic, duration):
     
     asyncio.run(run())
 
+@cli.command()
+@click.option('--topics', '-t', default=None, help='Comma-separated topics')
+@click.option('--file', '-f', 'topics_file', type=click.Path(exists=True), help='File with one topic per line')
+@click.option('--count', '-n', default=None, type=int, help='Number of videos (cycles through topics)')
+@click.option('--duration', '-d', default=45, type=int, help='Duration')
+@click.option('--concurrency', '-c', default=None, type=int, help='Videos in flight')
+@click.option('--publish', is_flag=True, help='Publish each video when done')
+def batch(topics, topics_file, count, duration, concurrency, publish):
+    """Generate many videos in one process"""
+    import asyncio
+    topic_list = []
+    if topics:
+        topic_list += [t.strip() for t in topics.split(',') if t.strip()]
+    if topics_file:
+        lines = Path(topics_file).read_text(encoding='utf-8').splitlines()
+        topic_list += [line.strip() for line in lines if line.strip()]
+    
+    async def run():
+        from src.batch import BatchRunner
+        from src.pipeline import ContentPipeline
+        from src.utils.config import load_config
+        
+        config = load_config()
+        queue = topic_list or config.get('default_topics', ['интересные факты'])
+        if count:
+            queue = [queue[i % len(queue)] for i in range(count)]
+        
+        console.print(f"[cyan]🎬 Batch: {len(queue)} videos[/cyan]")
+        
+        def progress(runner, result):
+            done = len(runner.results)
+            status = f"[green]✅ {result.path}[/green]" if result.path else "[red]❌ failed[/red]"
+            if result.publish_error:
+                status += f" [yellow]⚠️ {result.publish_error}[/yellow]"
+            console.print(
+                f"[{done}/{len(queue)}] {result.topic} ({result.seconds:.0f}s) {status} "
+                f"[dim]{runner.throughput:.1f} videos/hour[/dim]"
+            )
+        
+        async with ContentPipeline(config) as pipeline:
+            runner = BatchRunner(pipeline, config, concurrency=concurrency)
+            results = await runner.run(queue, duration=duration, publish=publish, on_progress=progress)
+        
+        ok = sum(1 for r in results if r.path)
+        console.print(f"[green]✅ {ok}/{len(results)} videos, {runner.throughput:.1f} videos/hour[/green]")
+    
+    asyncio.run(run())
+
+@cli.group()
+def jobs():
+    """Inspect, resume and retry video jobs"""
+    pass
+
+@jobs.command('list')
+@click.option('--status', '-s', default=None, help='running, generated, done or failed')
+@click.option('--limit', '-n', default=20, type=int, help='Number of jobs')
+def jobs_list(status, limit):
+    """List recent jobs with their finished stages"""
+    from rich.table import Table
+    from src.jobs import JobStore
+    from src.utils.config import load_config
+    
+    table = Table()
+    for column in ('ID', 'Topic', 'Status', 'Stages', 'Attempts', 'Updated', 'Error'):
+        table.add_column(column, no_wrap=column == 'ID')
+    
+    colors = {'done': 'green', 'generated': 'cyan', 'running': 'yellow', 'failed': 'red'}
+    for job in JobStore(load_config()).list(status=status, limit=limit):
+        table.add_row(
+            job.id,
+            job.topic,
+            f"[{colors.get(job.status, 'white')}]{job.status}[/]",
+            ', '.join(job.checkpoints),
+            str(job.attempts),
+            job.updated_at,
+            job.error or ''
+        )
+    console.print(table)
+
+def _run_job(job_id, stage=None):
+    import asyncio
+    
+    async def run():
+        from src.pipeline import ContentPipeline
+        from src.utils.config import load_config
+        
+        config = load_config()
+        async with ContentPipeline(config) as pipeline:
+            if pipeline.jobs is None:
+                console.print("[red]❌ Job store disabled (JOBS_ENABLED=false)[/red]")
+                return
+            job = pipeline.jobs.get(job_id)
+            if job is None:
+                console.print(f"[red]❌ No job {job_id}[/red]")
+                return
+            if stage is not None:
+                dropped = pipeline.jobs.reset(job.id, None if stage == 'all' else pipeline.downstream([stage]))
+                console.print(f"[dim]Dropped {dropped} checkpoint(s)[/dim]")
+            
+            console.print(f"[cyan]🎬 Job {job.id}: {job.topic}[/cyan]")
+            video_path = await pipeline.resume(job.id)
+            job = pipeline.jobs.get(job.id)
+        
+        if video_path:
+            console.print(f"[green]✅ Video: {video_path} ({job.status})[/green]")
+        else:
+            console.print(f"[red]❌ Failed: {job.error}[/red]")
+    
+    asyncio.run(run())
+
+@jobs.command()
+@click.argument('job_id')
+def resume(job_id):
+    """Continue a job from its last good stage"""
+    _run_job(job_id)
+
+@jobs.command()
+@click.argument('job_id')
+@click.option('--from', 'stage', default='all',
+              help='Redo this stage and the stages built from it (fact, script, audio, video, final, publish)')
+def retry(job_id, stage):
+    """Re-run a job, discarding checkpoints"""
+    _run_job(job_id, stage)
+
+@cli.command()
+def facts():
+    """Fact pool: facts left per topic, LLM calls per video, repeat rate"""
+    from src.fact_generator.pool import FactPool
+    from src.utils.config import load_config
+
+    stats = FactPool(load_config()).stats()
+    per_video = stats['llm_calls_per_video']
+    console.print(
+        f"[cyan]📚 {stats['videos']} facts used, {stats['llm_calls']} LLM calls "
+        f"({f'{per_video:.2f}' if per_video is not None else '-'} per video)[/cyan]"
+    )
+    console.print(f"Repeats dropped: {stats['duplicates']}/{stats['received']} ({stats['duplicate_rate']:.0%})")
+    for topic, count in sorted(stats['pooled'].items()):
+        console.print(f"  {topic}: {count} pooled")
+
+@cli.command()
+@click.option('--dry-run', is_flag=True, help='Only report what would be removed')
+def gc(dry_run):
+    """Apply output retention (OUTPUT_MAX_MB, OUTPUT_MAX_AGE) and report reclaimed space"""
+    from src.jobs import JobStore
+    from src.utils.config import load_config
+    from src.utils.outputs import OutputStore
+
+    config = load_config()
+    store = OutputStore(config)
+    keep = JobStore(config).artifacts() if config.get('jobs_enabled', True) else set()
+    before = store.usage()
+    result = store.collect(keep, dry_run=dry_run)
+
+    verb = 'Would remove' if dry_run else 'Removed'
+    console.print(
+        f"[green]🧹 {verb} {result['files']} files, "
+        f"{result['bytes'] / 2**20:.1f} MB reclaimed[/green] [dim]({result['pinned']} kept for unfinished jobs)[/dim]"
+    )
+    after = store.usage()
+    for kind in sorted(before):
+        change = '' if dry_run else f" → {after.get(kind, 0) / 2**20:.1f} MB"
+        console.print(f"  {kind}: {before[kind] / 2**20:.1f} MB{change}")
+    console.print(f"Budget: {result['usage'] / 2**20:.1f} / {store.max_bytes / 2**20:.0f} MB")
+
+@cli.command()
+@click.option('--kind', '-k', 'kinds', multiple=True,
+              type=click.Choice(['llm', 'tts', 'render', 'encode', 'publish']),
+              help='Stage kinds to run (default: all)')
+@click.option('--processes', '-n', default=1, type=int, help='Worker processes per kind')
+def worker(kinds, processes):
+    """Run stage workers against the shared task queue"""
+    import asyncio
+    import time
+    from src.utils.config import load_config
+    from src.worker import KINDS, Worker, WorkerPool
+
+    config = load_config()
+    kinds = list(kinds) or list(KINDS)
+    console.print(f"[cyan]👷 Workers: {', '.join(kinds)} × {processes}[/cyan]")
+
+    if processes == 1 and len(kinds) == 1:
+        asyncio.run(Worker(config, kinds).run())
+        return
+
+    pool = WorkerPool(config, {kind: processes for kind in kinds})
+    pool.start()
+    try:
+        while True:
+            time.sleep(config.get('worker_poll', 0.5) * 10)
+            pool.check()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Stopping workers...[/yellow]")
+    finally:
+        pool.stop()
+
 @cli.command()
 def init():
     """Initialize project"""
@@ -10,12 +10,11 @@ import logging
 import sys
 from pathlib import Path
 
-from dotenv import load_dotenv
 from rich.console import Console
 from rich.logging import RichHandler
 
 from src.pipeline import ContentPipeline
-from src.scheduler import ContentScheduler
+from src.utils import deps
 from src.utils.config import load_config
 
 # Setup logging
@@ -32,9 +31,6 @@ console = Console()
 
 def setup_environment():
     """Инициализация окружения."""
-    # Load environment variables
-    load_dotenv()
-    
     # Create necessary directories
     directories = ['output', 'logs', 'models', 'cache', 'temp']
     for directory in directories:
@@ -43,23 +39,19 @@ def setup_environment():
     logger.info("✅ Environment initialized")
 
 
-def check_dependencies():
-    """Проверка установленных зависимостей."""
-    try:
-        import torch
-        import ffmpeg
-        logger.info(f"✅ PyTorch: {torch.__version__}")
-        logger.info(f"✅ FFmpeg: installed")
-        
-        if torch.cuda.is_available():
-            gpu_name = torch.cuda.get_device_name(0)
-            logger.info(f"🎮 GPU detected: {gpu_name}")
-        else:
-            logger.warning("⚠️  No GPU detected, using CPU (slower)")
-            
-    except ImportError as e:
-        logger.error(f"❌ Missing dependency: {e}")
+def check_dependencies(config):
+    """Проверка зависимостей для стадий, которые будут запущены (без импорта torch)."""
+    kinds = ['llm', 'tts', 'render', 'encode']
+    if config.get('auto_publish', False):
+        kinds.append('publish')
+    if config.get('scheduling', {}).get('enabled', False):
+        kinds.append('schedule')
+    
+    absent = deps.missing(kinds, config)
+    if absent:
+        logger.error(f"❌ Missing dependencies: {', '.join(absent)} ({deps.describe(absent)})")
         sys.exit(1)
+    logger.info("✅ Dependencies: installed")
 
 
 async def main():
@@ -69,35 +61,69 @@ async def main():
     
     # Setup
     setup_environment()
-    check_dependencies()
     
     # Load configuration
     config = load_config()
+    check_dependencies(config)
     
-    # Initialize pipeline
-    pipeline = ContentPipeline(config)
+    # Worker mode: stages run in separate processes fed from the task queue
+    pool = coordinator = None
     
+    # Initialize pipeline
+    async with ContentPipeline(config) as pipeline:
+        if config.get('worker_mode', False) and pipeline.jobs is None:
+            logger.warning("⚠️  WORKER_MODE needs JOBS_ENABLED=true, running in-process")
+        elif config.get('worker_mode', False):
+            from src.worker import Coordinator, WorkerPool
+            pool = WorkerPool(config, config.get('workers', {}))
+            pool.start()
+            coordinator = Coordinator(pipeline, pool)
+        
+        try:
+            await run(pipeline, config, coordinator)
+        finally:
+            if pool is not None:
+                pool.stop()
+
+
+async def run(pipeline, config, coordinator=None):
     # Check if scheduling is enabled
     if config.get('scheduling', {}).get('enabled', False):
+        from src.scheduler import ContentScheduler
         logger.info("📅 Starting scheduled content generation...")
-        scheduler = ContentScheduler(pipeline, config)
+        scheduler = ContentScheduler(pipeline, config, coordinator=coordinator)
         await scheduler.start()
     else:
         logger.info("🎬 Running single video generation...")
+        topic = config.get('default_topic', 'интересные факты')
+        duration = config.get('default_duration', 45)
+        
+        if coordinator is not None:
+            job_id = await coordinator.submit(topic, duration)
+            job = (await coordinator.wait([job_id]))[job_id]
+            if job.status == 'done':
+                console.print(f"\n[green]✅ Job {job_id}: {job.checkpoints['final'].value}[/green]")
+            else:
+                console.print(f"[red]❌ Job {job_id} failed: {job.error}[/red]")
+            return
         
         # Generate one video
-        video_path = await pipeline.generate_video(
-            topic=config.get('default_topic', 'интересные факты'),
-            duration=config.get('default_duration', 45)
-        )
+        video_path = await pipeline.generate_video(topic=topic, duration=duration)
         
         if video_path:
             console.print(f"\n[green]✅ Video generated: {video_path}[/green]")
             
             # Publish if enabled
             if config.get('auto_publish', False):
-                await pipeline.publish(video_path)
-                console.print("[green]✅ Published to social media[/green]")
+                results = await pipeline.publish(video_path)
+                for platform, result in results.items():
+                    if result.ok:
+                        console.print(
+                            f"[green]✅ {platform}: {result.bytes_sent} bytes "
+                            f"in {result.latency:.1f}s[/green]"
+                        )
+                    else:
+                        console.print(f"[red]❌ {platform}: {result.status} {result.error or ''}[/red]")
         else:
             console.print("[red]❌ Video generation failed[/red]")
 
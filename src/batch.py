@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    topic: str
+    path: Optional[Path]
+    seconds: float
+    # This video's own stage timings; pipeline.stage_timings is whichever video finished last
+    stages: Dict[str, dict] = field(default_factory=dict)
+    publish_error: Optional[str] = None
+
+
+class BatchRunner:
+    """Pushes many videos through one pipeline.
+
+    ``concurrency`` bounds how many videos are in flight; within them each stage
+    kind queues on the pipeline's own limits (llm, tts, render, encode).
+    """
+
+    def __init__(self, pipeline, config, concurrency: Optional[int] = None):
+        self.pipeline = pipeline
+        self.config = config
+        self.concurrency = concurrency or config.get('batch_concurrency', 8)
+        self.results: List[BatchResult] = []
+        self.started = None
+
+    @property
+    def throughput(self) -> float:
+        """Successful videos per hour so far."""
+        if not self.started:
+            return 0.0
+        done = sum(1 for result in self.results if result.path)
+        return done / max(time.perf_counter() - self.started, 1e-9) * 3600
+
+    async def run(
+        self,
+        topics: List[str],
+        duration: int = 45,
+        publish: bool = False,
+        on_progress: Optional[Callable[['BatchRunner', BatchResult], None]] = None
+    ) -> List[BatchResult]:
+        from .publisher import publish_error
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for topic in topics:
+            queue.put_nowait(topic)
+
+        self.results = []
+        self.started = time.perf_counter()
+
+        async def worker():
+            while True:
+                try:
+                    topic = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                start = time.perf_counter()
+                stages = {}
+                path = await self.pipeline.generate_video(
+                    topic=topic, duration=duration, publish=publish, timings=stages
+                )
+                error = None
+                if path and publish:
+                    # One failed publish must not cancel the other videos in the gather
+                    try:
+                        error = publish_error(await self.pipeline.publish(path))
+                    except Exception as e:
+                        error = str(e)
+                    if error:
+                        logger.error(f'Publish error ({topic}): {error}')
+
+                result = BatchResult(topic, path, time.perf_counter() - start, stages, error)
+                self.results.append(result)
+                if on_progress:
+                    on_progress(self, result)
+
+        workers = min(self.concurrency, len(topics))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        done = sum(1 for result in self.results if result.path)
+        logger.info(f'Batch: {done}/{len(topics)} videos, {self.throughput:.1f} videos/hour')
+        return self.results
@@ -1,19 +1,46 @@
 import logging
 import json
-from typing import Optional
+import re
+from typing import List, Optional
+
+from ..utils import tracing
+from ..utils.executors import run_blocking
+from ..utils.llm import LLMClient, LLMError
 
 logger = logging.getLogger(__name__)
 
+_NUMBERING = re.compile(r'^\s*(?:\d+[.)]|[-*•])\s*')
+
+
+def parse_facts(text: str) -> List[str]:
+    """Facts from a batch reply: {"facts": [...]} or a bare list, else one fact per line."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, dict):
+        data = data.get('facts', next((v for v in data.values() if isinstance(v, list)), None))
+    if isinstance(data, list):
+        facts = [item.get('fact', '') if isinstance(item, dict) else str(item) for item in data]
+    else:
+        facts = [_NUMBERING.sub('', line) for line in text.splitlines()]
+    return [fact.strip() for fact in facts if len(fact.strip()) > 20]
+
+
 class FactGenerator:
-    def __init__(self, config):
+    def __init__(self, config, client=None, cache=None, pool=None):
         self.config = config
-        self.ollama_host = config.get('ollama_host', 'http://localhost:11434')
-        self.model = config.get('ollama_model', 'qwen2.5:32b')
+        self.client = client
+        self.cache = cache
+        # With a FactPool, facts come from batched, deduplicated LLM calls
+        self.pool = pool
+        self.llm = LLMClient(config, client)
+        self.model = self.llm.model
     
     async def generate(self, topic: str) -> Optional[str]:
+        if self.pool is not None:
+            return await self._from_pool(topic)
         try:
-            import httpx
-            
             prompt = f"""Найди интересный, малоизвестный и проверенный факт на тему: {topic}
 
 Критерии:
@@ -24,20 +51,76 @@ class FactGenerator:
 
 Ответ дай кратко, 2-3 предложения."""
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f'{self.ollama_host}/api/generate',
-                    json={'model': self.model, 'prompt': prompt, 'stream': False}
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    fact = result.get('response', '').strip()
-                    logger.info(f'Fact generated: {len(fact)} chars')
-                    return fact
-                else:
-                    logger.error(f'Ollama error: {response.status_code}')
-                    return None
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.key('fact', model=self.model, prompt=prompt)
+                cached = self.cache.get_json(cache_key)
+                if cached:
+                    logger.info(f'Fact (cached): {len(cached)} chars')
+                    return cached
+            
+            reply = await self.llm.complete(prompt, op='fact')
+            fact = reply.get('response', '').strip()
+            # Only a single-fact reply is remembered: a batch reply's context holds many facts
+            self.llm.remember(fact, reply.get('context'))
+            logger.info(f'Fact generated: {len(fact)} chars')
+            if cache_key and fact:
+                self.cache.put_json(cache_key, fact)
+            return fact
         except Exception as e:
             logger.error(f'Generation error: {e}')
-            return None
\ No newline at end of file
+            return None
+    
+    async def _from_pool(self, topic: str) -> Optional[str]:
+        try:
+            pool = self.pool
+            async with pool.lock(topic):
+                fact = await run_blocking(pool.take, topic)
+                source = 'pool'
+                for _ in range(pool.refill_attempts if fact is None else 0):
+                    facts = await self._generate_batch(topic, pool.batch_size)
+                    if not facts:
+                        break
+                    added, duplicates = await run_blocking(pool.add, topic, facts)
+                    logger.info(f'Fact pool: {added} new facts for {topic}, {duplicates} repeats dropped')
+                    fact = await run_blocking(pool.take, topic)
+                    source = 'llm'
+                    if fact is not None:
+                        break
+            
+            if fact is None:
+                logger.error(f'Fact pool: no new fact for {topic}')
+                return None
+            
+            stats = await run_blocking(pool.stats)
+            tracing.tag(fact_source=source)
+            logger.info(
+                f'Fact ({source}): {len(fact)} chars, {stats["pooled"].get(topic, 0)} left for {topic} '
+                f'({stats["llm_calls_per_video"]:.2f} LLM calls/video, {stats["duplicate_rate"]:.0%} repeats)'
+            )
+            return fact
+        except Exception as e:
+            logger.error(f'Fact pool error: {e}')
+            return None
+    
+    async def _generate_batch(self, topic: str, count: int) -> List[str]:
+        prompt = f"""Найди {count} разных интересных, малоизвестных и проверенных фактов на тему: {topic}
+
+Критерии для каждого факта:
+- Удивительный
+- Можно объяснить за 30-60 секунд
+- Проверенная информация
+- Подходит для визуализации
+- 2-3 предложения
+
+Факты не должны повторять друг друга.
+Ответ строго в JSON: {{"facts": ["факт 1", "факт 2", ...]}}"""
+        
+        try:
+            reply = await self.llm.generate(prompt, op='facts', format='json')
+        except LLMError as e:
+            logger.error(f'Fact batch error: {e}')
+            return []
+        facts = parse_facts(reply)
+        logger.info(f'Fact batch: {len(facts)} facts for {topic}')
+        return facts
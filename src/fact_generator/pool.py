@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..jobs import open_db
+from ..utils import minhash
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS facts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    text TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    status TEXT NOT NULL,
+    duplicate_of INTEGER,
+    created_at REAL NOT NULL,
+    used_at REAL
+);
+CREATE INDEX IF NOT EXISTS facts_pooled ON facts (topic, status, id);
+CREATE TABLE IF NOT EXISTS fact_bands (
+    band INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    fact_id INTEGER NOT NULL REFERENCES facts(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS fact_bands_lookup ON fact_bands (band, hash);
+CREATE TABLE IF NOT EXISTS fact_batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    topic TEXT NOT NULL,
+    received INTEGER NOT NULL,
+    duplicates INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+'''
+
+
+class FactPool:
+    """Facts generated in batches and handed out one per video.
+
+    Every fact ever accepted (pooled or used) is in a MinHash/LSH index of
+    character shingles, so a new batch drops near-repeats of anything already
+    published or waiting, across topics. Fact statuses: pooled, used,
+    duplicate (kept for the duplicate rate, not indexed).
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.path = Path(config.get('fact_pool_db', 'data/facts.db'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = config.get('fact_batch_size', 10)
+        self.threshold = config.get('fact_dedupe_threshold', 0.5)
+        self.refill_attempts = config.get('fact_refill_attempts', 2)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        with open_db(self.path) as db:
+            db.executescript(SCHEMA)
+
+    def lock(self, topic: str) -> asyncio.Lock:
+        """Serializes refills of one topic inside this process (concurrent videos share a batch)."""
+        return self._locks.setdefault(topic, asyncio.Lock())
+
+    def _duplicate_of(self, db, sig: List[int]) -> Optional[int]:
+        candidates = set()
+        for band, key in minhash.bands(sig):
+            rows = db.execute('SELECT fact_id FROM fact_bands WHERE band = ? AND hash = ?', (band, key))
+            candidates.update(row['fact_id'] for row in rows)
+        for fact_id in sorted(candidates):
+            row = db.execute('SELECT signature FROM facts WHERE id = ?', (fact_id,)).fetchone()
+            if row and minhash.similarity(sig, minhash.unpack(row['signature'])) >= self.threshold:
+                return fact_id
+        return None
+
+    def add(self, topic: str, facts: List[str]) -> Tuple[int, int]:
+        """Pools new facts for a topic; returns (added, duplicates). Blocking."""
+        now = time.time()
+        added = duplicates = 0
+        with open_db(self.path) as db:
+            db.execute('BEGIN IMMEDIATE')
+            for text in facts:
+                sig = minhash.signature(text)
+                original = self._duplicate_of(db, sig)
+                status = 'duplicate' if original else 'pooled'
+                cursor = db.execute(
+                    'INSERT INTO facts (topic, text, signature, status, duplicate_of, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (topic, text, minhash.pack(sig), status, original, now)
+                )
+                if original:
+                    duplicates += 1
+                    logger.debug(f'Fact repeats #{original}: {text[:60]}')
+                    continue
+                db.executemany(
+                    'INSERT INTO fact_bands (band, hash, fact_id) VALUES (?, ?, ?)',
+                    [(band, key, cursor.lastrowid) for band, key in minhash.bands(sig)]
+                )
+                added += 1
+            db.execute(
+                'INSERT INTO fact_batches (topic, received, duplicates, created_at) VALUES (?, ?, ?, ?)',
+                (topic, len(facts), duplicates, now)
+            )
+        return added, duplicates
+
+    def take(self, topic: str) -> Optional[str]:
+        """The oldest pooled fact for the topic, marked used. Blocking."""
+        with open_db(self.path) as db:
+            db.execute('BEGIN IMMEDIATE')
+            row = db.execute(
+                "SELECT id, text FROM facts WHERE topic = ? AND status = 'pooled' ORDER BY id LIMIT 1", (topic,)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute("UPDATE facts SET status = 'used', used_at = ? WHERE id = ?", (time.time(), row['id']))
+        return row['text']
+
+    def size(self, topic: str) -> int:
+        with open_db(self.path) as db:
+            return db.execute(
+                "SELECT COUNT(*) FROM facts WHERE topic = ? AND status = 'pooled'", (topic,)
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """LLM calls per video and the share of generated facts that were repeats."""
+        with open_db(self.path) as db:
+            batches = db.execute(
+                'SELECT COUNT(*) AS calls, COALESCE(SUM(received), 0) AS received, '
+                'COALESCE(SUM(duplicates), 0) AS duplicates FROM fact_batches'
+            ).fetchone()
+            counts = {
+                row['status']: row['n']
+                for row in db.execute('SELECT status, COUNT(*) AS n FROM facts GROUP BY status')
+            }
+            pooled = {
+                row['topic']: row['n']
+                for row in db.execute("SELECT topic, COUNT(*) AS n FROM facts WHERE status = 'pooled' GROUP BY topic")
+            }
+        used = counts.get('used', 0)
+        return {
+            'videos': used,
+            'llm_calls': batches['calls'],
+            'llm_calls_per_video': batches['calls'] / used if used else None,
+            'received': batches['received'],
+            'duplicates': batches['duplicates'],
+            'duplicate_rate': batches['duplicates'] / batches['received'] if batches['received'] else 0.0,
+            'pooled': pooled
+        }
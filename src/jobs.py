@@ -0,0 +1,268 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    publish INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    sha256 TEXT,
+    size INTEGER,
+    meta TEXT,
+    created_at TEXT NOT NULL,
+    UNIQUE (job_id, stage)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_value ON checkpoints (stage, value);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+'''
+
+
+@contextmanager
+def open_db(path: Path):
+    """One short-lived connection per call, so the stores are safe from any thread or process."""
+    db = sqlite3.connect(path, timeout=30)
+    db.row_factory = sqlite3.Row
+    try:
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA foreign_keys=ON')
+        with db:
+            yield db
+    finally:
+        db.close()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+@dataclass
+class Checkpoint:
+    stage: str
+    value: Any
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
+
+
+@dataclass
+class Job:
+    id: str
+    topic: str
+    duration: int
+    publish: bool
+    status: str
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: str = ''
+    updated_at: str = ''
+    checkpoints: Dict[str, Checkpoint] = field(default_factory=dict)
+
+
+class JobStore:
+    """SQLite record of video jobs and the output of every finished stage.
+
+    Text outputs (fact, script) are stored inline, files (audio, video, final)
+    by path plus size and sha256, so a resumed job reuses only artifacts that
+    are still intact. Statuses: running, generated (video ready, publish
+    pending), done, failed.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.path = Path(config.get('jobs_db', 'data/jobs.db'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._db() as db:
+            db.executescript(SCHEMA)
+
+    def _db(self):
+        return open_db(self.path)
+
+    def create(self, topic: str, duration: int, publish: bool = False) -> Job:
+        job = Job(uuid.uuid4().hex[:12], topic, duration, bool(publish), 'running', created_at=_now())
+        job.updated_at = job.created_at
+        with self._db() as db:
+            db.execute(
+                'INSERT INTO jobs (id, topic, duration, publish, status, attempts, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, 0, ?, ?)',
+                (job.id, topic, duration, int(job.publish), job.status, job.created_at, job.updated_at)
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Looks a job up by id or by a unique id prefix."""
+        with self._db() as db:
+            rows = db.execute('SELECT * FROM jobs WHERE id LIKE ? LIMIT 2', (f'{job_id}%',)).fetchall()
+            if len(rows) != 1:
+                return None
+            job = self._job(rows[0])
+            for row in db.execute('SELECT * FROM checkpoints WHERE job_id = ? ORDER BY seq', (job.id,)):
+                job.checkpoints[row['stage']] = self._checkpoint(row)
+        return job
+
+    def list(self, status: Optional[str] = None, limit: int = 20) -> List[Job]:
+        query = 'SELECT * FROM jobs'
+        params: tuple = ()
+        if status:
+            query += ' WHERE status = ?'
+            params = (status,)
+        query += ' ORDER BY created_at DESC, rowid DESC LIMIT ?'
+        with self._db() as db:
+            jobs = [self._job(row) for row in db.execute(query, params + (limit,))]
+            for job in jobs:
+                for row in db.execute('SELECT * FROM checkpoints WHERE job_id = ? ORDER BY seq', (job.id,)):
+                    job.checkpoints[row['stage']] = self._checkpoint(row)
+        return jobs
+
+    def find(self, stage: str, value: Any) -> Optional[str]:
+        """Id of the newest job whose `stage` output is `value` (e.g. the job behind a final video)."""
+        with self._db() as db:
+            row = db.execute(
+                'SELECT job_id FROM checkpoints WHERE stage = ? AND value = ? ORDER BY seq DESC LIMIT 1',
+                (stage, str(value))
+            ).fetchone()
+        return row['job_id'] if row else None
+
+    def artifacts(self, statuses=('running', 'generated')) -> Set[Path]:
+        """Files checkpointed by jobs in these statuses, which output retention must keep."""
+        marks = ', '.join('?' * len(statuses))
+        with self._db() as db:
+            rows = db.execute(
+                'SELECT c.value FROM checkpoints c JOIN jobs j ON j.id = c.job_id '
+                f"WHERE c.kind = 'path' AND j.status IN ({marks})",
+                tuple(statuses)
+            )
+            return {Path(row['value']) for row in rows}
+
+    def start(self, job_id: str):
+        with self._db() as db:
+            db.execute(
+                "UPDATE jobs SET status = 'running', error = NULL, attempts = attempts + 1, updated_at = ? "
+                'WHERE id = ?',
+                (_now(), job_id)
+            )
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None):
+        with self._db() as db:
+            db.execute(
+                'UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?',
+                (status, error, _now(), job_id)
+            )
+
+    def checkpoint(self, job_id: str, stage: str, value: Any, meta: Optional[Dict[str, Any]] = None):
+        """Records a stage output; blocking (hashes files), run it off the event loop."""
+        if isinstance(value, Path):
+            kind, sha256, size = 'path', file_sha256(value), value.stat().st_size
+        else:
+            kind, sha256, size = 'json', None, None
+            value = json.dumps(value, ensure_ascii=False)
+        with self._db() as db:
+            # Re-recording a stage moves it to the end of the sequence
+            db.execute('DELETE FROM checkpoints WHERE job_id = ? AND stage = ?', (job_id, stage))
+            db.execute(
+                'INSERT INTO checkpoints (job_id, stage, kind, value, sha256, size, meta, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, stage, kind, str(value), sha256, size,
+                 json.dumps(meta, ensure_ascii=False) if meta else None, _now())
+            )
+            db.execute('UPDATE jobs SET updated_at = ? WHERE id = ?', (_now(), job_id))
+
+    def reset(self, job_id: str, stages: Optional[Iterable[str]] = None) -> int:
+        """Drops the checkpoints of `stages` (all when None); the caller includes their downstream stages."""
+        with self._db() as db:
+            if stages is None:
+                cursor = db.execute('DELETE FROM checkpoints WHERE job_id = ?', (job_id,))
+            else:
+                stages = list(stages)
+                marks = ', '.join('?' * len(stages))
+                cursor = db.execute(
+                    f'DELETE FROM checkpoints WHERE job_id = ? AND stage IN ({marks})', (job_id, *stages)
+                )
+            return cursor.rowcount
+
+    def restore(self, job_id: str, downstream: Callable[[Iterable[str]], Set[str]]) -> Dict[str, Checkpoint]:
+        """Checkpoints that are still valid, in stage order.
+
+        A file that is missing or whose size/hash changed invalidates its own
+        checkpoint and those `downstream` says were computed from it, so
+        those stages run again.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return {}
+        broken = set()
+        for stage, checkpoint in job.checkpoints.items():
+            if isinstance(checkpoint.value, Path):
+                path = checkpoint.value
+                intact = (
+                    path.exists()
+                    and path.stat().st_size == checkpoint.size
+                    and file_sha256(path) == checkpoint.sha256
+                )
+                if not intact:
+                    logger.warning(f'Job {job_id}: {stage} artifact changed or missing ({path}), re-running')
+                    broken.add(stage)
+        dropped = downstream(broken) if broken else set()
+        if dropped:
+            self.reset(job_id, dropped)
+        return {stage: checkpoint for stage, checkpoint in job.checkpoints.items() if stage not in dropped}
+
+    def set_state(self, key: str, value: Any):
+        """A small value shared with every process using this DB (e.g. the scheduler's plan for workers)."""
+        with self._db() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO state (key, value, updated_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), _now())
+            )
+
+    def state(self, key: str, default: Any = None) -> Any:
+        with self._db() as db:
+            row = db.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    @staticmethod
+    def _job(row) -> Job:
+        return Job(
+            row['id'], row['topic'], row['duration'], bool(row['publish']), row['status'],
+            row['error'], row['attempts'], row['created_at'], row['updated_at']
+        )
+
+    @staticmethod
+    def _checkpoint(row) -> Checkpoint:
+        value = Path(row['value']) if row['kind'] == 'path' else json.loads(row['value'])
+        meta = json.loads(row['meta']) if row['meta'] else {}
+        return Checkpoint(row['stage'], value, row['sha256'], row['size'], meta, row['seq'])
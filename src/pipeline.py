@@ -1,50 +1,305 @@
 import logging
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional, Set
+
+from .jobs import JobStore
+from .stage_graph import Stage, StageFailed, StageGraph, StageLimit, downstream
+from .utils import tracing
+from .utils import deps
+from .utils import llm
+from .utils.cache import ArtifactCache
+from .utils.executors import configure_executors, run_blocking, shutdown_executors
+from .utils.loop_monitor import LoopLagMonitor
+from .utils.outputs import OutputStore
 
 logger = logging.getLogger(__name__)
 
 class ContentPipeline:
     def __init__(self, config):
         self.config = config
+        self._http_client = None
+        self.stage_timings = {}
+        self.cache = ArtifactCache(config)
+        self.outputs = OutputStore(config)
+        cores = os.cpu_count() or 1
+        self.stage_limits = {
+            'llm': StageLimit(config.get('llm_concurrency', 4)),
+            'tts': StageLimit(config.get('tts_concurrency', 2)),
+            'render': StageLimit(config.get('render_concurrency') or cores),
+            'encode': StageLimit(config.get('encode_concurrency') or cores)
+        }
+        self.tracing = config.get('tracing_enabled', True)
+        self.trace_dir = Path(config.get('trace_dir', 'logs/traces'))
+        # Finished videos awaiting publish, so publish spans land in the video's own trace
+        self._traces = OrderedDict()
+        self.jobs = JobStore(config) if config.get('jobs_enabled', True) else None
+        self.fact_pool = None
+        if config.get('fact_pool_enabled', True):
+            from .fact_generator.pool import FactPool
+            self.fact_pool = FactPool(config)
+        # Stage kinds whose dependencies were found installed
+        self._checked_kinds = set()
+        # Blocking work that slipped onto the event loop shows up as late wake-ups
+        lag_warn = config.get('loop_lag_warn', 0.25)
+        self.loop_monitor = LoopLagMonitor(interval=0.1, warn=lag_warn) if lag_warn else None
+        configure_executors(config)
+        from .voice_synthesis.engine import configure_engines
+        configure_engines(config)
         logger.info('Pipeline initialized')
     
-    async def generate_video(self, topic: str, duration: int = 45) -> Optional[Path]:
+    @property
+    def http_client(self):
+        if self._http_client is None:
+            from .utils.http import create_http_client
+            self._http_client = create_http_client(self.config)
+        return self._http_client
+    
+    async def close(self):
+        if self.loop_monitor is not None:
+            await self.loop_monitor.stop()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        shutdown_executors()
+    
+    async def __aenter__(self):
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.close()
+    
+    async def generate_video(
+        self,
+        topic: str,
+        duration: int = 45,
+        publish: Optional[bool] = None,
+        job=None,
+        timings: Optional[dict] = None
+    ) -> Optional[Path]:
+        """`publish` only records on the job whether a resume should also publish.
+
+        `timings`, when given, is filled with this video's stage timings; with
+        concurrent videos stage_timings only holds the last one to finish.
+        """
+        if publish is None:
+            publish = self.config.get('auto_publish', False)
+        if self.jobs is not None and job is None:
+            job = await run_blocking(self.jobs.create, topic, duration, publish)
+        
+        trace = tracing.Trace('video', topic=topic, duration=duration, job=job.id if job else None)
+        with tracing.activate(trace), tracing.span('pipeline', topic=topic) as span:
+            final = await self._generate(topic, duration, job, timings)
+            span.set(**tracing.describe(final))
+            if final is None:
+                span.fail('no video')
+        
+        if final is not None:
+            self._traces[str(final)] = trace
+            while len(self._traces) > 64:
+                self._traces.popitem(last=False)
+        self._write_trace(trace, video=str(final) if final else None)
+        await self.collect_outputs()
+        return final
+    
+    async def collect_outputs(self, force: bool = False, dry_run: bool = False):
+        """Output retention, at most every output_gc_interval seconds unless forced; keeps unfinished jobs' files."""
+        if not force and not self.outputs.due():
+            return None
+        try:
+            keep = await run_blocking(self.jobs.artifacts) if self.jobs is not None else set()
+            return await run_blocking(self.outputs.collect, keep, dry_run)
+        except Exception as e:
+            logger.error(f'Output retention error: {e}')
+            return None
+    
+    def _write_trace(self, trace, **attributes):
+        if not self.tracing:
+            return
+        trace.attributes.update(attributes)
+        path = trace.write(self.trace_dir)
+        if path:
+            logger.info(f'Trace: {path}')
+    
+    async def resume(self, job_id: str) -> Optional[Path]:
+        """Re-runs a job from its last intact checkpoint, then publishes if the job asked for it."""
+        job = await run_blocking(self.jobs.get, job_id) if self.jobs else None
+        if job is None:
+            logger.error(f'Job not found: {job_id}')
+            return None
+        
+        final = await self.generate_video(job.topic, job.duration, publish=job.publish, job=job)
+        if final and job.publish:
+            await self.publish(final)
+        return final
+    
+    def build_stages(self, duration: int):
+        """The stages of one video; queue workers use it to run a single stage.
+
+        Returns the stage list and the VoiceSynthesizer whose segments compose reads.
+        """
+        from .fact_generator import FactGenerator
+        from .script_writer import ScriptWriter  
+        from .voice_synthesis import VoiceSynthesizer
+        from .video_generator import VideoGenerator
+        from .video_editor import VideoEditor
+        
+        fact_gen = FactGenerator(self.config, client=self.http_client, cache=self.cache, pool=self.fact_pool)
+        script_writer = ScriptWriter(self.config, client=self.http_client, cache=self.cache)
+        voice_synth = VoiceSynthesizer(self.config, cache=self.cache, store=self.outputs)
+        video_gen = VideoGenerator(self.config, client=self.http_client, cache=self.cache, store=self.outputs)
+        editor = VideoEditor(self.config, store=self.outputs)
+        
+        async def narrate(fact):
+            # A cached script is known up front, so the (cached) serial path is already instant
+            script = script_writer.cached(fact, duration)
+            if script:
+                return script, await voice_synth.synthesize(script)
+            return await voice_synth.synthesize_stream(script_writer.stream(fact, duration))
+        
+        if self.config.get('stream_script'):
+            narration = [
+                Stage('narration', narrate, inputs=('fact',), provides=('script', 'audio'), kind='tts')
+            ]
+        else:
+            narration = [
+                Stage('script', lambda fact: script_writer.write(fact, duration), inputs=('fact',), kind='llm'),
+                Stage(
+                    'audio',
+                    lambda script: voice_synth.synthesize(script),
+                    inputs=('script',),
+                    optional=True,
+                    kind='tts'
+                )
+            ]
+        
+        return [
+            Stage('fact', fact_gen.generate, inputs=('topic',), kind='llm'),
+            *narration,
+            Stage('video', lambda fact: video_gen.generate(fact, duration), inputs=('fact',), kind='render'),
+            Stage(
+                'final',
+                lambda video, audio, script: editor.compose(
+                    video, audio, script, duration=duration, segments=voice_synth.segments
+                ),
+                inputs=('video', 'audio', 'script'),
+                kind='encode'
+            )
+        ], voice_synth
+    
+    def downstream(self, names: Iterable[str]) -> Set[str]:
+        """Checkpoints `names` and everything computed from them, per the stages' inputs and outputs."""
+        stages, _ = self.build_stages(self.config.get('default_duration', 45))
+        stages.append(Stage('publish', None, inputs=('final',), kind='publish'))
+        return downstream(stages, names)
+    
+    async def _generate(self, topic: str, duration: int, job=None, timings: Optional[dict] = None) -> Optional[Path]:
         try:
             logger.info(f'Generating: {topic}')
             
-            from .fact_generator import FactGenerator
-            from .script_writer import ScriptWriter  
-            from .voice_synthesis import VoiceSynthesizer
-            from .video_generator import VideoGenerator
-            from .video_editor import VideoEditor
+            stages, voice_synth = self.build_stages(duration)
             
-            fact_gen = FactGenerator(self.config)
-            script_writer = ScriptWriter(self.config)
-            voice_synth = VoiceSynthesizer(self.config)
-            video_gen = VideoGenerator(self.config)
-            editor = VideoEditor(self.config)
+            checkpoints = {}
+            if job is not None:
+                await run_blocking(self.jobs.start, job.id)
+                checkpoints = await run_blocking(self.jobs.restore, job.id, self.downstream)
+                if checkpoints:
+                    logger.info(f'Resuming job {job.id}, done: {", ".join(checkpoints)}')
+            if 'audio' in checkpoints:
+                voice_synth.segments = [tuple(segment) for segment in checkpoints['audio'].meta.get('segments', [])]
+            initial = {name: checkpoint.value for name, checkpoint in checkpoints.items() if name != 'publish'}
             
-            fact = await fact_gen.generate(topic)
-            if not fact:
+            # Only the stages that will actually run need their libraries
+            kinds = {stage.kind for stage in stages if not all(name in initial for name in stage.outputs)}
+            absent = deps.missing(kinds - self._checked_kinds, self.config)
+            if absent:
+                error = f'missing dependencies: {", ".join(absent)}'
+                logger.error(f'{error} ({deps.describe(absent)})')
+                if job is not None:
+                    await run_blocking(self.jobs.finish, job.id, 'failed', error)
                 return None
+            self._checked_kinds |= kinds
             
-            script = await script_writer.write(fact, duration)
-            if not script:
-                return None
+            async def checkpoint(name, value):
+                if job is None:
+                    return
+                if hasattr(value, 'to_file'):
+                    # In-memory audio has no file to checkpoint unless the cache wrote one; a resume voices it again
+                    if not value.written:
+                        return
+                    value = value.path
+                meta = {'segments': voice_synth.segments} if name == 'audio' else None
+                try:
+                    await run_blocking(self.jobs.checkpoint, job.id, name, value, meta)
+                except Exception as e:
+                    logger.error(f'Checkpoint error ({name}): {e}')
             
-            audio_path = await voice_synth.synthesize(script)
-            video_path = await video_gen.generate(fact, duration)
+            graph = StageGraph(
+                stages,
+                concurrent=self.config.get('concurrent_stages', True),
+                limits=self.stage_limits,
+                on_output=checkpoint
+            )
             
-            final = await editor.compose(video_path, audio_path, script)
+            try:
+                with llm.deadline(self.config.get('video_budget')):
+                    results = await graph.run(topic=topic, **initial)
+            except StageFailed as e:
+                logger.error(f'{e} ({graph.summary()})')
+                if job is not None:
+                    await run_blocking(self.jobs.finish, job.id, 'failed', str(e))
+                return None
+            finally:
+                self.stage_timings = graph.timings
+                if timings is not None:
+                    timings.update(graph.timings)
             
+            final = results['final']
+            if job is not None:
+                await run_blocking(self.jobs.finish, job.id, 'generated' if job.publish else 'done')
+            if graph.timings:
+                logger.info(f'Stages: {graph.summary()}')
+            if self.cache.enabled:
+                logger.info(f'Cache: {self.cache.stats()}')
             logger.info(f'Done: {final}')
             return final
         except Exception as e:
             logger.error(f'Error: {e}')
+            if job is not None:
+                await run_blocking(self.jobs.finish, job.id, 'failed', str(e))
             return None
     
-    async def publish(self, video_path, platforms=None):
-        from .publisher import ContentPublisher
-        publisher = ContentPublisher(self.config)
-        return await publisher.publish(video_path, platforms)
\ No newline at end of file
+    async def publish(self, video_path, platforms=None, update_job: bool = True):
+        """update_job=False records published platforms but leaves the job status to the caller (queue workers)."""
+        from .publisher import ContentPublisher, PublishResult, publish_error
+        publisher = ContentPublisher(self.config, client=self.http_client)
+        if platforms is None:
+            platforms = publisher.enabled_platforms()
+        
+        # A resumed job skips platforms that already have the video
+        job_id = await run_blocking(self.jobs.find, 'final', video_path) if self.jobs else None
+        done = []
+        if job_id:
+            job = await run_blocking(self.jobs.get, job_id)
+            if job and 'publish' in job.checkpoints:
+                done = [platform for platform in job.checkpoints['publish'].value if platform in platforms]
+        pending = [platform for platform in platforms if platform not in done]
+        
+        results = {platform: PublishResult(platform, 'published') for platform in done}
+        trace = self._traces.pop(str(video_path), None) or tracing.Trace('publish', video=str(video_path))
+        if pending or not done:
+            with tracing.activate(trace):
+                results.update(await publisher.publish(video_path, pending))
+        published = [platform for platform, result in results.items() if result.ok]
+        self._write_trace(trace, published=published)
+        
+        if job_id:
+            await run_blocking(self.jobs.checkpoint, job_id, 'publish', published)
+        if job_id and update_job:
+            # Skipped counts too: a job is only done once every platform has the video
+            error = publish_error(results)
+            await run_blocking(self.jobs.finish, job_id, 'failed' if error else 'done', error)
+        return results
\ No newline at end of file
@@ -1,77 +1,185 @@
+import asyncio
 import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from ..utils import tracing
+from ..utils.executors import run_blocking
+from ..utils.http import http_session
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class PublishResult:
+    platform: str
+    status: str
+    bytes_sent: int = 0
+    latency: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'published'
+
+
+def publish_error(results: Dict[str, PublishResult]) -> Optional[str]:
+    """Why a publish did not succeed (a platform skipped or failed, or none at all); None when all got the video."""
+    if not results:
+        return 'no platforms to publish to'
+    missing = [f'{platform} ({result.status})' for platform, result in results.items() if not result.ok]
+    return f'not published: {", ".join(missing)}' if missing else None
+
+
+class _RetryableError(Exception):
+    pass
+
+
 class ContentPublisher:
-    def __init__(self, config):
+    def __init__(self, config, client=None):
         self.config = config
+        self.client = client
         self.blotato_api_key = config.get('blotato_api_key')
-    
+        self.upload_url = config.get('blotato_upload_url', 'https://api.blotato.com/v1/upload')
+        self.concurrency = config.get('publish_concurrency', 3)
+        self.retries = config.get('publish_retries', 3)
+        self.backoff = config.get('publish_backoff', 1.0)
+
+    def enabled_platforms(self) -> List[str]:
+        platforms = []
+        if self.config.get('publish_to_tiktok'):
+            platforms.append('tiktok')
+        if self.config.get('publish_to_instagram'):
+            platforms.append('instagram')
+        if self.config.get('publish_to_youtube'):
+            platforms.append('youtube')
+        return platforms
+
     async def publish(
         self,
         video_path: Path,
         platforms: Optional[List[str]] = None
-    ) -> bool:
+    ) -> Dict[str, PublishResult]:
         if platforms is None:
-            platforms = []
-            if self.config.get('publish_to_tiktok'):
-                platforms.append('tiktok')
-            if self.config.get('publish_to_instagram'):
-                platforms.append('instagram')
-            if self.config.get('publish_to_youtube'):
-                platforms.append('youtube')
-        
+            platforms = self.enabled_platforms()
+
         if not platforms:
             logger.warning('No platforms enabled')
-            return False
-        
+            return {}
+
         try:
-            success_count = 0
-            
-            for platform in platforms:
-                if await self._publish_to_platform(video_path, platform):
-                    success_count += 1
-            
-            return success_count > 0
+            size = Path(video_path).stat().st_size
+            limit = asyncio.Semaphore(self.concurrency)
+
+            async def publish_one(platform):
+                async with limit:
+                    return await self._publish_to_platform(video_path, platform, size)
+
+            results = await asyncio.gather(*(publish_one(platform) for platform in platforms))
+            return {result.platform: result for result in results}
         except Exception as e:
             logger.error(f'Publishing error: {e}')
-            return False
-    
-    async def _publish_to_platform(self, video_path: Path, platform: str) -> bool:
-        try:
-            if not self.blotato_api_key:
-                logger.warning(f'No API key for {platform}, skipping')
-                return False
-            
-            import httpx
-            
-            logger.info(f'Publishing to {platform}')
-            
-            # Blotato API
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                with open(video_path, 'rb') as video_file:
-                    files = {'video': video_file}
-                    data = {
-                        'title': 'Интересный факт! 🤯',
-                        'platform': platform
-                    }
-                    headers = {'Authorization': f'Bearer {self.blotato_api_key}'}
-                    
-                    response = await client.post(
-                        'https://api.blotato.com/v1/upload',
-                        files=files,
-                        data=data,
-                        headers=headers
-                    )
-                    
-                    if response.status_code == 200:
-                        logger.info(f'✅ Published to {platform}')
-                        return True
-                    else:
-                        logger.error(f'{platform} error: {response.status_code}')
-                        return False
-        except Exception as e:
-            logger.error(f'{platform} publish error: {e}')
-            return False
\ No newline at end of file
+            return {platform: PublishResult(platform, 'failed', error=str(e)) for platform in platforms}
+
+    async def _publish_to_platform(self, video_path: Path, platform: str, size: int) -> PublishResult:
+        with tracing.span('publish', platform=platform, bytes=size) as span:
+            result = await self._publish_with_retries(video_path, platform, size)
+            span.set(status=result.status, attempts=result.attempts, bytes_sent=result.bytes_sent)
+            if result.status == 'failed':
+                span.fail(result.error)
+            return result
+
+    async def _publish_with_retries(self, video_path: Path, platform: str, size: int) -> PublishResult:
+        result = PublishResult(platform, 'failed')
+        if not self.blotato_api_key:
+            logger.warning(f'No API key for {platform}, skipping')
+            result.status = 'skipped'
+            return result
+
+        logger.info(f'Publishing to {platform}')
+        start = time.perf_counter()
+
+        # Blotato takes a single multipart POST with no resumable-upload protocol,
+        # so a retry re-streams the file from the start
+        for attempt in range(1, self.retries + 2):
+            result.attempts = attempt
+            try:
+                result.bytes_sent = await self._upload(video_path, platform, size)
+                result.status = 'published'
+                result.error = None
+                logger.info(f'✅ Published to {platform}')
+                break
+            except _RetryableError as e:
+                result.error = str(e)
+            except Exception as e:
+                if not self._is_transport_error(e):
+                    result.error = str(e)
+                    break
+                result.error = f'{type(e).__name__}: {e}'
+
+            if attempt <= self.retries:
+                delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logger.warning(f'{platform} upload failed ({result.error}), retry in {delay:.1f}s')
+                await asyncio.sleep(delay)
+
+        if not result.ok:
+            logger.error(f'{platform} publish error: {result.error}')
+        result.latency = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def _is_transport_error(error: Exception) -> bool:
+        import httpx
+        return isinstance(error, (httpx.TransportError, httpx.TimeoutException))
+
+    async def _upload(self, video_path: Path, platform: str, size: int) -> int:
+        boundary = uuid.uuid4().hex
+        fields = {
+            'title': 'Интересный факт! 🤯',
+            'platform': platform
+        }
+
+        head = b''.join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            for name, value in fields.items()
+        )
+        head += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="video"; '
+            f'filename="{Path(video_path).name}"\r\nContent-Type: video/mp4\r\n\r\n'
+        ).encode()
+        tail = f'\r\n--{boundary}--\r\n'.encode()
+        sent = 0
+
+        async def body():
+            nonlocal sent
+            yield head
+            with open(video_path, 'rb') as video_file:
+                while True:
+                    chunk = await run_blocking(video_file.read, CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sent += len(chunk)
+                    yield chunk
+            yield tail
+
+        headers = {
+            'Authorization': f'Bearer {self.blotato_api_key}',
+            'Content-Type': f'multipart/form-data; boundary={boundary}',
+            'Content-Length': str(len(head) + size + len(tail))
+        }
+
+        async with http_session(self.client, timeout=120.0) as client:
+            response = await client.post(self.upload_url, content=body(), headers=headers, timeout=120.0)
+
+        if response.status_code == 200:
+            return sent
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _RetryableError(f'HTTP {response.status_code}')
+        raise RuntimeError(f'HTTP {response.status_code}')
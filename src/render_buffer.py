@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .jobs import Job
+from .utils.executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class RenderBuffer:
+    """Finished, unpublished videos rendered ahead of the publish slots.
+
+    Entries are jobs in the job store with status 'generated' (video ready,
+    publish pending), so the buffer survives restarts and a slot only has to
+    upload. Refills run between slots: never inside the guard window before
+    the next one, nor when the last render would not finish before it.
+    """
+
+    def __init__(self, config: Dict[str, Any], pipeline, coordinator=None):
+        self.pipeline = pipeline
+        self.coordinator = coordinator
+        self.size = config.get('render_ahead', 2)
+        self.max_bytes = config.get('render_ahead_max_mb', 4096) * 2**20
+        self.max_age = timedelta(hours=config.get('render_ahead_max_age', 48))
+        self.guard = timedelta(minutes=config.get('render_ahead_guard', 15))
+        self.duration = config.get('default_duration', 45)
+        self.retry_delay = 300.0
+        self.last_render = 0.0
+        self._wake = asyncio.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and self.pipeline.jobs is not None
+
+    def entries(self) -> List[Job]:
+        """Buffered jobs, oldest first; expired ones are dropped and their video left to output retention."""
+        jobs = self.pipeline.jobs
+        now = datetime.now()
+        entries = []
+        for job in reversed(jobs.list(status='generated', limit=max(self.size * 4, 20))):
+            final = job.checkpoints.get('final')
+            if final is None:
+                continue
+            if now - datetime.fromisoformat(job.created_at) > self.max_age:
+                # The final may be shared with another job (content-addressed, hardlinked); OutputStore
+                # removes it once no unfinished job needs it and its grace period is over
+                logger.info(f'Render-ahead: job {job.id} expired, {final.value} left to output retention')
+                jobs.finish(job.id, 'expired', 'too old for the render-ahead buffer')
+                continue
+            entries.append(job)
+        return entries
+
+    def take(self) -> Optional[Path]:
+        """The oldest buffered video that is still intact; blocking (verifies the file)."""
+        jobs = self.pipeline.jobs
+        for job in self.entries():
+            final = jobs.restore(job.id, self.pipeline.downstream).get('final')
+            if final is None:
+                jobs.finish(job.id, 'failed', 'buffered video missing or changed')
+                continue
+            return final.value
+        return None
+
+    def wake(self):
+        """Re-checks the buffer now (after a slot consumed an entry)."""
+        self._wake.set()
+
+    def _refill_delay(self, slot: Optional[datetime]) -> float:
+        """Seconds until the next refill may start, 0 to start now."""
+        entries = self.entries()
+        if len(entries) >= self.size:
+            return 600.0
+        used = sum(job.checkpoints['final'].size or 0 for job in entries)
+        if used >= self.max_bytes:
+            logger.warning(f'Render-ahead: {used / 2**20:.0f} MiB buffered, over the disk limit')
+            return 600.0
+        if slot is not None:
+            until = slot - datetime.now(slot.tzinfo)
+            margin = max(self.guard, timedelta(seconds=self.last_render * 1.5))
+            if until < margin:
+                # The slot wakes the buffer once it has published
+                return max(until.total_seconds(), 0.0) + 60.0
+        return 0.0
+
+    async def _render(self, topic: str) -> bool:
+        start = time.monotonic()
+        if self.coordinator is not None:
+            job_id = await self.coordinator.submit(topic, self.duration, publish=False)
+            job = (await self.coordinator.wait([job_id])).get(job_id)
+            ok = job is not None and job.status == 'done'
+            if ok:
+                await run_blocking(self.pipeline.jobs.finish, job_id, 'generated')
+        else:
+            final = await self.pipeline.generate_video(topic, self.duration, publish=True)
+            ok = final is not None
+        self.last_render = time.monotonic() - start
+        logger.info(f'Render-ahead: {topic} {"buffered" if ok else "failed"} in {self.last_render:.0f}s')
+        return ok
+
+    async def run(self, next_topic: Callable[[], str], next_slot: Callable[[], Optional[datetime]]):
+        """Keeps the buffer filled until cancelled."""
+        while True:
+            try:
+                delay = await run_blocking(self._refill_delay, next_slot())
+                if delay == 0 and not await self._render(next_topic()):
+                    delay = self.retry_delay
+            except Exception as e:
+                logger.error(f'Render-ahead error: {e}')
+                delay = self.retry_delay
+            if delay:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
@@ -1,22 +1,39 @@
 import asyncio
 import logging
+import time
 from datetime import datetime
-from typing import Dict
+from typing import Dict, Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
+from .render_buffer import RenderBuffer
+from .utils import tracing
+from .utils.executors import run_blocking
+from .utils.llm import LLMClient
+from .utils.metrics import Metrics
+
 logger = logging.getLogger(__name__)
 
 class ContentScheduler:
-    def __init__(self, pipeline, config: Dict):
+    def __init__(self, pipeline, config: Dict, coordinator=None):
         self.pipeline = pipeline
         self.config = config
+        # In worker mode videos go through the task queue instead of this process
+        self.coordinator = coordinator
         self.scheduler = AsyncIOScheduler()
         
         self.videos_per_day = config.get('videos_per_day', 3)
         self.generation_hours = config.get('generation_hours', ['09:00', '15:00', '21:00'])
         self.topics = config.get('default_topics', ['космос', 'наука'])
         self.current_topic_index = 0
+        self.metrics = Metrics(config, pipeline)
+        # Videos rendered between slots, so a slot only uploads
+        self.buffer = RenderBuffer(config, pipeline, coordinator) if config.get('auto_publish') else None
+        self._refill = None
+        # Ollama keeps the model loaded between close slots and loads it ahead of the others
+        self.prewarm_lead = config.get('llm_prewarm_lead', 120)
+        self.keep_alive_max = config.get('llm_keep_alive_max', 10800)
+        self.llm = None
         
         logger.info(f'Scheduler: {self.videos_per_day} videos/day')
     
@@ -25,24 +42,92 @@ class ContentScheduler:
         self.current_topic_index = (self.current_topic_index + 1) % len(self.topics)
         return topic
     
+    def _next_slot(self) -> Optional[datetime]:
+        times = [job.next_run_time for job in self.scheduler.get_jobs() if job.id.startswith('gen_')]
+        times = [t for t in times if t is not None]
+        return min(times) if times else None
+    
+    async def _plan_keep_alive(self) -> Optional[float]:
+        """Through the next slot if it is within LLM_KEEP_ALIVE_MAX, else Ollama unloads after LLM_KEEP_ALIVE.
+
+        Returns the planned unload time. It is also stored in the job DB, where
+        queue workers read it before each LLM stage.
+        """
+        if self.llm is None:
+            return None
+        slot = self._next_slot()
+        until = None
+        if slot is not None:
+            gap = (slot - datetime.now(slot.tzinfo)).total_seconds()
+            if gap <= self.keep_alive_max:
+                until = slot.timestamp() + self.prewarm_lead
+        self.llm.keep_loaded(until)
+        if self.pipeline.jobs is not None:
+            try:
+                await run_blocking(self.pipeline.jobs.set_state, 'llm_keep_until', until)
+            except Exception as e:
+                logger.error(f'Keep-alive plan not shared with workers: {e}')
+        if until is not None:
+            logger.info(f'LLM keep_alive {until - time.time():.0f}s, through the {slot:%H:%M} slot')
+        return until
+    
+    async def prewarm(self):
+        """Loads the model shortly before a slot, so the slot's first LLM call does not wait for it."""
+        await self._plan_keep_alive()
+        await self.llm.warm()
+    
+    async def _publish_buffered(self) -> bool:
+        fired = time.monotonic()
+        video_path = await run_blocking(self.buffer.take)
+        if video_path is None:
+            logger.warning('Render-ahead buffer empty, generating now')
+            return False
+        
+        with tracing.span('slot', source='buffer'):
+            results = await self.pipeline.publish(video_path)
+        published = [platform for platform, result in results.items() if result.ok]
+        logger.info(
+            f'✅ Published {video_path.name} {time.monotonic() - fired:.1f}s after the slot '
+            f'({", ".join(published) or "not published"})'
+        )
+        self.buffer.wake()
+        return True
+    
     async def generate_and_publish(self):
         try:
+            await self._plan_keep_alive()
+            if self.buffer is not None and self.buffer.enabled and await self._publish_buffered():
+                return
+            
             topic = self._get_next_topic()
             logger.info(f'Scheduled: {topic}')
             
-            video_path = await self.pipeline.generate_video(
-                topic=topic,
-                duration=self.config.get('default_duration', 45)
-            )
+            if self.coordinator is not None:
+                with self.metrics.video():
+                    job_id = await self.coordinator.submit(topic, self.config.get('default_duration', 45))
+                    job = (await self.coordinator.wait([job_id])).get(job_id)
+                if job is not None and job.status == 'done':
+                    logger.info(f'✅ Complete: {topic} (job {job_id})')
+                else:
+                    logger.error(f'Job {job_id} failed: {job.error if job else "missing"}')
+                return
             
-            if video_path and self.config.get('auto_publish'):
-                await self.pipeline.publish(video_path)
-                logger.info(f'✅ Complete: {topic}')
+            with self.metrics.video():
+                video_path = await self.pipeline.generate_video(
+                    topic=topic,
+                    duration=self.config.get('default_duration', 45)
+                )
+                
+                if video_path and self.config.get('auto_publish'):
+                    results = await self.pipeline.publish(video_path)
+                    published = [platform for platform, result in results.items() if result.ok]
+                    logger.info(f'✅ Complete: {topic} ({", ".join(published) or "not published"})')
         except Exception as e:
             logger.error(f'Scheduled task error: {e}')
     
     async def start(self):
         logger.info('Starting scheduler...')
+        self.metrics.start()
         
         for hour_str in self.generation_hours:
             hour, minute = map(int, hour_str.split(':'))
@@ -52,12 +137,30 @@ class ContentScheduler:
                 id=f'gen_{hour}_{minute}'
             )
             logger.info(f'Scheduled: {hour_str}')
+            
+            if self.prewarm_lead > 0:
+                at = (hour * 3600 + minute * 60 - int(self.prewarm_lead)) % 86400
+                self.scheduler.add_job(
+                    self.prewarm,
+                    CronTrigger(hour=at // 3600, minute=at % 3600 // 60, second=at % 60),
+                    id=f'warm_{hour}_{minute}'
+                )
         
+        self.llm = LLMClient(self.config, client=self.pipeline.http_client)
         self.scheduler.start()
+        await self._plan_keep_alive()
         logger.info('✅ Scheduler running')
         
+        if self.buffer is not None and self.buffer.enabled:
+            self._refill = asyncio.create_task(self.buffer.run(self._get_next_topic, self._next_slot))
+            logger.info(f'Render-ahead: keeping {self.buffer.size} videos ready')
+        
         try:
             while True:
                 await asyncio.sleep(60)
         except KeyboardInterrupt:
-            self.scheduler.shutdown()
\ No newline at end of file
+            self.scheduler.shutdown()
+        finally:
+            if self._refill is not None:
+                self._refill.cancel()
+            self.metrics.stop()
\ No newline at end of file
@@ -1,23 +1,28 @@
 import logging
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from ..utils.llm import LLMClient
+from ..utils.text import SentenceSplitter
 
 logger = logging.getLogger(__name__)
 
 class ScriptWriter:
-    def __init__(self, config):
+    def __init__(self, config, client=None, cache=None):
         self.config = config
-        self.ollama_host = config.get('ollama_host')
-        self.model = config.get('ollama_model')
+        self.client = client
+        self.cache = cache
+        self.llm = LLMClient(config, client)
+        self.model = self.llm.model
+        self.reuse_context = config.get('llm_reuse_context', True)
     
-    async def write(self, fact: str, duration: int, style: str = 'energetic') -> Optional[str]:
-        try:
-            import httpx
-            
-            word_count = int(duration * 2.5)
-            
-            prompt = f"""Создай сценарий для короткого видео ({duration} сек):
+    def _prompt(self, fact: str, duration: int, style: str, in_context: bool = False) -> str:
+        word_count = int(duration * 2.5)
+        # Continuing the single-fact call's conversation, the model already has the fact
+        fact_line = 'тот, что ты только что нашёл' if in_context else fact
+        
+        return f"""Создай сценарий для короткого видео ({duration} сек):
 
-Факт: {fact}
+Факт: {fact_line}
 
 Структура:
 1. Хук (3 сек) - зацепить внимание
@@ -28,18 +33,66 @@ class ScriptWriter:
 Длина: ~{word_count} слов
 
 Только текст сценария, без комментариев."""
+    
+    def _cache_key(self, prompt: str, duration: int) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.key('script', model=self.model, prompt=prompt, duration=duration)
+    
+    def cached(self, fact: str, duration: int, style: str = 'energetic') -> Optional[str]:
+        cache_key = self._cache_key(self._prompt(fact, duration, style), duration)
+        return self.cache.get_json(cache_key) if cache_key else None
+    
+    def _request(self, fact: str, duration: int, style: str) -> Tuple[str, Dict[str, Any]]:
+        """Prompt and options for Ollama: continue from the fact reply's context while it is fresh.
+
+        Only a fact from a single fact call has one (its context holds that
+        fact alone), so a pooled fact is always named in full. The cache key
+        uses the standalone prompt either way.
+        """
+        context = self.llm.context(fact) if self.reuse_context else None
+        if context is None:
+            return self._prompt(fact, duration, style), {}
+        return self._prompt(fact, duration, style, in_context=True), {'context': context}
+    
+    async def write(self, fact: str, duration: int, style: str = 'energetic') -> Optional[str]:
+        try:
+            prompt = self._prompt(fact, duration, style)
+            cache_key = self._cache_key(prompt, duration)
+            if cache_key:
+                cached = self.cache.get_json(cache_key)
+                if cached:
+                    logger.info(f'Script (cached): {len(cached.split())} words')
+                    return cached
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f'{self.ollama_host}/api/generate',
-                    json={'model': self.model, 'prompt': prompt, 'stream': False}
-                )
-                
-                if response.status_code == 200:
-                    script = response.json().get('response', '').strip()
-                    logger.info(f'Script: {len(script.split())} words')
-                    return script
-                return None
+            request, options = self._request(fact, duration, style)
+            script = (await self.llm.generate(request, op='script', **options)).strip()
+            logger.info(f'Script: {len(script.split())} words')
+            if cache_key and script:
+                self.cache.put_json(cache_key, script)
+            return script or None
         except Exception as e:
             logger.error(f'Script error: {e}')
-            return None
\ No newline at end of file
+            return None
+    
+    async def stream(self, fact: str, duration: int, style: str = 'energetic') -> AsyncIterator[str]:
+        """Yields the script sentence by sentence while Ollama is still generating it."""
+        prompt = self._prompt(fact, duration, style)
+        splitter = SentenceSplitter()
+        sentences = []
+        
+        request, options = self._request(fact, duration, style)
+        async for text in self.llm.stream(request, op='script', **options):
+            for sentence in splitter.feed(text):
+                sentences.append(sentence)
+                yield sentence
+        
+        for sentence in splitter.flush():
+            sentences.append(sentence)
+            yield sentence
+        
+        script = ' '.join(sentences)
+        logger.info(f'Script (streamed): {len(script.split())} words')
+        cache_key = self._cache_key(prompt, duration)
+        if cache_key and script:
+            self.cache.put_json(cache_key, script)
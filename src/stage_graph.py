@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .utils import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class StageFailed(Exception):
+    def __init__(self, stage: str):
+        super().__init__(f'Stage failed: {stage}')
+        self.stage = stage
+
+
+class StageLimit(asyncio.Semaphore):
+    """Semaphore that also counts the stages waiting on it (queue depth for metrics)."""
+
+    def __init__(self, value: int = 1):
+        super().__init__(value)
+        self.waiting = 0
+
+    async def acquire(self):
+        self.waiting += 1
+        try:
+            return await super().acquire()
+        finally:
+            self.waiting -= 1
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    inputs: Tuple[str, ...] = ()
+    # When set, run() returns a tuple that is unpacked into these outputs instead of `name`
+    provides: Tuple[str, ...] = ()
+    # Optional stages may return None without failing the graph
+    optional: bool = False
+    # Resource class (llm, tts, render, encode) whose concurrency limit the stage runs under
+    kind: Optional[str] = None
+
+    @property
+    def outputs(self) -> Tuple[str, ...]:
+        return self.provides or (self.name,)
+
+
+def downstream(stages: List[Stage], names) -> Set[str]:
+    """`names` plus every output computed from them, directly or not, which must be redone with them.
+
+    Outputs of a stage that produces one of them come along too, since that
+    stage runs again as a whole.
+    """
+    affected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for stage in stages:
+            if affected.isdisjoint(stage.inputs) and affected.isdisjoint(stage.outputs):
+                continue
+            if not affected.issuperset(stage.outputs):
+                affected.update(stage.outputs)
+                changed = True
+    return affected
+
+
+class StageGraph:
+    """Runs async stages as soon as their declared inputs are available.
+
+    ``limits`` maps a stage kind to a semaphore shared with other graphs, so
+    concurrent videos queue per resource instead of all hitting it at once.
+    Stages whose outputs are all passed to ``run`` (checkpoints of a resumed
+    job) are skipped; ``on_output`` is awaited for every new output.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        concurrent: bool = True,
+        limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+        on_output: Optional[Callable[[str, Any], Awaitable[None]]] = None
+    ):
+        self.stages = stages
+        self.concurrent = concurrent
+        self.limits = limits or {}
+        self.on_output = on_output
+        self.producers = {output: stage for stage in stages for output in stage.outputs}
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    async def run(self, **initial) -> Dict[str, Any]:
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name not in self.producers and name not in initial]
+            if missing:
+                raise ValueError(f'Stage {stage.name} has unknown inputs: {missing}')
+
+        results = dict(initial)
+        ready = {output: asyncio.Event() for output in self.producers}
+        for name in initial:
+            if name in ready:
+                ready[name].set()
+        pending = [stage for stage in self.stages if not all(name in initial for name in stage.outputs)]
+        self.timings = {}
+        origin = time.perf_counter()
+
+        async def run_stage(stage: Stage):
+            for name in stage.inputs:
+                if name in ready:
+                    await ready[name].wait()
+
+            queued = time.perf_counter()
+            limit = self.limits.get(stage.kind)
+            if limit is not None:
+                await limit.acquire()
+            try:
+                start = time.perf_counter()
+                with tracing.span(stage.name, kind=stage.kind, queued=round(start - queued, 3)) as span:
+                    value = await stage.run(**{name: results[name] for name in stage.inputs})
+                    values = value if stage.provides else (value,)
+                    empty = value is None or any(v is None for v in values)
+                    if empty:
+                        span.set(result=None)
+                        if not stage.optional:
+                            span.fail('no result')
+                    elif stage.provides:
+                        for name, output in zip(stage.outputs, values):
+                            span.set(**{f'{name}_{key}': v for key, v in tracing.describe(output).items()})
+                    else:
+                        span.set(**tracing.describe(value))
+                end = time.perf_counter()
+            finally:
+                if limit is not None:
+                    limit.release()
+            self.timings[stage.name] = {
+                'start': start - origin,
+                'end': end - origin,
+                'duration': end - start,
+                'queued': start - queued
+            }
+
+            if empty:
+                if not stage.optional:
+                    raise StageFailed(stage.name)
+                values = (None,) * len(stage.outputs)
+
+            # Outputs are recorded before dependents start, so a failure downstream cannot lose them
+            if self.on_output and not empty:
+                for name, output in zip(stage.outputs, values):
+                    await self.on_output(name, output)
+            for name, output in zip(stage.outputs, values):
+                results[name] = output
+                ready[name].set()
+
+        if not self.concurrent:
+            for stage in pending:
+                await run_stage(stage)
+            return results
+
+        tasks = [asyncio.create_task(run_stage(stage)) for stage in pending]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return results
+
+    def critical_path(self) -> List[str]:
+        """Walks back from the last stage to finish through whichever input arrived last."""
+        if not self.timings:
+            return []
+
+        path = []
+        current = self._stage(max(self.timings, key=lambda name: self.timings[name]['end']))
+        while current is not None:
+            path.append(current.name)
+            upstream = [self.producers[name] for name in current.inputs if name in self.producers]
+            upstream = [stage for stage in upstream if stage.name in self.timings]
+            current = max(upstream, key=lambda stage: self.timings[stage.name]['end'], default=None)
+        return list(reversed(path))
+
+    def _stage(self, name: str) -> Stage:
+        return next(stage for stage in self.stages if stage.name == name)
+
+    def summary(self) -> str:
+        stages = ', '.join(
+            f'{name} {t["duration"]:.2f}s' + (f' (+{t["queued"]:.2f}s queued)' if t['queued'] >= 0.01 else '')
+            for name, t in self.timings.items()
+        )
+        total = max((t['end'] for t in self.timings.values()), default=0.0)
+        return f'{stages} | critical path: {" → ".join(self.critical_path())} | wall {total:.2f}s'
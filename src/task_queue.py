@@ -0,0 +1,171 @@
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .jobs import open_db
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    error TEXT,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (job_id, stage)
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (status, kind, available_at);
+'''
+
+
+@dataclass
+class Task:
+    id: int
+    job_id: str
+    stage: str
+    kind: str
+    status: str
+    attempts: int = 0
+    worker: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TaskQueue:
+    """Durable stage-task queue in the job store's SQLite file.
+
+    Workers claim tasks of their kind under a lease they keep extending; a
+    task whose worker died is handed out again once the lease runs out.
+    Statuses: queued, running, done, failed.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.path = Path(config.get('jobs_db', 'data/jobs.db'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease = config.get('task_lease', 60.0)
+        self.max_attempts = config.get('task_attempts', 3)
+        with open_db(self.path) as db:
+            db.executescript(SCHEMA)
+
+    def enqueue(self, job_id: str, stage: str, kind: str) -> bool:
+        """Adds a task unless the job already has one for this stage; returns whether it was added."""
+        now = time.time()
+        with open_db(self.path) as db:
+            cursor = db.execute(
+                'INSERT OR IGNORE INTO tasks (job_id, stage, kind, status, available_at, created_at, updated_at) '
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, stage, kind, now, now, now)
+            )
+            return cursor.rowcount > 0
+
+    def claim(self, kinds: Sequence[str], worker: str) -> Optional[Task]:
+        now = time.time()
+        marks = ', '.join('?' for _ in kinds)
+        with open_db(self.path) as db:
+            # IMMEDIATE takes the write lock up front, so two workers cannot claim the same row
+            db.execute('BEGIN IMMEDIATE')
+            expired = db.execute(
+                "SELECT id, attempts FROM tasks WHERE status = 'running' AND lease_until < ?", (now,)
+            ).fetchall()
+            for row in expired:
+                status = 'queued' if row['attempts'] < self.max_attempts else 'failed'
+                db.execute(
+                    "UPDATE tasks SET status = ?, worker = NULL, error = 'lease expired', updated_at = ? WHERE id = ?",
+                    (status, now, row['id'])
+                )
+                logger.warning(f'Task {row["id"]}: lease expired, {status}')
+
+            row = db.execute(
+                f"SELECT * FROM tasks WHERE status = 'queued' AND kind IN ({marks}) AND available_at <= ? "
+                'ORDER BY available_at, id LIMIT 1',
+                (*kinds, now)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE tasks SET status = 'running', worker = ?, attempts = attempts + 1, "
+                'lease_until = ?, updated_at = ? WHERE id = ?',
+                (worker, now + self.lease, now, row['id'])
+            )
+        task = self._task(row)
+        task.status, task.worker, task.attempts = 'running', worker, task.attempts + 1
+        return task
+
+    def heartbeat(self, task_id: int, worker: str) -> bool:
+        now = time.time()
+        with open_db(self.path) as db:
+            cursor = db.execute(
+                "UPDATE tasks SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (now + self.lease, now, task_id, worker)
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, task_id: int):
+        with open_db(self.path) as db:
+            db.execute(
+                "UPDATE tasks SET status = 'done', error = NULL, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (time.time(), task_id)
+            )
+
+    def fail(self, task: Task, error: str, retry_delay: float = 0.0) -> bool:
+        """Requeues the task after retry_delay while attempts remain; returns whether it will run again."""
+        retry = task.attempts < self.max_attempts
+        now = time.time()
+        with open_db(self.path) as db:
+            db.execute(
+                'UPDATE tasks SET status = ?, error = ?, worker = NULL, lease_until = NULL, available_at = ?, '
+                'updated_at = ? WHERE id = ?',
+                ('queued' if retry else 'failed', error, now + retry_delay, now, task.id)
+            )
+        return retry
+
+    def requeue(self, job_id: str, stage: str):
+        """Runs a finished stage again (its output disappeared)."""
+        now = time.time()
+        with open_db(self.path) as db:
+            db.execute(
+                "UPDATE tasks SET status = 'queued', attempts = 0, error = NULL, available_at = ?, updated_at = ? "
+                'WHERE job_id = ? AND stage = ?',
+                (now, now, job_id, stage)
+            )
+
+    def drop(self, task_id: int):
+        with open_db(self.path) as db:
+            db.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+
+    def clear(self, job_id: str) -> int:
+        with open_db(self.path) as db:
+            return db.execute('DELETE FROM tasks WHERE job_id = ?', (job_id,)).rowcount
+
+    def tasks(self, job_id: str) -> List[Task]:
+        with open_db(self.path) as db:
+            return [self._task(row) for row in db.execute('SELECT * FROM tasks WHERE job_id = ? ORDER BY id', (job_id,))]
+
+    def pending(self) -> int:
+        """Tasks of any kind still queued or running."""
+        with open_db(self.path) as db:
+            return db.execute("SELECT COUNT(*) FROM tasks WHERE status IN ('queued', 'running')").fetchone()[0]
+
+    def depth(self) -> Dict[str, Dict[str, int]]:
+        """Task counts per kind and status, e.g. {'tts': {'queued': 3, 'running': 1}}."""
+        counts: Dict[str, Dict[str, int]] = {}
+        with open_db(self.path) as db:
+            for row in db.execute('SELECT kind, status, COUNT(*) AS n FROM tasks GROUP BY kind, status'):
+                counts.setdefault(row['kind'], {})[row['status']] = row['n']
+        return counts
+
+    @staticmethod
+    def _task(row) -> Task:
+        return Task(
+            row['id'], row['job_id'], row['stage'], row['kind'], row['status'],
+            row['attempts'], row['worker'], row['error']
+        )
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactCache:
+    """Content-addressed store for stage outputs.
+
+    Entries live at ``<root>/<key[:2]>/<key><suffix>`` and are written atomically
+    (temp file + rename). mtime is the write time used for the TTL, atime is
+    bumped on every hit and drives LRU eviction once the size limit is exceeded.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        settings = config.get('cache') or {}
+        self.enabled = config.get('cache_enabled', settings.get('enabled', True))
+        self.root = Path(config.get('cache_dir', 'cache')) / 'artifacts'
+        self.max_bytes = int(settings.get('max_size_mb', 1000) * 2**20)
+        self.ttl = config.get('cache_ttl', settings.get('ttl', 0))
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if self.enabled:
+            self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(kind: str, **parts) -> str:
+        payload = json.dumps({'kind': kind, **parts}, sort_keys=True, ensure_ascii=False, default=str)
+        return f'{kind}-{hashlib.sha256(payload.encode()).hexdigest()}'
+
+    def _path(self, key: str, suffix: str) -> Path:
+        digest = key.rsplit('-', 1)[-1]
+        return self.root / digest[:2] / f'{key}{suffix}'
+
+    def _count(self, key: str, hit: bool):
+        kind = key.rsplit('-', 1)[0]
+        counters = self.hits if hit else self.misses
+        with self._lock:
+            counters[kind] = counters.get(kind, 0) + 1
+        tracing.tag(**{f'cache_{kind}': 'hit' if hit else 'miss'})
+
+    def _lookup(self, key: str, suffix: str, count: bool = True) -> Optional[Path]:
+        if not self.enabled:
+            return None
+        path = self._path(key, suffix)
+        try:
+            stat = path.stat()
+            expired = self.ttl and time.time() - stat.st_mtime > self.ttl
+        except FileNotFoundError:
+            stat, expired = None, False
+        if expired:
+            path.unlink(missing_ok=True)
+        if stat is None or expired:
+            if count:
+                self._count(key, hit=False)
+            return None
+        # Bump atime only: mtime keeps the write time for the TTL
+        os.utime(path, (time.time(), stat.st_mtime))
+        if count:
+            self._count(key, hit=True)
+        return path
+
+    def _commit(self, key: str, suffix: str, write) -> Optional[Path]:
+        path = self._path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.evict()
+        return path
+
+    def get_json(self, key: str, count: bool = True) -> Optional[Any]:
+        """count=False reads sidecar metadata without touching the hit/miss counters."""
+        path = self._lookup(key, '.json', count)
+        if path is None:
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def put_json(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        data = json.dumps(value, ensure_ascii=False)
+        self._commit(key, '.json', lambda tmp: tmp.write_text(data, encoding='utf-8'))
+
+    def get_file(self, key: str, suffix: str) -> Optional[Path]:
+        return self._lookup(key, suffix)
+
+    def put_file(self, key: str, source: Path) -> Optional[Path]:
+        if not self.enabled:
+            return None
+
+        def write(tmp: Path):
+            try:
+                os.link(source, tmp)
+            except OSError:
+                shutil.copyfile(source, tmp)
+
+        return self._commit(key, Path(source).suffix, write)
+
+    def size(self) -> int:
+        return sum(path.stat().st_size for path in self.root.glob('*/*') if not path.name.startswith('.'))
+
+    def evict(self) -> int:
+        """Drops least recently used entries until the cache fits max_size_mb; returns bytes freed."""
+        with self._lock:
+            entries = []
+            for path in self.root.glob('*/*'):
+                if path.name.startswith('.'):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            freed = 0
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                freed += size
+
+        if freed:
+            logger.info(f'Cache evicted {freed / 2**20:.1f} MB')
+        return freed
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            'hits': dict(self.hits),
+            'misses': dict(self.misses),
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0
+        }
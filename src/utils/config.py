@@ -1,16 +1,31 @@
 import os
 from pathlib import Path
 from typing import Any, Dict
-import yaml
-from dotenv import load_dotenv
 
-load_dotenv()
+def _worker_counts(value: str) -> Dict[str, int]:
+    """WORKERS as {kind: count}; empty items (a trailing comma) are skipped."""
+    counts = {}
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        kind, _, count = item.partition('=')
+        kind, count = kind.strip(), count.strip()
+        if not kind or not count.isdigit():
+            raise ValueError(f"WORKERS: bad entry '{item}', expected kind=count (e.g. tts=2)")
+        counts[kind] = int(count)
+    return counts
 
 def load_config() -> Dict[str, Any]:
+    # Read here rather than at import, so importing the package stays side-effect free
+    from dotenv import load_dotenv
+    load_dotenv()
+    
     config = {}
     
     settings_path = Path('config/settings.yaml')
     if settings_path.exists():
+        import yaml
         with open(settings_path) as f:
             config.update(yaml.safe_load(f) or {})
     
@@ -18,14 +33,45 @@ def load_config() -> Dict[str, Any]:
         'ollama_host': os.getenv('OLLAMA_HOST', 'http://localhost:11434'),
         'ollama_model': os.getenv('OLLAMA_MODEL', 'qwen2.5:32b'),
         'ollama_temperature': float(os.getenv('OLLAMA_TEMPERATURE', '0.7')),
+        'stream_script': os.getenv('STREAM_SCRIPT', 'false').lower() == 'true',
+        'llm_timeout': float(os.getenv('LLM_TIMEOUT', '120')),
+        'llm_retries': int(os.getenv('LLM_RETRIES', '3')),
+        'llm_backoff': float(os.getenv('LLM_BACKOFF', '1.0')),
+        'llm_limit_min': int(os.getenv('LLM_LIMIT_MIN', '1')),
+        'llm_limit_max': int(os.getenv('LLM_LIMIT_MAX', '0')),
+        'llm_latency_tolerance': float(os.getenv('LLM_LATENCY_TOLERANCE', '2.0')),
+        'llm_breaker_threshold': int(os.getenv('LLM_BREAKER_THRESHOLD', '5')),
+        'llm_breaker_cooldown': float(os.getenv('LLM_BREAKER_COOLDOWN', '30')),
+        'video_budget': float(os.getenv('VIDEO_BUDGET', '1800')),
+        'llm_keep_alive': os.getenv('LLM_KEEP_ALIVE', '5m'),
+        'llm_keep_alive_max': float(os.getenv('LLM_KEEP_ALIVE_MAX', '10800')),
+        'llm_prewarm_lead': float(os.getenv('LLM_PREWARM_LEAD', '120')),
+        'llm_reuse_context': os.getenv('LLM_REUSE_CONTEXT', 'true').lower() == 'true',
+        
+        'http_max_connections': int(os.getenv('HTTP_MAX_CONNECTIONS', '20')),
+        'http_max_keepalive': int(os.getenv('HTTP_MAX_KEEPALIVE', '10')),
+        'http_keepalive_expiry': float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '60')),
+        'http2': os.getenv('HTTP2', 'true').lower() == 'true',
         
         'video_api_provider': os.getenv('VIDEO_API_PROVIDER', 'replicate'),
         'replicate_api_token': os.getenv('REPLICATE_API_TOKEN'),
+        'render_workers': int(os.getenv('RENDER_WORKERS', '0')),
+        'render_batch_size': int(os.getenv('RENDER_BATCH_SIZE', '4')),
+        'render_to_mux': os.getenv('RENDER_TO_MUX', 'true').lower() == 'true',
+        'download_retries': int(os.getenv('DOWNLOAD_RETRIES', '3')),
         
         'tts_provider': os.getenv('TTS_PROVIDER', 'silero'),
+        'silero_language': os.getenv('SILERO_LANGUAGE', 'ru'),
+        'silero_model': os.getenv('SILERO_MODEL', 'v3_1_ru'),
+        'silero_speaker': os.getenv('SILERO_SPEAKER', 'xenia'),
+        'silero_sample_rate': int(os.getenv('SILERO_SAMPLE_RATE', '48000')),
         'elevenlabs_api_key': os.getenv('ELEVENLABS_API_KEY'),
         
         'blotato_api_key': os.getenv('BLOTATO_API_KEY'),
+        'blotato_upload_url': os.getenv('BLOTATO_UPLOAD_URL', 'https://api.blotato.com/v1/upload'),
+        'publish_concurrency': int(os.getenv('PUBLISH_CONCURRENCY', '3')),
+        'publish_retries': int(os.getenv('PUBLISH_RETRIES', '3')),
+        'publish_backoff': float(os.getenv('PUBLISH_BACKOFF', '1.0')),
         'publish_to_tiktok': os.getenv('PUBLISH_TO_TIKTOK', 'true').lower() == 'true',
         'publish_to_instagram': os.getenv('PUBLISH_TO_INSTAGRAM', 'true').lower() == 'true',
         'publish_to_youtube': os.getenv('PUBLISH_TO_YOUTUBE', 'true').lower() == 'true',
@@ -33,13 +79,59 @@ def load_config() -> Dict[str, Any]:
         'videos_per_day': int(os.getenv('VIDEOS_PER_DAY', '3')),
         'generation_hours': os.getenv('GENERATION_HOURS', '09:00,15:00,21:00').split(','),
         
+        'io_workers': int(os.getenv('IO_WORKERS', '16')),
+        'cpu_workers': int(os.getenv('CPU_WORKERS', '0')),
+        'llm_concurrency': int(os.getenv('LLM_CONCURRENCY', '4')),
+        'tts_concurrency': int(os.getenv('TTS_CONCURRENCY', '2')),
+        'tts_chunked': os.getenv('TTS_CHUNKED', 'true').lower() == 'true',
+        'tts_workers': int(os.getenv('TTS_WORKERS', '1')),
+        'tts_sentence_pause': float(os.getenv('TTS_SENTENCE_PAUSE', '0.15')),
+        'tts_max_chars': int(os.getenv('TTS_MAX_CHARS', '800')),
+        'audio_in_memory': os.getenv('AUDIO_IN_MEMORY', 'false').lower() == 'true',
+        'render_concurrency': int(os.getenv('RENDER_CONCURRENCY', '0')),
+        'encode_concurrency': int(os.getenv('ENCODE_CONCURRENCY', '0')),
+        'batch_concurrency': int(os.getenv('BATCH_CONCURRENCY', '8')),
+        'compose_mode': os.getenv('COMPOSE_MODE', 'auto'),
+        'burn_captions': os.getenv('BURN_CAPTIONS', 'true').lower() == 'true',
+        'concurrent_stages': os.getenv('CONCURRENT_STAGES', 'true').lower() == 'true',
         'default_duration': int(os.getenv('DEFAULT_DURATION', '45')),
         'default_style': os.getenv('DEFAULT_STYLE', 'energetic'),
         'default_topics': os.getenv('DEFAULT_TOPICS', 'космос,наука,технологии').split(','),
         
         'auto_publish': os.getenv('AUTO_PUBLISH', 'false').lower() == 'true',
-        'cache_enabled': os.getenv('CACHE_ENABLED', 'true').lower() == 'true',
+        'output_dir': os.getenv('OUTPUT_DIR', 'output'),
+        'output_max_mb': int(os.getenv('OUTPUT_MAX_MB', '20480')),
+        'output_max_age': float(os.getenv('OUTPUT_MAX_AGE', '72')),
+        'output_gc_interval': float(os.getenv('OUTPUT_GC_INTERVAL', '600')),
+        'output_grace': float(os.getenv('OUTPUT_GRACE', '600')),
+        'jobs_enabled': os.getenv('JOBS_ENABLED', 'true').lower() == 'true',
+        'jobs_db': os.getenv('JOBS_DB', 'data/jobs.db'),
+        'fact_pool_enabled': os.getenv('FACT_POOL_ENABLED', 'true').lower() == 'true',
+        'fact_pool_db': os.getenv('FACT_POOL_DB', 'data/facts.db'),
+        'fact_batch_size': int(os.getenv('FACT_BATCH_SIZE', '10')),
+        'fact_dedupe_threshold': float(os.getenv('FACT_DEDUPE_THRESHOLD', '0.5')),
+        'fact_refill_attempts': int(os.getenv('FACT_REFILL_ATTEMPTS', '2')),
+        'render_ahead': int(os.getenv('RENDER_AHEAD', '2')),
+        'render_ahead_max_mb': int(os.getenv('RENDER_AHEAD_MAX_MB', '4096')),
+        'render_ahead_max_age': float(os.getenv('RENDER_AHEAD_MAX_AGE', '48')),
+        'render_ahead_guard': float(os.getenv('RENDER_AHEAD_GUARD', '15')),
+        'worker_mode': os.getenv('WORKER_MODE', 'false').lower() == 'true',
+        'workers': _worker_counts(os.getenv('WORKERS', 'llm=2,tts=1,render=1,encode=1,publish=1')),
+        'task_lease': float(os.getenv('TASK_LEASE', '60')),
+        'task_attempts': int(os.getenv('TASK_ATTEMPTS', '3')),
+        'task_retry_delay': float(os.getenv('TASK_RETRY_DELAY', '5')),
+        'worker_poll': float(os.getenv('WORKER_POLL', '0.5')),
+        'tracing_enabled': os.getenv('TRACING_ENABLED', 'true').lower() == 'true',
+        'trace_dir': os.getenv('TRACE_DIR', 'logs/traces'),
+        'metrics_port': int(os.getenv('METRICS_PORT', '9108')),
+        'loop_lag_warn': float(os.getenv('LOOP_LAG_WARN', '0.25')),
         'debug': os.getenv('DEBUG', 'false').lower() == 'true',
     })
     
+    # Only when set, so cache.enabled / cache.ttl in settings.yaml still apply
+    if os.getenv('CACHE_ENABLED') is not None:
+        config['cache_enabled'] = os.getenv('CACHE_ENABLED').lower() == 'true'
+    if os.getenv('CACHE_TTL') is not None:
+        config['cache_ttl'] = int(os.getenv('CACHE_TTL'))
+    
     return config
\ No newline at end of file
@@ -0,0 +1,89 @@
+import importlib.util
+import logging
+import shutil
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Import name -> pip package, for the install hint
+PACKAGES = {
+    'httpx': 'httpx',
+    'numpy': 'numpy',
+    'torch': 'torch',
+    'cv2': 'opencv-python',
+    'replicate': 'replicate',
+    'ffmpeg': 'ffmpeg-python',
+    'apscheduler': 'apscheduler'
+}
+
+
+def _installed(module: str) -> bool:
+    # find_spec locates the package without importing it (torch alone takes seconds)
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def stage_requirements(kind: str, config: Dict[str, Any]) -> List[str]:
+    """Modules a stage kind needs under this config; 'bin:<name>' entries are executables."""
+    if kind in ('llm', 'publish'):
+        return ['httpx']
+    if kind == 'tts':
+        from ..voice_synthesis.engine import registered
+        modules = ['numpy']
+        # A preloaded engine (tests, benchmarks) brings its own model
+        if not registered(config.get('silero_language', 'ru'), config.get('silero_model', 'v3_1_ru')):
+            modules.append('torch')
+        return modules
+    if kind == 'render':
+        # Replicate failures fall back to the placeholder, so that is the hard requirement
+        modules = ['cv2', 'numpy']
+        if config.get('video_api_provider', 'replicate') == 'replicate':
+            modules += ['replicate', 'httpx']
+        return modules
+    if kind == 'encode':
+        modules = ['ffmpeg', 'bin:ffmpeg', 'bin:ffprobe']
+        if config.get('render_to_mux', True):
+            # Placeholder frames are rendered inside the encode
+            modules += ['cv2', 'numpy']
+        elif config.get('burn_captions', True):
+            modules.append('numpy')
+        return modules
+    if kind == 'schedule':
+        return ['apscheduler']
+    return []
+
+
+def missing(kinds: Iterable[str], config: Dict[str, Any]) -> List[str]:
+    """Requirements of the given stage kinds that are not installed, without importing them."""
+    absent = []
+    for kind in kinds:
+        for requirement in stage_requirements(kind, config):
+            if requirement in absent:
+                continue
+            if requirement.startswith('bin:'):
+                found = shutil.which(requirement[len('bin:'):]) is not None
+            elif requirement == 'replicate':
+                # Optional: the render stage degrades to the placeholder
+                found = _installed(requirement)
+                if not found:
+                    logger.warning('replicate not installed, videos will be placeholders')
+                    continue
+            else:
+                found = _installed(requirement)
+            if not found:
+                absent.append(requirement)
+    return absent
+
+
+def describe(absent: Iterable[str]) -> str:
+    """'pip install ...' / binary hint for a list returned by missing()."""
+    modules = [PACKAGES.get(name, name) for name in absent if not name.startswith('bin:')]
+    binaries = [name[len('bin:'):] for name in absent if name.startswith('bin:')]
+    parts = []
+    if modules:
+        parts.append(f'pip install {" ".join(modules)}')
+    if binaries:
+        parts.append(f'install {", ".join(binaries)} (not on PATH)')
+    return '; '.join(parts)
@@ -0,0 +1,149 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import random
+import re
+import uuid
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadError(Exception):
+    pass
+
+
+def _total_from(response, offset: int) -> Optional[int]:
+    content_range = response.headers.get('Content-Range')
+    if content_range:
+        match = re.match(r'bytes \d+-\d+/(\d+)', content_range)
+        if match:
+            return int(match.group(1))
+    length = response.headers.get('Content-Length')
+    return offset + int(length) if length is not None else None
+
+
+def _b64_hex(value: str) -> Optional[str]:
+    try:
+        return base64.b64decode(value.strip(':'), validate=True).hex()
+    except binascii.Error:
+        return None
+
+
+def _checksum_from(response) -> Optional[Tuple[str, str]]:
+    """(hashlib name, hex digest) of the whole file as the server states it, or None."""
+    headers = response.headers
+    # RFC 9530 Repr-Digest (sha-256=:<base64>:), RFC 3230 Digest (SHA-256=<base64>) and GCS x-goog-hash
+    for header in ('Repr-Digest', 'Digest', 'x-goog-hash'):
+        for item in (headers.get(header) or '').split(','):
+            name, _, value = item.strip().partition('=')
+            algorithm = {'sha-256': 'sha256', 'md5': 'md5'}.get(name.lower())
+            if algorithm and _b64_hex(value):
+                return algorithm, _b64_hex(value)
+    if _b64_hex(headers.get('x-amz-checksum-sha256') or ''):
+        return 'sha256', _b64_hex(headers['x-amz-checksum-sha256'])
+    # A strong, single-part ETag of 32 or 64 hex digits is the object's MD5 or SHA-256
+    etag = headers.get('ETag') or ''
+    if not etag.startswith('W/'):
+        etag = etag.strip('"').lower()
+        if re.fullmatch(r'[0-9a-f]{32}', etag):
+            return 'md5', etag
+        if re.fullmatch(r'[0-9a-f]{64}', etag):
+            return 'sha256', etag
+    return None
+
+
+def _write(f, digest, chunk: bytes):
+    f.write(chunk)
+    digest.update(chunk)
+
+
+async def download(
+    client,
+    url: str,
+    dest: Path,
+    expected_size: Optional[int] = None,
+    sha256: Optional[str] = None,
+    retries: int = 3,
+    backoff: float = 1.0,
+    timeout: float = 300.0
+) -> Path:
+    """Streams url into dest without holding it in memory.
+
+    Bytes go to a hidden .part file next to dest. A dropped connection resumes
+    with an HTTP Range request, and the file is renamed into place only after
+    its size and checksum check out. The checksum is sha256 when given, else
+    the one the server states (Repr-Digest/Digest, x-amz-checksum-sha256,
+    x-goog-hash or a hex ETag); with neither only the size is checked.
+    """
+    import httpx
+
+    dest = Path(dest)
+    part = dest.with_name(f'.{dest.name}.{uuid.uuid4().hex[:8]}.part')
+    expected = ('sha256', sha256.lower()) if sha256 else None
+    digest = hashlib.sha256()
+    offset = 0
+    total = expected_size
+    etag = None
+
+    try:
+        for attempt in range(retries + 1):
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+            if offset and etag:
+                # A changed file comes back whole (200) instead of a mismatched tail
+                headers['If-Range'] = etag
+            try:
+                async with client.stream('GET', url, headers=headers, timeout=timeout) as response:
+                    if response.status_code == 206:
+                        total = _total_from(response, offset) or total
+                        mode = 'ab'
+                    elif response.status_code == 200:
+                        # Server ignored the Range header: start over
+                        if offset:
+                            logger.info(f'No range support at {url}, restarting download')
+                        offset = 0
+                        total = _total_from(response, 0) or total
+                        if not sha256:
+                            expected = _checksum_from(response)
+                        digest = hashlib.new(expected[0] if expected else 'sha256')
+                        etag = response.headers.get('ETag')
+                        if etag and etag.startswith('W/'):
+                            etag = None
+                        mode = 'wb'
+                    else:
+                        raise DownloadError(f'HTTP {response.status_code} for {url}')
+
+                    with open(part, mode) as f:
+                        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                            # hashlib drops the GIL, so hashing overlaps the next read too
+                            await run_blocking(_write, f, digest, chunk)
+                            offset += len(chunk)
+
+                if total is None or offset >= total:
+                    break
+                raise httpx.RemoteProtocolError(f'connection closed at {offset}/{total} bytes')
+            except httpx.TransportError as e:
+                if attempt == retries:
+                    raise DownloadError(f'Download failed after {attempt + 1} attempts: {e}') from e
+                delay = backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                logger.warning(f'Download interrupted at {offset} bytes ({e}), resuming in {delay:.1f}s')
+                await asyncio.sleep(delay)
+
+        if total is not None and offset != total:
+            raise DownloadError(f'Size mismatch: got {offset} bytes, expected {total}')
+        if expected and digest.hexdigest() != expected[1]:
+            raise DownloadError(f'Checksum mismatch for {url} ({expected[0]})')
+
+        os.replace(part, dest)
+        return dest
+    finally:
+        part.unlink(missing_ok=True)
+
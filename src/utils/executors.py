@@ -0,0 +1,63 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_settings = {'io_workers': 16, 'cpu_workers': 0}
+_io_pool = None
+_cpu_pool = None
+
+
+def configure_executors(config: Dict[str, Any]):
+    _settings['io_workers'] = config.get('io_workers', _settings['io_workers'])
+    _settings['cpu_workers'] = config.get('cpu_workers', _settings['cpu_workers'])
+
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=_settings['io_workers'], thread_name_prefix='io')
+    return _io_pool
+
+
+def _get_cpu_pool() -> ProcessPoolExecutor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        workers = _settings['cpu_workers'] or os.cpu_count() or 1
+        # spawn, not fork: the parent holds threads (io pool, httpx, torch) that fork would copy mid-state
+        _cpu_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        logger.info(f'CPU pool: {workers} processes')
+    return _cpu_pool
+
+
+def cpu_share() -> int:
+    """Threads one CPU-pool task may use, so a full pool of them does not oversubscribe the cores."""
+    cores = os.cpu_count() or 1
+    return max(1, cores // (_settings['cpu_workers'] or cores))
+
+
+async def run_blocking(fn: Callable, *args, **kwargs):
+    """Runs blocking I/O (HTTP via requests, subprocesses, file copies) in the thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_pool(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_cpu(fn: Callable, *args, **kwargs):
+    """Runs CPU-bound work in the process pool; fn and its arguments must be picklable."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_cpu_pool(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_executors():
+    global _io_pool, _cpu_pool
+    if _io_pool is not None:
+        _io_pool.shutdown(wait=True)
+        _io_pool = None
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown(wait=True)
+        _cpu_pool = None
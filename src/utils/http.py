@@ -0,0 +1,42 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_client(config: Dict[str, Any]):
+    import httpx
+    
+    limits = httpx.Limits(
+        max_connections=config.get('http_max_connections', 20),
+        max_keepalive_connections=config.get('http_max_keepalive', 10),
+        keepalive_expiry=config.get('http_keepalive_expiry', 60.0)
+    )
+    
+    # httpx negotiates HTTP/2 over TLS (ALPN) only, plain-http Ollama stays on HTTP/1.1 keep-alive
+    http2 = config.get('http2', True)
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning('h2 not installed, HTTP/2 disabled')
+            http2 = False
+    
+    return httpx.AsyncClient(
+        limits=limits,
+        http2=http2,
+        timeout=config.get('http_timeout', 120.0)
+    )
+
+
+@asynccontextmanager
+async def http_session(client, timeout: float):
+    """Yields the shared client, or a throwaway one when a stage is used standalone."""
+    if client is not None:
+        yield client
+        return
+    
+    import httpx
+    async with httpx.AsyncClient(timeout=timeout) as own_client:
+        yield own_client
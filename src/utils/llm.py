@@ -0,0 +1,437 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from . import tracing
+from .http import http_session
+
+logger = logging.getLogger(__name__)
+
+_deadline: ContextVar[Optional[float]] = ContextVar('llm_deadline', default=None)
+
+# A reply's context is only worth sending back while Ollama likely still has it cached
+CONTEXT_TTL = 300.0
+
+
+class LLMError(Exception):
+    """An LLM call that failed for good: not retryable, or out of attempts."""
+
+
+class LLMUnavailable(LLMError):
+    """Refused without calling Ollama: the circuit is open or the deadline has passed."""
+
+
+class _Retryable(Exception):
+    pass
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Bounds every LLM call made inside (and in tasks started inside) to `seconds` from now."""
+    token = _deadline.set(time.monotonic() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def _duration(value):
+    """keep_alive as Ollama takes it: seconds as a number, or a duration string like '10m'."""
+    if isinstance(value, str) and value.lstrip('-').isdigit():
+        return int(value)
+    return None if value in (None, '') else value
+
+
+def remaining() -> Optional[float]:
+    end = _deadline.get()
+    return None if end is None else end - time.monotonic()
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit for one backend.
+
+    A call that finishes near the best latency seen for its key grows
+    the limit by 1/limit (about +1 per round of calls). An error, a timeout or
+    a latency above `tolerance` times that baseline multiplies it by
+    `decrease`, at most once per baseline latency so one burst of slow replies
+    counts once. Baselines drift up slowly, so a model that got slower for
+    good is not mistaken for overload forever. Keys are an operation and
+    what was timed ('script:reply', 'script:first_token'), since a full reply
+    and a first token of the same prompt are far apart.
+    """
+
+    def __init__(self, initial: float = 2, minimum: int = 1, maximum: int = 8,
+                 tolerance: float = 2.0, decrease: float = 0.7, drift: float = 0.02):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.tolerance = tolerance
+        self.decrease = decrease
+        self.drift = drift
+        self.in_flight = 0
+        self._baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self._waiters = deque()
+
+    @asynccontextmanager
+    async def slot(self):
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done() and not waiter.get_loop().is_closed():
+                waiter.set_result(None)
+                free -= 1
+
+    def success(self, key: str, latency: float):
+        baseline = min(latency, self._baselines.get(key, latency) * (1 + self.drift))
+        self._baselines[key] = baseline
+        if latency > self.tolerance * baseline:
+            self.failure(baseline)
+            return
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def failure(self, window: Optional[float] = None):
+        now = time.monotonic()
+        window = window if window is not None else max(self._baselines.values(), default=1.0)
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.decrease)
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; after `cooldown` seconds one probe call decides."""
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.state = 'closed'
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == 'closed':
+            return True
+        # After the cooldown one probe goes through; another only if that one never reported back
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = 'half-open'
+            self._opened_at = time.monotonic()
+            return True
+        return False
+
+    def success(self):
+        if self.state != 'closed':
+            logger.info('LLM circuit closed')
+        self.failures = 0
+        self.state = 'closed'
+
+    def failure(self):
+        self.failures += 1
+        if self.state == 'half-open' or (self.state == 'closed' and self.failures >= self.threshold):
+            if self.state == 'closed':
+                logger.warning(f'LLM circuit open after {self.failures} failures, cooling down {self.cooldown:.0f}s')
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+
+
+class Backend:
+    """Limit, breaker and model state shared by every LLMClient talking to one Ollama host in this process."""
+
+    def __init__(self, config: Dict[str, Any]):
+        # Wall-clock time (time.time()) the scheduler wants the model loaded until; None = LLM_KEEP_ALIVE
+        self.keep_until: Optional[float] = None
+        # (model, reply text) -> (time, context) of recent replies, for follow-up calls
+        self.contexts: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        maximum = config.get('llm_limit_max') or config.get('llm_concurrency', 4)
+        self.limit = AdaptiveLimit(
+            initial=min(2, maximum),
+            minimum=config.get('llm_limit_min', 1),
+            maximum=maximum,
+            tolerance=config.get('llm_latency_tolerance', 2.0)
+        )
+        self.breaker = CircuitBreaker(
+            threshold=config.get('llm_breaker_threshold', 5),
+            cooldown=config.get('llm_breaker_cooldown', 30.0)
+        )
+
+
+_backends: Dict[str, Backend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(host: str, config: Dict[str, Any]) -> Backend:
+    with _backends_lock:
+        if host not in _backends:
+            _backends[host] = Backend(config)
+        return _backends[host]
+
+
+class LLMClient:
+    """Ollama ``/api/generate`` behind the host's shared adaptive limit and circuit breaker.
+
+    Transport errors, timeouts, 429 and 5xx are retried with jittered
+    exponential backoff; every attempt is bounded by llm_timeout and by the
+    deadline() the pipeline sets from the video budget.
+    """
+
+    def __init__(self, config: Dict[str, Any], client=None):
+        self.config = config
+        self.client = client
+        self.host = config.get('ollama_host') or 'http://localhost:11434'
+        self.model = config.get('ollama_model') or 'qwen2.5:32b'
+        self.timeout = config.get('llm_timeout', 120.0)
+        self.retries = config.get('llm_retries', 3)
+        self.backoff = config.get('llm_backoff', 1.0)
+        self.keep_alive = _duration(config.get('llm_keep_alive'))
+        self.backend = get_backend(self.host, config)
+
+    def keep_loaded(self, until: Optional[float]):
+        """Keeps the model loaded until the wall-clock time `until` (None = LLM_KEEP_ALIVE after each call).
+
+        Every call to this host sends the seconds left, so a later call does
+        not push the unload further out than planned.
+        """
+        self.backend.keep_until = until
+
+    def remember(self, text: str, context: Optional[list]):
+        """Keeps the context of the reply `text`, so a follow-up call can continue from it."""
+        if not context:
+            return
+        contexts = self.backend.contexts
+        contexts[(self.model, text)] = (time.monotonic(), context)
+        contexts.move_to_end((self.model, text))
+        while len(contexts) > 64:
+            contexts.popitem(last=False)
+
+    def context(self, text: str) -> Optional[list]:
+        entry = self.backend.contexts.get((self.model, text))
+        if entry is None or time.monotonic() - entry[0] > CONTEXT_TTL:
+            return None
+        return entry[1]
+
+    def _payload(self, prompt: str, stream: bool, options: Dict[str, Any]) -> Dict[str, Any]:
+        return {'model': self.model, 'prompt': prompt, 'stream': stream, **options}
+
+    def _sent(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """The payload as sent now: keep_alive is what is left of the plan at this moment."""
+        keep_alive = self.keep_alive
+        until = self.backend.keep_until
+        if until is not None and until - time.time() >= 1:
+            keep_alive = round(until - time.time())
+        if keep_alive is None or 'keep_alive' in payload:
+            return payload
+        return {**payload, 'keep_alive': keep_alive}
+
+    @staticmethod
+    def _log_timings(op: str, data: Dict[str, Any], ttft: Optional[float], total: float, context: bool):
+        """Logs time to first token, split into model load and prompt processing when Ollama reports them."""
+        load = data.get('load_duration', 0) / 1e9
+        prompt_eval = data.get('prompt_eval_duration', 0) / 1e9
+        if ttft is None:
+            # Without streaming the first token is not seen; Ollama's own timings give it
+            if 'prompt_eval_duration' not in data:
+                logger.info(f'LLM {op}: {total:.2f}s')
+                return
+            ttft = load + prompt_eval
+        tracing.tag(**{f'llm_{op}_ttft': round(ttft, 3)})
+        logger.info(
+            f'LLM {op}: TTFT {ttft:.2f}s (load {load:.2f}s, {data.get("prompt_eval_count", 0)} prompt tokens '
+            f'in {prompt_eval:.2f}s{", context reused" if context else ""}), total {total:.2f}s'
+        )
+
+    def _attempt_timeout(self) -> float:
+        """Taken once the limiter slot is held, so time spent queued for it counts against the deadline."""
+        left = remaining()
+        if left is not None and left <= 0:
+            raise LLMUnavailable('video deadline passed')
+        return self.timeout if left is None else min(self.timeout, left)
+
+    @staticmethod
+    def _expired() -> bool:
+        left = remaining()
+        return left is not None and left <= 0
+
+    @staticmethod
+    def _check(response):
+        if response.status_code == 200:
+            return
+        if response.status_code == 429 or response.status_code >= 500:
+            raise _Retryable(f'Ollama error: {response.status_code}')
+        raise LLMError(f'Ollama error: {response.status_code}')
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        import httpx
+        return isinstance(error, (_Retryable, httpx.TransportError, httpx.TimeoutException, asyncio.TimeoutError))
+
+    async def _call(self, op: str, attempt_fn: Callable[[Any, float], Awaitable[Dict[str, Any]]],
+                    adaptive: bool = True):
+        backend = self.backend
+        error = None
+        for attempt in range(1, self.retries + 2):
+            if not backend.breaker.allow():
+                raise LLMUnavailable(f'circuit open for {self.host}')
+            async with backend.limit.slot():
+                timeout = self._attempt_timeout()
+                start = time.monotonic()
+                try:
+                    async with http_session(self.client, timeout) as client:
+                        result = await asyncio.wait_for(attempt_fn(client, timeout), timeout)
+                except LLMError:
+                    # Ollama answered: it is up, the request itself is wrong
+                    backend.breaker.success()
+                    raise
+                except Exception as e:
+                    if self._expired():
+                        # Our own deadline cut the call short: says nothing about Ollama's health
+                        raise LLMUnavailable('video deadline passed') from e
+                    backend.breaker.failure()
+                    if not self._retryable(e):
+                        raise
+                    error = f'{type(e).__name__}: {e}' if str(e) else type(e).__name__
+                    if adaptive:
+                        backend.limit.failure()
+                else:
+                    if adaptive:
+                        # Loading the model is not a sign of overload
+                        latency = time.monotonic() - start - result.get('load_duration', 0) / 1e9
+                        backend.limit.success(f'{op}:reply', latency)
+                    backend.breaker.success()
+                    tracing.tag(**{f'llm_{op}_attempts': attempt})
+                    return result
+
+            delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            left = remaining()
+            if attempt > self.retries or (left is not None and delay >= left):
+                break
+            logger.warning(f'LLM {op} failed ({error}), retry in {delay:.1f}s (limit {backend.limit.limit:.1f})')
+            await asyncio.sleep(delay)
+        raise LLMError(f'{op} failed after {attempt} attempts: {error}')
+
+    async def complete(self, prompt: str, op: str = 'generate', **options) -> Dict[str, Any]:
+        """Ollama's reply: the text in 'response', its 'context' and timings; `op` groups calls with similar latency."""
+        payload = self._payload(prompt, False, options)
+
+        async def attempt(client, timeout):
+            response = await client.post(f'{self.host}/api/generate', json=self._sent(payload), timeout=timeout)
+            self._check(response)
+            return response.json()
+
+        start = time.monotonic()
+        data = await self._call(op, attempt)
+        self._log_timings(op, data, None, time.monotonic() - start, 'context' in options)
+        return data
+
+    async def generate(self, prompt: str, op: str = 'generate', **options) -> str:
+        """The full reply text."""
+        return (await self.complete(prompt, op, **options)).get('response', '')
+
+    async def warm(self) -> Optional[float]:
+        """Loads the model without generating anything; returns the seconds it took, None if it failed."""
+        payload = self._payload('', False, {})
+
+        async def attempt(client, timeout):
+            response = await client.post(f'{self.host}/api/generate', json=self._sent(payload), timeout=timeout)
+            self._check(response)
+            return response.json()
+
+        start = time.monotonic()
+        try:
+            await self._call('warm', attempt, adaptive=False)
+        except LLMError as e:
+            logger.warning(f'LLM warm-up failed: {e}')
+            return None
+        elapsed = time.monotonic() - start
+        logger.info(f'LLM warm: {self.model} ready in {elapsed:.2f}s (keep_alive {self._sent(payload).get("keep_alive", "default")})')
+        return elapsed
+
+    async def stream(self, prompt: str, op: str = 'stream', **options) -> AsyncIterator[str]:
+        """Yields reply text as Ollama generates it.
+
+        Retries only happen before the first token; latency for the limit is
+        the time to first token.
+        """
+        backend = self.backend
+        payload = self._payload(prompt, True, options)
+        error = None
+        for attempt in range(1, self.retries + 2):
+            if not backend.breaker.allow():
+                raise LLMUnavailable(f'circuit open for {self.host}')
+            first_token = None
+            async with backend.limit.slot():
+                timeout = self._attempt_timeout()
+                start = time.monotonic()
+                try:
+                    async with http_session(self.client, timeout) as client:
+                        async with client.stream(
+                            'POST', f'{self.host}/api/generate', json=self._sent(payload), timeout=timeout
+                        ) as response:
+                            self._check(response)
+                            async for line in response.aiter_lines():
+                                if not line.strip():
+                                    continue
+                                if self._expired():
+                                    raise LLMUnavailable('video deadline passed')
+                                chunk = json.loads(line)
+                                if first_token is None:
+                                    first_token = time.monotonic() - start
+                                    backend.limit.success(f'{op}:first_token', first_token)
+                                    backend.breaker.success()
+                                if chunk.get('done'):
+                                    self._log_timings(
+                                        op, chunk, first_token, time.monotonic() - start, 'context' in options
+                                    )
+                                    if chunk.get('response'):
+                                        yield chunk['response']
+                                    break
+                                yield chunk.get('response', '')
+                    return
+                except LLMUnavailable:
+                    # Cut off by our own deadline: neither a sign that Ollama is healthy nor that it is down
+                    raise
+                except LLMError:
+                    # Ollama answered: it is up, the request itself is wrong
+                    backend.breaker.success()
+                    raise
+                except Exception as e:
+                    if first_token is not None:
+                        raise
+                    if self._expired():
+                        raise LLMUnavailable('video deadline passed') from e
+                    backend.breaker.failure()
+                    if not self._retryable(e):
+                        raise
+                    error = f'{type(e).__name__}: {e}' if str(e) else type(e).__name__
+                    backend.limit.failure()
+
+            delay = self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+            left = remaining()
+            if attempt > self.retries or (left is not None and delay >= left):
+                break
+            logger.warning(f'LLM {op} stream failed ({error}), retry in {delay:.1f}s')
+            await asyncio.sleep(delay)
+        raise LLMError(f'{op} failed after {attempt} attempts: {error}')
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a periodic sleeper.
+
+    With ``warn``, a wake-up later than that many seconds is logged, at most
+    once per ``warn_every`` seconds, with how many were late in between.
+    """
+
+    def __init__(self, interval: float = 0.01, warn: Optional[float] = None, warn_every: float = 60.0):
+        self.interval = interval
+        self.warn = warn
+        self.warn_every = warn_every
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.samples = 0
+        self._late = 0
+        self._warned_at = float('-inf')
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.max_lag = max(self.max_lag, lag)
+            self.total_lag += lag
+            self.samples += 1
+            if self.warn and lag > self.warn:
+                self._late += 1
+                now = time.monotonic()
+                if now - self._warned_at >= self.warn_every:
+                    logger.warning(
+                        f'Event loop blocked for {lag * 1000:.0f} ms ({self._late} late wake-ups over '
+                        f'{self.warn * 1000:.0f} ms, max {self.max_lag * 1000:.0f} ms so far)'
+                    )
+                    self._warned_at = now
+                    self._late = 0
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.samples if self.samples else 0.0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
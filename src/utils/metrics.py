@@ -0,0 +1,128 @@
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+# Stages run from well under a second (cached LLM calls) to many minutes (full HD encode)
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200)
+
+
+def _rss(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def _children(pid: int):
+    children = []
+    try:
+        tasks = os.listdir(f'/proc/{pid}/task')
+    except OSError:
+        return children
+    for task in tasks:
+        try:
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                children += [int(child) for child in f.read().split()]
+        except OSError:
+            continue
+    return children
+
+
+def tree_rss(pid: Optional[int] = None) -> int:
+    """Resident memory of a process plus its children (render workers, ffmpeg); Linux only."""
+    pid = pid or os.getpid()
+    return _rss(pid) + sum(tree_rss(child) for child in _children(pid))
+
+
+class Metrics:
+    """Prometheus exporter for the long-running scheduler process.
+
+    Stage latencies and failures come from finished tracing spans, queue depth
+    from the pipeline's stage limits. Needs the optional prometheus_client.
+    """
+
+    def __init__(self, config: Dict[str, Any], pipeline=None):
+        self.port = config.get('metrics_port', 9108)
+        self.pipeline = pipeline
+        self.registry = None
+        self.in_progress = None
+
+    def start(self) -> bool:
+        if not self.port:
+            return False
+        try:
+            from prometheus_client import (
+                CollectorRegistry, Counter, Gauge, Histogram, ProcessCollector, start_http_server
+            )
+        except ImportError:
+            logger.warning('prometheus_client not installed, metrics disabled')
+            return False
+
+        self.registry = CollectorRegistry()
+        ProcessCollector(registry=self.registry)
+        self.stage_seconds = Histogram(
+            'content_stage_seconds', 'Stage latency', ['stage'], buckets=BUCKETS, registry=self.registry
+        )
+        self.failures = Counter('content_stage_failures_total', 'Failed stages', ['stage'], registry=self.registry)
+        self.published = Counter(
+            'content_publish_total', 'Publish attempts by outcome', ['platform', 'status'], registry=self.registry
+        )
+        self.cache = Counter('content_cache_lookups_total', 'Cache lookups', ['kind', 'result'], registry=self.registry)
+        self.in_progress = Gauge('content_videos_in_progress', 'Videos being generated', registry=self.registry)
+        queue_depth = Gauge(
+            'content_stage_queue_depth', 'Stages waiting for a concurrency slot', ['kind'], registry=self.registry
+        )
+        for kind, limit in getattr(self.pipeline, 'stage_limits', {}).items():
+            queue_depth.labels(kind).set_function(lambda limit=limit: getattr(limit, 'waiting', 0))
+        Gauge(
+            'content_process_tree_rss_bytes', 'RSS including child processes', registry=self.registry
+        ).set_function(tree_rss)
+        monitor = getattr(self.pipeline, 'loop_monitor', None)
+        if monitor is not None:
+            Gauge(
+                'content_event_loop_lag_max_seconds', 'Longest event-loop wake-up delay', registry=self.registry
+            ).set_function(lambda: monitor.max_lag)
+            Gauge(
+                'content_event_loop_lag_mean_seconds', 'Mean event-loop wake-up delay', registry=self.registry
+            ).set_function(lambda: monitor.mean_lag)
+
+        try:
+            start_http_server(self.port, registry=self.registry)
+        except OSError as e:
+            logger.error(f'Metrics server error: {e}')
+            return False
+
+        tracing.add_listener(self.observe)
+        logger.info(f'Metrics on :{self.port}/metrics')
+        return True
+
+    @contextmanager
+    def video(self):
+        """Counts a scheduled video as in progress for the duration of the block."""
+        if self.in_progress is None:
+            yield
+            return
+        self.in_progress.inc()
+        try:
+            yield
+        finally:
+            self.in_progress.dec()
+
+    def stop(self):
+        tracing.remove_listener(self.observe)
+
+    def observe(self, span: tracing.Span):
+        self.stage_seconds.labels(span.name).observe(span.duration)
+        if span.status != 'ok':
+            self.failures.labels(span.name).inc()
+        if span.name == 'publish':
+            self.published.labels(span.attributes.get('platform', ''), span.attributes.get('status', '')).inc()
+        for key, value in span.attributes.items():
+            if key.startswith('cache_'):
+                self.cache.labels(key[len('cache_'):], value).inc()
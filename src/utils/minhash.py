@@ -0,0 +1,58 @@
+import hashlib
+import random
+import re
+from array import array
+from typing import Iterable, List, Sequence, Set, Tuple
+
+# Mersenne prime for the universal hash family; signatures keep the low 32 bits
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+_WORD = re.compile(r'\w+')
+
+
+def _permutations(count: int, seed: int = 1) -> List[Tuple[int, int]]:
+    # Fixed seed: signatures are persisted, so the permutations must never change
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(count)]
+
+
+PERMUTATIONS = _permutations(64)
+
+
+def normalize(text: str) -> str:
+    """Lowercase words only, so punctuation, 'ё' and spacing do not hide a repeat."""
+    return ' '.join(_WORD.findall(text.lower().replace('ё', 'е')))
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    """Hashed character n-grams of the normalized text."""
+    text = normalize(text)
+    grams = {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+    return {int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), 'little') for gram in grams}
+
+
+def signature(text: str, size: int = 5) -> List[int]:
+    hashes = shingles(text, size)
+    return [min((a * h + b) % _PRIME for h in hashes) & _MASK for a, b in PERMUTATIONS]
+
+
+def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+def bands(sig: Sequence[int], rows: int = 4) -> Iterable[Tuple[int, str]]:
+    """LSH band keys: texts sharing any key are candidates (16 bands of 4 rows catch ~0.5 Jaccard)."""
+    for band in range(len(sig) // rows):
+        chunk = array('I', sig[band * rows:(band + 1) * rows]).tobytes()
+        yield band, hashlib.blake2b(chunk, digest_size=8).hexdigest()
+
+
+def pack(sig: Sequence[int]) -> bytes:
+    return array('I', sig).tobytes()
+
+
+def unpack(blob: bytes) -> List[int]:
+    values = array('I')
+    values.frombytes(blob)
+    return values.tolist()
@@ -0,0 +1,140 @@
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from ..jobs import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Hidden temp files older than this belong to a writer that died
+TEMP_MAX_AGE = 3600
+
+
+class OutputStore:
+    """Stage outputs under ``<output_dir>/<kind>/``, named by their content.
+
+    Writers fill a hidden temp file that is then renamed to
+    ``<prefix>_<sha256[:16]><suffix>``, so concurrent runs never overwrite each
+    other and identical outputs collapse into one file. Files coming from
+    elsewhere (cache hits) are hardlinked in, not copied. collect() applies
+    output_max_age and then output_max_mb, oldest first, and never touches
+    files that unfinished jobs still reference.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.root = Path(config.get('output_dir', 'output'))
+        self.max_bytes = int(config.get('output_max_mb', 20480) * 2**20)
+        self.max_age = config.get('output_max_age', 72) * 3600
+        self.interval = config.get('output_gc_interval', 600)
+        # Budget eviction leaves fresh files alone: a stage may not have checkpointed them yet
+        self.grace = config.get('output_grace', 600)
+        self._last_collect: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def dir(self, kind: str) -> Path:
+        path = self.root / kind
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def temp(self, kind: str, suffix: str, prefix: Optional[str] = None) -> Path:
+        """A fresh hidden path in the kind's directory; the suffix is kept so ffmpeg picks the format."""
+        return self.dir(kind) / f'.{prefix or kind}-{uuid.uuid4().hex}{suffix}'
+
+    def commit(self, kind: str, tmp: Path, prefix: Optional[str] = None) -> Path:
+        """Moves a finished temp file to its content name; an identical file already there is kept instead."""
+        path = self.dir(kind) / f'{prefix or kind}_{file_sha256(tmp)[:16]}{tmp.suffix}'
+        if path.exists():
+            tmp.unlink(missing_ok=True)
+        else:
+            os.replace(tmp, path)
+        return path
+
+    def write(self, kind: str, suffix: str, writer: Callable[[Path], Any], prefix: Optional[str] = None) -> Path:
+        """Runs writer(tmp) and commits the result. Blocking (hashes the file)."""
+        tmp = self.temp(kind, suffix, prefix)
+        try:
+            writer(tmp)
+            return self.commit(kind, tmp, prefix)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def put(self, kind: str, source: Path, prefix: Optional[str] = None) -> Path:
+        """Brings an existing file into the store as a hardlink, copying only across filesystems."""
+        def link(tmp: Path):
+            try:
+                os.link(source, tmp)
+            except OSError:
+                shutil.copyfile(source, tmp)
+
+        return self.write(kind, Path(source).suffix, link, prefix)
+
+    def usage(self) -> Dict[str, int]:
+        """Bytes per kind directory (hardlinked files count in full)."""
+        usage: Dict[str, int] = {}
+        for path in self.root.glob('*/*'):
+            try:
+                usage[path.parent.name] = usage.get(path.parent.name, 0) + path.stat().st_size
+            except FileNotFoundError:
+                continue
+        return usage
+
+    def due(self) -> bool:
+        return self._last_collect is None or time.monotonic() - self._last_collect >= self.interval
+
+    def collect(self, keep: Iterable[Path] = (), dry_run: bool = False) -> Dict[str, Any]:
+        """Applies retention; returns the files removed and the bytes that actually came free.
+
+        A file with other hardlinks (e.g. in the artifact cache) is removed
+        from the store but frees nothing until its last link goes.
+        """
+        keep = {Path(path).resolve() for path in keep}
+        now = time.time()
+        removed = reclaimed = pinned = 0
+
+        def remove(path: Path, stat: os.stat_result):
+            nonlocal removed, reclaimed
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            removed += 1
+            reclaimed += stat.st_size if stat.st_nlink == 1 else 0
+
+        with self._lock:
+            self._last_collect = time.monotonic()
+            entries = []
+            for path in self.root.glob('*/*'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if not path.is_file():
+                    continue
+                if path.name.startswith('.'):
+                    if now - stat.st_mtime > TEMP_MAX_AGE:
+                        remove(path, stat)
+                    continue
+                if path.resolve() in keep:
+                    pinned += 1
+                    continue
+                entries.append((stat.st_mtime, path, stat))
+
+            total = sum(stat.st_size for _, _, stat in entries)
+            total += sum(path.stat().st_size for path in keep if path.exists())
+            for mtime, path, stat in sorted(entries, key=lambda entry: entry[0]):
+                expired = self.max_age and now - mtime > self.max_age
+                over = total > self.max_bytes and now - mtime > self.grace
+                if not (expired or over):
+                    continue
+                remove(path, stat)
+                total -= stat.st_size
+
+        if total > self.max_bytes:
+            logger.warning(f'Outputs use {total / 2**20:.0f} MB, over the {self.max_bytes / 2**20:.0f} MB budget '
+                           f'({pinned} files held by unfinished jobs)')
+        if removed:
+            logger.info(f'Outputs: removed {removed} files, reclaimed {reclaimed / 2**20:.1f} MB')
+        return {'files': removed, 'bytes': reclaimed, 'pinned': pinned, 'usage': total, 'dry_run': dry_run}
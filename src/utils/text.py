@@ -0,0 +1,43 @@
+import re
+from typing import List
+
+_BOUNDARY = re.compile(r'(?<=[.!?…])\s+|\n+')
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _BOUNDARY.split(text) if s.strip()]
+
+
+def chunk_sentences(text: str, max_chars: int = 800) -> List[str]:
+    """Sentences, with any longer than max_chars cut at the last space before the limit."""
+    chunks = []
+    for sentence in split_sentences(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+class SentenceSplitter:
+    """Cuts a token stream into sentences as soon as each one is complete."""
+
+    def __init__(self):
+        self.buffer = ''
+
+    def feed(self, token: str) -> List[str]:
+        self.buffer += token
+        boundaries = list(_BOUNDARY.finditer(self.buffer))
+        if not boundaries:
+            return []
+        
+        last = boundaries[-1]
+        done, self.buffer = self.buffer[:last.start()], self.buffer[last.end():]
+        return split_sentences(done)
+
+    def flush(self) -> List[str]:
+        rest, self.buffer = self.buffer, ''
+        return split_sentences(rest)
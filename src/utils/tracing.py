@@ -0,0 +1,152 @@
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional['Trace']] = ContextVar('trace', default=None)
+_current_span: ContextVar[Optional['Span']] = ContextVar('span', default=None)
+_listeners: List[Callable[['Span'], None]] = []
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    parent: Optional[str] = None
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    end: Optional[float] = None
+    status: str = 'ok'
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error):
+        self.status = 'error'
+        self.attributes['error'] = str(error) or type(error).__name__
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent': self.parent,
+            'start': round(self.start - origin, 6),
+            'duration': round(self.duration, 6),
+            'status': self.status,
+            'attributes': self.attributes
+        }
+
+
+class Trace:
+    """Spans recorded for one video, from generation through publishing."""
+
+    def __init__(self, name: str, **attributes):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attributes = attributes
+        self.started_at = datetime.now()
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self.path: Optional[Path] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'started_at': self.started_at.isoformat(timespec='milliseconds'),
+            'attributes': self.attributes,
+            'spans': [span.to_dict(self.origin) for span in sorted(self.spans, key=lambda span: span.start)]
+        }
+
+    def write(self, directory: Path) -> Optional[Path]:
+        """Writes (or rewrites, after publishing) logs/traces/<time>_<trace_id>.json."""
+        try:
+            if self.path is None:
+                directory = Path(directory)
+                directory.mkdir(parents=True, exist_ok=True)
+                self.path = directory / f'{self.started_at:%Y%m%d_%H%M%S}_{self.trace_id}.json'
+            data = json.dumps(self.to_dict(), ensure_ascii=False, indent=2, default=str)
+            self.path.write_text(data, encoding='utf-8')
+            return self.path
+        except Exception as e:
+            logger.error(f'Trace write error: {e}')
+            return None
+
+
+def add_listener(listener: Callable[[Span], None]):
+    """Registers a callback for every finished span (used by the metrics exporter)."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[Span], None]):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def activate(trace: Optional[Trace]):
+    """Makes trace current for this context; asyncio tasks created inside inherit it."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    parent = _current_span.get()
+    current = Span(name, time.perf_counter(), parent=parent.span_id if parent else None, attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append(current)
+        for listener in _listeners:
+            try:
+                listener(current)
+            except Exception as e:
+                logger.debug(f'Span listener error: {e}')
+
+
+def tag(**attributes):
+    """Adds attributes to the innermost open span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def describe(value: Any) -> Dict[str, Any]:
+    """Size attributes for a stage result: bytes for files, chars for text."""
+    if isinstance(value, Path):
+        try:
+            return {'path': str(value), 'bytes': value.stat().st_size}
+        except OSError:
+            return {'path': str(value)}
+    if isinstance(value, str):
+        return {'chars': len(value)}
+    return {}
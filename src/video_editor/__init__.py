@@ -1,89 +1,225 @@
+import asyncio
 import logging
+import math
+import time
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Optional
-import hashlib
-from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+from ..utils.executors import cpu_share, run_blocking, run_cpu
+from ..utils.outputs import OutputStore
+
+if TYPE_CHECKING:
+    from ..voice_synthesis.audio import PcmAudio
 
 logger = logging.getLogger(__name__)
 
+# libass scales styles from a 384x288 script canvas, so sizes are relative to that
+DEFAULT_CAPTION_STYLE = (
+    'FontName=DejaVu Sans,FontSize=13,Bold=1,PrimaryColour=&H00FFFFFF,'
+    'OutlineColour=&H00000000,BorderStyle=1,Outline=1.5,Shadow=0,Alignment=2,MarginV=40'
+)
+
 class VideoEditor:
-    def __init__(self, config):
+    def __init__(self, config, store=None):
         self.config = config
-        self.output_dir = Path('output/final')
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store or OutputStore(config)
+        resolution = (config.get('video') or {}).get('resolution') or {}
+        self.width = resolution.get('width', 1080)
+        self.height = resolution.get('height', 1920)
+        self.fps = (config.get('video') or {}).get('fps', 30)
+        self.mode = config.get('compose_mode', 'auto')
+        self.burn_captions = config.get('burn_captions', True)
+        self.caption_style = config.get('caption_style', DEFAULT_CAPTION_STYLE)
+        self.timings = {}
+    
+    async def _probe(self, path: Optional[Path]) -> Optional[dict]:
+        if path is None:
+            return None
+        import ffmpeg
+        return await run_blocking(ffmpeg.probe, str(path))
+    
+    def _can_copy(self, probe: dict) -> bool:
+        video = next((s for s in probe.get('streams', []) if s.get('codec_type') == 'video'), None)
+        return (
+            video is not None
+            and video.get('codec_name') == 'h264'
+            and video.get('pix_fmt') in ('yuv420p', 'yuvj420p')
+            and (video.get('width'), video.get('height')) == (self.width, self.height)
+        )
     
     async def compose(
         self,
-        video_path: Optional[Path],
-        audio_path: Optional[Path],
+        video_path: Optional[Union[Path, dict]],
+        audio_path: Optional[Union[Path, 'PcmAudio']],
         script: str,
-        duration: int = 45
+        duration: int = 45,
+        mode: Optional[str] = None,
+        segments: Optional[List[Tuple[str, float]]] = None
     ) -> Optional[Path]:
+        """Muxes the clip with the voice-over; a frame spec from VideoGenerator is rendered into the same encode.
+
+        The voice-over is a WAV or in-memory PCM from VoiceSynthesizer, fed to
+        ffmpeg without a file and without probing its length.
+        """
+        partial = None
         try:
             import ffmpeg
             
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_path = self.output_dir / f'video_{timestamp}.mp4'
-            
-            if not video_path or not video_path.exists():
+            frames = video_path if isinstance(video_path, dict) else None
+            if frames is None and (not video_path or not video_path.exists()):
                 logger.error('Video path invalid')
                 return None
             
-            if audio_path and audio_path.exists():
-                logger.info('Merging video + audio')
-                
-                video_input = ffmpeg.input(str(video_path))
-                audio_input = ffmpeg.input(str(audio_path))
-                
+            pcm = audio_path if hasattr(audio_path, 'samples') else None
+            has_audio = pcm is not None or bool(audio_path and audio_path.exists())
+            if not has_audio and frames is None:
+                logger.info('Video only (no audio)')
+                output_path = await run_blocking(self.store.put, 'final', video_path, 'video')
+                logger.info(f'Final video: {output_path}')
+                return output_path
+            
+            # Encoded under a temp name, then named by its content
+            partial = self.store.temp('final', '.mp4', 'video')
+            start = time.perf_counter()
+            # Only files are probed: PCM knows its length and the frame spec has no stream to inspect
+            video_probe, audio_probe = await asyncio.gather(
+                self._probe(video_path if frames is None else None),
+                self._probe(audio_path if has_audio and pcm is None else None)
+            )
+            if pcm is not None:
+                length = pcm.duration
+            else:
+                length = float(audio_probe['format']['duration']) if audio_probe else float(duration)
+            
+            srt_path = None
+            if self.burn_captions and script and has_audio:
+                srt_path = await self.add_subtitles(partial, script, segments, audio_path)
+            
+            mode = mode or self.mode
+            copy = frames is None and (mode == 'copy' or (mode == 'auto' and self._can_copy(video_probe)))
+            if copy and srt_path:
+                # Burning in needs a re-encode; a soft mov_text track keeps the copy
+                logger.info('Captions as a soft subtitle track, stream copy kept')
+            if frames is not None:
+                logger.info(f'Rendering {frames["frames"]} frames into the encode')
+            else:
+                logger.info(f'Merging video + audio ({"stream copy" if copy else "re-encode"})')
+            
+            if frames is not None:
+                # Raw frames at the output size on stdin, as many as the voice-over needs
+                video = ffmpeg.input(
+                    'pipe:',
+                    format='rawvideo',
+                    pix_fmt='bgr24',
+                    s=f'{self.width}x{self.height}',
+                    framerate=self.fps
+                ).video.filter('setsar', 1)
+            else:
+                # Loop the clip if it is shorter than the voice-over and cut at the audio length, in one pass
+                video = ffmpeg.input(str(video_path), stream_loop=-1).video
+            
+            if copy:
+                codec = {'vcodec': 'copy'}
+            else:
+                # Scale, pad and caption in the same filtergraph as the one and only encode
+                if frames is None:
+                    video = (
+                        video
+                        .filter('scale', self.width, self.height, force_original_aspect_ratio='decrease')
+                        .filter('pad', self.width, self.height, '(ow-iw)/2', '(oh-ih)/2')
+                        .filter('setsar', 1)
+                    )
+                if srt_path:
+                    # Burned in only on the re-encode path; stream copy gets them as a soft track below
+                    video = video.filter('subtitles', str(srt_path), force_style=self.caption_style)
+                codec = {
+                    'vcodec': 'libx264',
+                    'video_bitrate': '5000k',
+                    'preset': 'fast',
+                    'pix_fmt': 'yuv420p'
+                }
+            
+            with ExitStack() as stack:
+                streams = [video]
+                if pcm is not None:
+                    from ..voice_synthesis.audio import ffmpeg_input
+                    filename, options = stack.enter_context(ffmpeg_input(pcm))
+                    streams.append(ffmpeg.input(filename, **options).audio)
+                elif has_audio:
+                    streams.append(ffmpeg.input(str(audio_path)).audio)
+                if has_audio:
+                    codec.update(acodec='aac', audio_bitrate='192k')
+                if copy and srt_path:
+                    streams.append(ffmpeg.input(str(srt_path)))
+                    codec.update(scodec='mov_text')
                 stream = ffmpeg.output(
-                    video_input,
-                    audio_input,
-                    str(output_path),
-                    vcodec='libx264',
-                    acodec='aac',
-                    video_bitrate='5000k',
-                    audio_bitrate='192k',
-                    preset='fast'
-                )
+                    *streams,
+                    str(partial),
+                    t=f'{length:.3f}',
+                    movflags='+faststart',
+                    **codec
+                ).global_args('-loglevel', 'error')
                 
-                ffmpeg.run(stream, overwrite_output=True, quiet=True)
-            else:
-                logger.info('Video only (no audio)')
-                import shutil
-                shutil.copy(video_path, output_path)
+                if frames is not None:
+                    from ..video_generator.frames import pipe_placeholder
+                    await run_cpu(
+                        pipe_placeholder,
+                        frames['prompt'],
+                        stream.compile(overwrite_output=True),
+                        width=self.width,
+                        height=self.height,
+                        total_frames=math.ceil(length * self.fps),
+                        batch_size=self.config.get('render_batch_size', 4),
+                        workers=self.config.get('render_workers') or cpu_share()
+                    )
+                else:
+                    await run_blocking(ffmpeg.run, stream, overwrite_output=True, quiet=True)
             
+            output_path = await run_blocking(self.store.commit, 'final', partial, 'video')
+            elapsed = time.perf_counter() - start
+            self.timings = {'mode': 'frames' if frames is not None else 'copy' if copy else 'encode', 'seconds': elapsed}
+            logger.info(f'Compose ({self.timings["mode"]}): {elapsed:.2f}s for {length:.1f}s of video')
             logger.info(f'Final video: {output_path}')
             return output_path
         except Exception as e:
             logger.error(f'Compose error: {e}')
             return None
+        finally:
+            if partial is not None:
+                partial.unlink(missing_ok=True)
+                partial.with_suffix('.srt').unlink(missing_ok=True)
     
-    async def add_subtitles(self, video_path: Path, script: str) -> Optional[Path]:
+    async def add_subtitles(
+        self,
+        video_path: Path,
+        script: str,
+        segments: Optional[List[Tuple[str, float]]] = None,
+        audio_path: Optional[Union[Path, 'PcmAudio']] = None
+    ) -> Optional[Path]:
         try:
-            srt_path = video_path.with_suffix('.srt')
+            from .captions import captions_from_samples, captions_from_segments, captions_from_wav, write_srt
             
-            words = script.split()
-            words_per_segment = 10
-            duration_per_segment = 3
+            srt_path = video_path.with_suffix('.srt')
             
-            with open(srt_path, 'w', encoding='utf-8') as f:
-                for i, chunk_start in enumerate(range(0, len(words), words_per_segment)):
-                    chunk = ' '.join(words[chunk_start:chunk_start + words_per_segment])
-                    start_time = i * duration_per_segment
-                    end_time = start_time + duration_per_segment
-                    
-                    f.write(f'{i+1}\n')
-                    f.write(f'{self._format_time(start_time)} --> {self._format_time(end_time)}\n')
-                    f.write(f'{chunk}\n\n')
+            # Per-sentence TTS durations are exact; otherwise align sentences to pauses in the WAV
+            if segments and len(segments) > 1:
+                # Chunked TTS puts tts_sentence_pause of silence between the segments
+                gap = self.config.get('tts_sentence_pause', 0.15) if self.config.get('tts_chunked', True) else 0.0
+                captions = captions_from_segments(segments, gap=gap)
+                source = 'tts'
+            elif hasattr(audio_path, 'samples'):
+                captions = await run_blocking(captions_from_samples, audio_path.samples, audio_path.sample_rate, script)
+                source = 'audio'
+            elif audio_path and audio_path.exists():
+                captions = await run_blocking(captions_from_wav, audio_path, script)
+                source = 'audio'
+            else:
+                return None
             
-            logger.info(f'Subtitles: {srt_path}')
+            await run_blocking(write_srt, captions, srt_path)
+            logger.info(f'Subtitles: {srt_path} ({len(captions)} captions, timed from {source})')
             return srt_path
         except Exception as e:
             logger.error(f'Subtitles error: {e}')
             return None
-    
-    def _format_time(self, seconds: int) -> str:
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
-        return f'{hours:02d}:{minutes:02d}:{secs:02d},000'
\ No newline at end of file
@@ -0,0 +1,153 @@
+import wave
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.text import split_sentences
+
+Caption = Tuple[float, float, str]
+
+
+def _split_long(text: str, start: float, end: float, max_words: int) -> List[Caption]:
+    """Breaks a sentence into on-screen lines of at most max_words, timed by character share."""
+    words = text.split()
+    if len(words) <= max_words:
+        return [(start, end, text)]
+
+    chunks = [' '.join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
+    total = sum(len(chunk) for chunk in chunks)
+    captions, position = [], start
+    for chunk in chunks:
+        length = (end - start) * len(chunk) / total
+        captions.append((position, position + length, chunk))
+        position += length
+    return captions
+
+
+def captions_from_segments(
+    segments: Sequence[Tuple[str, float]],
+    gap: float = 0.0,
+    max_words: int = 8
+) -> List[Caption]:
+    """Exact timings from per-sentence TTS durations (chunks joined with `gap` seconds of silence)."""
+    captions, position = [], 0.0
+    for text, duration in segments:
+        captions += _split_long(text, position, position + duration, max_words)
+        position += duration + gap
+    return captions
+
+
+def read_wav(path: Path) -> Tuple[np.ndarray, int]:
+    with wave.open(str(path), 'rb') as wav:
+        sample_rate = wav.getframerate()
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        frames = wav.readframes(wav.getnframes())
+
+    dtype = {1: np.uint8, 2: '<i2', 4: '<i4'}[width]
+    samples = np.frombuffer(frames, dtype=dtype).astype(np.float32)
+    if width == 1:
+        samples -= 128
+    samples /= float(2 ** (8 * width - 1))
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, sample_rate
+
+
+def speech_frames(samples: np.ndarray, sample_rate: int, window: float = 0.02) -> Tuple[np.ndarray, float]:
+    """Voiced/unvoiced flag per analysis window, from RMS energy against an adaptive threshold."""
+    hop = max(1, int(sample_rate * window))
+    count = len(samples) // hop
+    if count == 0:
+        return np.zeros(0, dtype=bool), window
+
+    frames = samples[:count * hop].reshape(count, hop)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    threshold = max(float(rms.max()) * 0.05, float(np.percentile(rms, 10)) * 2.0, 1e-4)
+    return rms > threshold, hop / sample_rate
+
+
+def silence_gaps(voiced: np.ndarray, window: float, min_silence: float = 0.15) -> List[Tuple[float, float]]:
+    padded = np.concatenate(([True], voiced, [True]))
+    changes = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, ends = changes[0::2], changes[1::2]
+    return [
+        (float(start * window), float(end * window))
+        for start, end in zip(starts, ends)
+        if (end - start) * window >= min_silence
+    ]
+
+
+def captions_from_wav(
+    audio_path: Path,
+    script: str,
+    max_words: int = 8,
+    snap: float = 1.0
+) -> List[Caption]:
+    samples, sample_rate = read_wav(audio_path)
+    return captions_from_samples(samples, sample_rate, script, max_words, snap)
+
+
+def captions_from_samples(
+    samples: np.ndarray,
+    sample_rate: int,
+    script: str,
+    max_words: int = 8,
+    snap: float = 1.0
+) -> List[Caption]:
+    """Aligns sentences to the voice-over without per-sentence durations.
+
+    Voiced time is shared between sentences by character count, then each
+    boundary snaps to the nearest pause in the audio.
+    """
+    sentences = split_sentences(script)
+    if not sentences:
+        return []
+
+    voiced, window = speech_frames(samples, sample_rate)
+    if not voiced.any():
+        return captions_from_segments([(script, len(samples) / sample_rate)], max_words=max_words)
+
+    voiced_index = np.flatnonzero(voiced)
+    speech_start, speech_end = float(voiced_index[0] * window), float((voiced_index[-1] + 1) * window)
+    cumulative = np.cumsum(voiced)
+    gaps = silence_gaps(voiced, window)
+
+    lengths = np.array([len(sentence) for sentence in sentences], dtype=np.float64)
+    targets = np.cumsum(lengths)[:-1] / lengths.sum() * cumulative[-1]
+
+    bounds: List[Tuple[float, float]] = []
+    for target in targets:
+        t = float(np.searchsorted(cumulative, target)) * window
+        gap = _nearest_gap(gaps, t, snap)
+        bounds.append(gap if gap else (t, t))
+
+    captions = []
+    starts = [speech_start] + [end for _, end in bounds]
+    ends = [start for start, _ in bounds] + [speech_end]
+    for sentence, start, end in zip(sentences, starts, ends):
+        captions += _split_long(sentence, start, max(end, start + 0.3), max_words)
+    return captions
+
+
+def _nearest_gap(gaps: List[Tuple[float, float]], t: float, snap: float) -> Optional[Tuple[float, float]]:
+    best = min(gaps, key=lambda gap: abs((gap[0] + gap[1]) / 2 - t), default=None)
+    if best is None or abs((best[0] + best[1]) / 2 - t) > snap:
+        return None
+    return best
+
+
+def format_time(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f'{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}'
+
+
+def write_srt(captions: List[Caption], path: Path) -> Path:
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, (start, end, text) in enumerate(captions, 1):
+            f.write(f'{i}\n{format_time(start)} --> {format_time(end)}\n{text}\n\n')
+    return path
@@ -1,82 +1,115 @@
 import logging
 from pathlib import Path
-from typing import Optional
-import hashlib
+from typing import Optional, Union
+
+from ..utils.download import download
+from ..utils.executors import cpu_share, run_blocking, run_cpu
+from ..utils.http import http_session
+from ..utils.outputs import OutputStore
 
 logger = logging.getLogger(__name__)
 
 class VideoGenerator:
-    def __init__(self, config):
+    def __init__(self, config, client=None, cache=None, store=None):
         self.config = config
+        self.client = client
+        self.cache = cache
+        self.store = store or OutputStore(config)
         self.provider = config.get('video_api_provider', 'replicate')
-        self.output_dir = Path('output/video')
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Placeholder frames are rendered by the editor straight into the final encode
+        self.render_to_mux = config.get('render_to_mux', True)
+        self.fell_back = False
     
-    async def generate(self, prompt: str, duration: int, style: str = 'energetic') -> Optional[Path]:
+    async def generate(self, prompt: str, duration: int, style: str = 'energetic') -> Optional[Union[Path, dict]]:
+        """A video file, or with render_to_mux a placeholder frame spec for VideoEditor.compose."""
         try:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = self.cache.key('video', prompt=prompt, provider=self.provider, duration=duration)
+                cached = self.cache.get_file(cache_key, '.mp4')
+                if cached:
+                    logger.info(f'Video (cached): {cached}')
+                    return await run_blocking(self.store.put, 'video', cached)
+            
+            self.fell_back = False
             if self.provider == 'replicate':
-                return await self._replicate_generate(prompt, duration)
+                output_path = await self._replicate_generate(prompt, duration)
             else:
-                return await self._placeholder_generate(prompt)
+                output_path = await self._placeholder_generate(prompt)
+            
+            # A placeholder produced as a Replicate fallback must not be cached as the Replicate result
+            if cache_key and isinstance(output_path, Path) and not self.fell_back:
+                self.cache.put_file(cache_key, output_path)
+            return output_path
         except Exception as e:
             logger.error(f'Video gen error: {e}')
             return None
     
-    async def _replicate_generate(self, prompt: str, duration: int) -> Optional[Path]:
+    async def _replicate_generate(self, prompt: str, duration: int) -> Optional[Union[Path, dict]]:
         try:
             import replicate
             
             api_token = self.config.get('replicate_api_token')
             if not api_token:
                 logger.warning('No Replicate API token, using placeholder')
+                self.fell_back = True
                 return await self._placeholder_generate(prompt)
             
-            output = replicate.run(
+            output = await run_blocking(
+                replicate.run,
                 "wan-ai/wan2.2:latest",
                 input={"prompt": prompt, "duration": duration}
             )
             
-            prompt_hash = hashlib.md5(prompt.encode()).hexdigest()[:8]
-            output_path = self.output_dir / f'video_{prompt_hash}.mp4'
+            partial = self.store.temp('video', '.mp4')
             
-            import requests
-            response = requests.get(output)
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
+            # Newer clients return FileOutput objects (or a list of them) instead of a URL
+            if isinstance(output, (list, tuple)):
+                output = output[0]
+            url = str(getattr(output, 'url', output))
+            
+            async with http_session(self.client, timeout=300.0) as client:
+                await download(
+                    client,
+                    url,
+                    partial,
+                    retries=self.config.get('download_retries', 3),
+                    timeout=300.0
+                )
+            output_path = await run_blocking(self.store.commit, 'video', partial)
             
             logger.info(f'Video generated: {output_path}')
             return output_path
         except Exception as e:
             logger.error(f'Replicate error: {e}')
+            self.fell_back = True
             return await self._placeholder_generate(prompt)
     
-    async def _placeholder_generate(self, prompt: str) -> Optional[Path]:
+    async def _placeholder_generate(self, prompt: str) -> Optional[Union[Path, dict]]:
+        if self.render_to_mux:
+            # No file: the frames are a function of the prompt, rendered at the audio's length
+            logger.info('Placeholder video: rendered at compose')
+            return {'frames': 'placeholder', 'prompt': prompt}
         try:
-            import cv2
-            import numpy as np
-            
-            prompt_hash = hashlib.md5(prompt.encode()).hexdigest()[:8]
-            output_path = self.output_dir / f'placeholder_{prompt_hash}.mp4'
+            from .frames import render_placeholder
             
-            width, height = 1080, 1920
             fps = 30
             duration = 10
             
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(str(output_path), fourcc, fps, (width, height))
-            
-            for i in range(fps * duration):
-                frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
-                color = (50 + i % 200, 100, 150)
-                cv2.rectangle(frame, (100, 100), (width-100, height-100), color, -1)
-                
-                text = f'AI Video: {prompt[:30]}...'
-                cv2.putText(frame, text, (150, height//2), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
-                
-                out.write(frame)
-            
-            out.release()
+            # Rendered under a temp name and committed by content, so no job's checkpoint is overwritten
+            partial = self.store.temp('video', '.mp4', 'placeholder')
+            await run_cpu(
+                render_placeholder,
+                prompt,
+                str(partial),
+                width=1080,
+                height=1920,
+                fps=fps,
+                total_frames=fps * duration,
+                batch_size=self.config.get('render_batch_size', 4),
+                workers=self.config.get('render_workers') or cpu_share()
+            )
+            output_path = await run_blocking(self.store.commit, 'video', partial, 'placeholder')
             logger.info(f'Placeholder video: {output_path}')
             return output_path
         except Exception as e:
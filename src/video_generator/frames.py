@@ -0,0 +1,171 @@
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+
+class PlaceholderRenderer:
+    """Draws placeholder frames in batches.
+
+    The text layer is rasterised once; per frame only the border noise and
+    the rectangle colour change, which NumPy fills for a whole batch at a time.
+    NumPy releases the GIL for these fills, so batches render in parallel threads
+    into buffers that are allocated once and reused.
+    """
+
+    def __init__(
+        self,
+        prompt: str,
+        width: int = 1080,
+        height: int = 1920,
+        batch_size: int = 4,
+        workers: Optional[int] = None,
+        margin: int = 100
+    ):
+        self.width = width
+        self.height = height
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.margin = margin
+
+        text_layer = np.zeros((height, width), dtype=np.uint8)
+        text = f'AI Video: {prompt[:30]}...'
+        cv2.putText(text_layer, text, (150, height // 2),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, 255, 3)
+        self.text_rows, self.text_cols = np.nonzero(text_layer)
+        self.text_alpha = (text_layer[self.text_rows, self.text_cols] / 255.0).astype(np.float32)[:, None]
+
+    def colors(self, start: int, count: int) -> np.ndarray:
+        index = np.arange(start, start + count)
+        colors = np.empty((count, 3), dtype=np.uint8)
+        colors[:, 0] = 50 + index % 200
+        colors[:, 1] = 100
+        colors[:, 2] = 150
+        return colors
+
+    def _noise(self, rng: np.random.Generator, shape) -> np.ndarray:
+        return np.frombuffer(rng.bytes(int(np.prod(shape))), dtype=np.uint8).reshape(shape)
+
+    def render(self, out: np.ndarray, start: int, rng: np.random.Generator) -> np.ndarray:
+        count = out.shape[0]
+        m, h, w = self.margin, self.height, self.width
+        # cv2.rectangle is inclusive of its end corner
+        bottom, right = h - m + 1, w - m + 1
+
+        out[:, :m] = self._noise(rng, (count, m, w, 3))
+        out[:, bottom:] = self._noise(rng, (count, h - bottom, w, 3))
+        out[:, m:bottom, :m] = self._noise(rng, (count, bottom - m, m, 3))
+        out[:, m:bottom, right:] = self._noise(rng, (count, bottom - m, w - right, 3))
+
+        # Fill one row per frame, then copy it down: far cheaper than broadcasting a 3-byte colour
+        for frame, color in zip(out, self.colors(start, count)):
+            frame[m, m:right] = color
+            frame[m + 1:bottom, m:right] = frame[m, m:right]
+
+        background = out[:, self.text_rows, self.text_cols].astype(np.float32)
+        background += (255.0 - background) * self.text_alpha
+        out[:, self.text_rows, self.text_cols] = background.astype(np.uint8)
+        return out
+
+    def batches(self, total_frames: int) -> Iterator[np.ndarray]:
+        """Yields consecutive frame batches in order.
+
+        Each yielded array is a view into a reused buffer and is only valid
+        until the next batch is requested.
+        """
+        shape = (self.batch_size, self.height, self.width, 3)
+        # Two buffer sets: one is being written by the caller while the other renders
+        buffers = [[np.empty(shape, dtype=np.uint8) for _ in range(self.workers)] for _ in range(2)]
+        rngs = [[np.random.default_rng() for _ in range(self.workers)] for _ in range(2)]
+        starts = list(range(0, total_frames, self.batch_size))
+        rounds = [starts[i:i + self.workers] for i in range(0, len(starts), self.workers)]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def submit(round_index):
+                buffer_set, rng_set = buffers[round_index % 2], rngs[round_index % 2]
+                return [
+                    pool.submit(
+                        self.render,
+                        buffer_set[k][:min(self.batch_size, total_frames - start)],
+                        start,
+                        rng_set[k]
+                    )
+                    for k, start in enumerate(rounds[round_index])
+                ]
+
+            pending = submit(0) if rounds else []
+            for round_index in range(len(rounds)):
+                current = pending
+                if round_index + 1 < len(rounds):
+                    pending = submit(round_index + 1)
+                for future in current:
+                    yield future.result()
+
+    def frames(self, total_frames: int) -> Iterator[np.ndarray]:
+        for batch in self.batches(total_frames):
+            yield from batch
+
+
+def render_placeholder(
+    prompt: str,
+    output_path: str,
+    width: int = 1080,
+    height: int = 1920,
+    fps: int = 30,
+    total_frames: int = 300,
+    batch_size: int = 4,
+    workers: Optional[int] = None
+) -> str:
+    """Renders and encodes a placeholder clip; top-level so it can run in the CPU process pool."""
+    renderer = PlaceholderRenderer(prompt, width, height, batch_size=batch_size, workers=workers)
+
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    try:
+        for frame in renderer.frames(total_frames):
+            out.write(frame)
+    finally:
+        out.release()
+    return output_path
+
+
+def pipe_placeholder(
+    prompt: str,
+    command: List[str],
+    width: int = 1080,
+    height: int = 1920,
+    total_frames: int = 300,
+    batch_size: int = 4,
+    workers: Optional[int] = None
+) -> None:
+    """Renders placeholder frames into an ffmpeg command that reads bgr24 rawvideo on stdin.
+
+    Nothing but ffmpeg's own output touches the disk. Top-level so it can run
+    in the CPU process pool.
+    """
+    renderer = PlaceholderRenderer(prompt, width, height, batch_size=batch_size, workers=workers)
+
+    # stderr goes to a file: a full stderr pipe would block ffmpeg while we block on its stdin
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+        try:
+            for batch in renderer.batches(total_frames):
+                # Batches are contiguous views into the renderer's buffers, written without a copy
+                process.stdin.write(memoryview(batch).cast('B'))
+        except BrokenPipeError:
+            # ffmpeg quit early; its exit code and stderr say why
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            process.wait()
+        if process.returncode != 0:
+            stderr.seek(0)
+            lines = stderr.read().decode(errors='replace').strip().splitlines()
+            raise RuntimeError(f'ffmpeg exited with {process.returncode}: {lines[-1] if lines else ""}')
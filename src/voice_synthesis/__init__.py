@@ -1,19 +1,88 @@
+import asyncio
 import logging
+import time
 from pathlib import Path
-from typing import Optional
-import hashlib
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Tuple, Union
+
+from ..utils.executors import run_blocking
+from ..utils.outputs import OutputStore
+from ..utils.text import chunk_sentences
+from .engine import get_engine, get_engine_pool, replicas
+
+if TYPE_CHECKING:
+    from .audio import PcmAudio
 
 logger = logging.getLogger(__name__)
 
 class VoiceSynthesizer:
-    def __init__(self, config):
+    def __init__(self, config, cache=None, store=None):
         self.config = config
+        self.cache = cache
+        self.store = store or OutputStore(config)
         self.provider = config.get('tts_provider', 'silero')
-        self.output_dir = Path('output/audio')
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.language = config.get('silero_language', 'ru')
+        self.model_id = config.get('silero_model', 'v3_1_ru')
+        self.speaker = config.get('silero_speaker', 'xenia')
+        self.sample_rate = config.get('silero_sample_rate', 48000)
+        # Chunked mode voices sentences in parallel on tts_workers model replicas
+        self.chunked = config.get('tts_chunked', True)
+        self.workers = replicas(config)
+        self.sentence_pause = config.get('tts_sentence_pause', 0.15)
+        self.max_chars = config.get('tts_max_chars', 800)
+        # In-memory audio goes to ffmpeg as PCM; the WAV is only written for the cache or when debugging
+        self.in_memory = config.get('audio_in_memory', False)
+        self.keep_wav = config.get('debug', False)
+        self.timings = {}
+        self.segments = []
+    
+    def _cache_key(self, text: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.key(
+            'audio',
+            text=text,
+            model=self.model_id,
+            speaker=self.speaker,
+            sample_rate=self.sample_rate,
+            **({'pause': self.sentence_pause} if self.chunked else {})
+        )
+    
+    def _from_cache(self, text: str) -> Optional[Path]:
+        cache_key = self._cache_key(text)
+        cached = self.cache.get_file(cache_key, '.wav') if cache_key else None
+        if cached:
+            self.segments = [tuple(segment) for segment in self.cache.get_json(cache_key, count=False) or []]
+            self.timings = {'load': 0.0, 'synthesis': 0.0}
+            logger.info(f'Audio (cached): {cached}')
+            # Hardlinked into the outputs, so cache eviction cannot pull it from under a job
+            cached = self.store.put('audio', cached)
+        return cached
     
-    async def synthesize(self, text: str) -> Optional[Path]:
+    def _to_cache(self, text: str, path: Path):
+        cache_key = self._cache_key(text)
+        if cache_key:
+            self.cache.put_file(cache_key, path)
+            self.cache.put_json(cache_key, self.segments)
+    
+    def _output(self, text: str, samples) -> Union[Path, 'PcmAudio']:
+        from .audio import PcmAudio, write_wav
+        
+        if self.in_memory:
+            audio = PcmAudio(samples, self.sample_rate, self.store)
+            if self.keep_wav or (self.cache is not None and self.cache.enabled):
+                self._to_cache(text, audio.to_file())
+            return audio
+        output_path = self.store.write('audio', '.wav', lambda tmp: write_wav(tmp, samples, self.sample_rate))
+        self._to_cache(text, output_path)
+        return output_path
+    
+    async def synthesize(self, text: str) -> Optional[Union[Path, 'PcmAudio']]:
+        """The voice-over WAV, or a PcmAudio with audio_in_memory (cache hits are always files)."""
         try:
+            cached = self._from_cache(text)
+            if cached:
+                return cached
+            
             if self.provider == 'silero':
                 return await self._silero_tts(text)
             else:
@@ -23,33 +92,131 @@ class VoiceSynthesizer:
             logger.error(f'TTS error: {e}')
             return None
     
-    async def _silero_tts(self, text: str) -> Optional[Path]:
+    async def synthesize_stream(self, sentences: AsyncIterator[str]) -> Optional[Tuple[str, Union[Path, 'PcmAudio']]]:
+        """Voices each sentence as soon as it arrives; returns the full script and the joined track."""
         try:
-            import torch
-            
-            device = torch.device('cpu')
-            model, _ = torch.hub.load(
-                repo_or_dir='snakers4/silero-models',
-                model='silero_tts',
-                language='ru',
-                speaker='v3_1_ru'
-            )
-            model.to(device)
+            from .audio import join, to_numpy
             
-            audio = model.apply_tts(
-                text=text,
-                speaker='xenia',
-                sample_rate=48000
-            )
+            engine = get_engine_pool(self.language, self.model_id, self.workers if self.chunked else 1)
+            pause = self.sentence_pause if self.chunked else 0.0
+            start = time.perf_counter()
+            first_audio = None
+            load_time = await run_blocking(engine.load)
+            
+            # No more calls in flight than replicas, so waiting ones do not hold I/O threads
+            slots = asyncio.Semaphore(engine.size)
+            
+            def voice_blocking(sentence):
+                nonlocal first_audio
+                audio = to_numpy(engine.synthesize(sentence, self.speaker, self.sample_rate))
+                if first_audio is None:
+                    first_audio = time.perf_counter() - start
+                return audio
+            
+            async def voice(sentence):
+                async with slots:
+                    return await run_blocking(voice_blocking, sentence)
+            
+            texts, tasks = [], []
+            try:
+                async for sentence in sentences:
+                    texts.append(sentence)
+                    tasks.append(asyncio.create_task(voice(sentence)))
+                chunks = await asyncio.gather(*tasks)
+            except BaseException:
+                # The script stream or a sentence failed: the rest would only be thrown away
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            
+            if not texts:
+                logger.error('Empty script stream')
+                return None
+            
+            script = ' '.join(texts)
+            self.segments = [(text, len(chunk) / self.sample_rate) for text, chunk in zip(texts, chunks)]
+            self.timings = {
+                'load': load_time,
+                'first_audio': first_audio,
+                'total': time.perf_counter() - start
+            }
+            
+            output = self._output(script, join(chunks, int(pause * self.sample_rate)))
+            
+            logger.info(f'Audio (streamed): {output}, {len(chunks)} sentences, '
+                        f'first audio after {first_audio:.2f}s')
+            return script, output
+        except Exception as e:
+            logger.error(f'Streaming TTS error: {e}')
+            return None
+    
+    async def _silero_tts(self, text: str) -> Optional[Union[Path, 'PcmAudio']]:
+        if self.chunked:
+            return await self._silero_chunked(text)
+        try:
+            from .audio import to_numpy
             
-            text_hash = hashlib.md5(text.encode()).hexdigest()[:8]
-            output_path = self.output_dir / f'audio_{text_hash}.wav'
+            engine = get_engine(self.language, self.model_id)
+            load_time = await run_blocking(engine.load)
             
-            import torchaudio
-            torchaudio.save(str(output_path), audio.unsqueeze(0), 48000)
+            start = time.perf_counter()
+            # torch releases the GIL during inference, so a thread keeps the loop free and the model resident
+            audio = to_numpy(await run_blocking(engine.synthesize, text, self.speaker, self.sample_rate))
+            synthesis_time = time.perf_counter() - start
+            self.timings = {'load': load_time, 'synthesis': synthesis_time}
+            self.segments = [(text, len(audio) / self.sample_rate)]
             
-            logger.info(f'Audio: {output_path}')
-            return output_path
+            output = self._output(text, audio)
+            
+            logger.info(f'Audio: {output} (load {load_time:.2f}s, synthesis {synthesis_time:.2f}s)')
+            return output
         except Exception as e:
             logger.error(f'Silero error: {e}')
-            return None
\ No newline at end of file
+            return None
+    
+    async def _silero_chunked(self, text: str) -> Optional[Union[Path, 'PcmAudio']]:
+        """Sentence chunks voiced in parallel, joined with tts_sentence_pause of silence."""
+        try:
+            from .audio import join, to_numpy
+            
+            sentences = chunk_sentences(text, self.max_chars)
+            if not sentences:
+                logger.error('Empty script')
+                return None
+            
+            pool = get_engine_pool(self.language, self.model_id, self.workers)
+            load_time = await run_blocking(pool.load)
+            
+            # No more calls in flight than replicas, so waiting ones do not hold I/O threads
+            slots = asyncio.Semaphore(pool.size)
+            
+            async def voice(sentence):
+                async with slots:
+                    chunk_start = time.perf_counter()
+                    audio = await run_blocking(pool.synthesize, sentence, self.speaker, self.sample_rate)
+                    return to_numpy(audio), time.perf_counter() - chunk_start
+            
+            start = time.perf_counter()
+            results = await asyncio.gather(*(voice(sentence) for sentence in sentences))
+            synthesis_time = time.perf_counter() - start
+            chunks = [audio for audio, _ in results]
+            
+            # Speech-only durations; captions add the pause between them
+            self.segments = [(sentence, len(chunk) / self.sample_rate) for sentence, chunk in zip(sentences, chunks)]
+            self.timings = {
+                'load': load_time,
+                'synthesis': synthesis_time,
+                'chunks': [seconds for _, seconds in results]
+            }
+            
+            output = self._output(text, join(chunks, int(self.sentence_pause * self.sample_rate)))
+            
+            logger.info(
+                f'Audio: {output} ({len(chunks)} chunks on {pool.size} workers, '
+                f'load {load_time:.2f}s, synthesis {synthesis_time:.2f}s)'
+            )
+            return output
+        except Exception as e:
+            logger.error(f'Silero error: {e}')
+            return None
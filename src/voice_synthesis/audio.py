@@ -0,0 +1,80 @@
+import os
+import wave
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def to_numpy(audio) -> np.ndarray:
+    """Flattens a torch tensor or array of float samples into float32."""
+    return np.asarray(audio, dtype=np.float32).reshape(-1)
+
+
+def join(chunks: Sequence[np.ndarray], gap: int = 0) -> np.ndarray:
+    """Chunks back to back with `gap` samples of silence between them, in one preallocated buffer."""
+    total = sum(len(chunk) for chunk in chunks) + gap * max(len(chunks) - 1, 0)
+    out = np.zeros(total, dtype=np.float32)
+    position = 0
+    for chunk in chunks:
+        out[position:position + len(chunk)] = chunk
+        position += len(chunk) + gap
+    return out
+
+
+def write_wav(path: Path, samples: np.ndarray, sample_rate: int):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+
+
+@dataclass(repr=False)
+class PcmAudio:
+    """A voice-over kept in memory: mono float32 samples, and the OutputStore its WAV would go to."""
+    samples: np.ndarray
+    sample_rate: int
+    store: Any
+    path: Optional[Path] = None
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def written(self) -> bool:
+        return self.path is not None
+
+    def to_file(self) -> Path:
+        """Writes the WAV once, for consumers that need a file (cache, checkpoints, other processes)."""
+        if self.path is None:
+            self.path = self.store.write('audio', '.wav', lambda tmp: write_wav(tmp, self.samples, self.sample_rate))
+        return self.path
+
+    def __repr__(self) -> str:
+        return str(self.path) if self.written else f'<pcm {self.duration:.1f}s @ {self.sample_rate} Hz>'
+
+
+@contextmanager
+def ffmpeg_input(audio: PcmAudio) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(filename, input options) for ffmpeg: the raw samples in a memfd on Linux, else the WAV.
+
+    ffmpeg reopens the memfd through /proc with its own offset, so it works
+    for any ffmpeg process we start, also from the CPU pool, and leaves
+    stdin free for piped frames.
+    """
+    if audio.written or not hasattr(os, 'memfd_create'):
+        yield str(audio.to_file()), {}
+        return
+    fd = os.memfd_create('voice-over')
+    try:
+        view = memoryview(np.ascontiguousarray(audio.samples, dtype=np.float32)).cast('B')
+        while view:
+            view = view[os.write(fd, view):]
+        yield f'/proc/{os.getpid()}/fd/{fd}', {'format': 'f32le', 'ar': audio.sample_rate, 'ac': 1}
+    finally:
+        os.close(fd)
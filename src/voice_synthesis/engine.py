@@ -0,0 +1,162 @@
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Torch intra-op threads for this process, from configure_engines(); None = torch's default (all cores)
+_torch_threads: Optional[int] = None
+_threads_applied = False
+
+
+def replicas(config) -> int:
+    """Model copies for parallel sentences: opt-in via tts_workers, since each one is a full model in memory."""
+    return max(1, config.get('tts_workers') or 1)
+
+
+def configure_engines(config):
+    """Process-wide TTS setup, once at startup: replicas voice side by side, so each gets its share of the cores."""
+    global _torch_threads
+    count = replicas(config)
+    _torch_threads = max(1, (os.cpu_count() or 1) // count) if count > 1 else None
+
+
+def _apply_threads(torch):
+    global _threads_applied
+    if _threads_applied or _torch_threads is None:
+        return
+    _threads_applied = True
+    torch.set_num_threads(_torch_threads)
+    logger.info(f'Torch: {_torch_threads} threads per inference')
+
+
+def hub_loader(language: str, model_id: str):
+    import torch
+
+    _apply_threads(torch)
+    model, _ = torch.hub.load(
+        repo_or_dir='snakers4/silero-models',
+        model='silero_tts',
+        language=language,
+        speaker=model_id
+    )
+    model.to(torch.device('cpu'))
+    return model
+
+
+class SileroEngine:
+    """Silero TTS model that stays loaded for the lifetime of the process."""
+
+    def __init__(self, language: str, model_id: str, loader: Optional[Callable] = None):
+        self.language = language
+        self.model_id = model_id
+        self.loader = loader or hub_loader
+        self.model = None
+        self.load_time: Optional[float] = None
+        self._load_lock = threading.Lock()
+        self._infer_lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> float:
+        """Load the model if needed; returns the seconds spent loading in this call."""
+        if self.model is not None:
+            return 0.0
+        with self._load_lock:
+            if self.model is not None:
+                return 0.0
+            start = time.perf_counter()
+            self.model = self.loader(self.language, self.model_id)
+            self.load_time = time.perf_counter() - start
+            logger.info(f'Silero {self.model_id} loaded in {self.load_time:.2f}s')
+            return self.load_time
+
+    def synthesize(self, text: str, speaker: str, sample_rate: int):
+        self.load()
+        with self._infer_lock:
+            return self.model.apply_tts(text=text, speaker=speaker, sample_rate=sample_rate)
+
+
+class EnginePool:
+    """Replicas of one model, so sentences are voiced in parallel.
+
+    Each replica runs one inference at a time; ``synthesize`` blocks until a
+    replica is free. The first replica is the process-wide engine, so its
+    loader (and a stand-in registered by tests or benchmarks) is shared.
+    """
+
+    def __init__(self, engines: List[SileroEngine]):
+        self.engines = engines
+        self._free: 'queue.Queue[SileroEngine]' = queue.Queue()
+        for engine in engines:
+            self._free.put(engine)
+
+    @property
+    def size(self) -> int:
+        return len(self.engines)
+
+    @property
+    def load_time(self) -> Optional[float]:
+        times = [engine.load_time for engine in self.engines if engine.load_time is not None]
+        return sum(times) if times else None
+
+    def load(self) -> float:
+        """Loads every replica; returns the seconds spent loading in this call."""
+        return sum(engine.load() for engine in self.engines)
+
+    @contextmanager
+    def acquire(self):
+        engine = self._free.get()
+        try:
+            yield engine
+        finally:
+            self._free.put(engine)
+
+    def synthesize(self, text: str, speaker: str, sample_rate: int):
+        with self.acquire() as engine:
+            return engine.synthesize(text, speaker, sample_rate)
+
+
+_engines: Dict[Tuple[str, str], SileroEngine] = {}
+_pools: Dict[Tuple[str, str, int], EnginePool] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(language: str, model_id: str, loader: Optional[Callable] = None) -> SileroEngine:
+    key = (language, model_id)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = SileroEngine(language, model_id, loader)
+            _engines[key] = engine
+        return engine
+
+
+def get_engine_pool(language: str, model_id: str, size: int, loader: Optional[Callable] = None) -> EnginePool:
+    base = get_engine(language, model_id, loader)
+    key = (language, model_id, size)
+    with _engines_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            replicas = [SileroEngine(language, model_id, base.loader) for _ in range(size - 1)]
+            pool = EnginePool([base, *replicas])
+            _pools[key] = pool
+        return pool
+
+
+def registered(language: str, model_id: str) -> bool:
+    """Whether an engine for this model already exists in the process (e.g. a stand-in)."""
+    with _engines_lock:
+        return (language, model_id) in _engines
+
+
+def release_engines():
+    with _engines_lock:
+        _engines.clear()
+        _pools.clear()
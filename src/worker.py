@@ -0,0 +1,332 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .jobs import Job
+from .stage_graph import Stage, StageFailed
+from .task_queue import Task, TaskQueue
+from .utils import deps, llm, tracing
+from .utils.executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('llm', 'tts', 'render', 'encode', 'publish')
+
+
+class MissingInputs(Exception):
+    """An upstream artifact went missing after the task was queued."""
+
+
+def job_stages(pipeline, job: Job) -> List[Stage]:
+    """The job's stage graph as queue tasks: the pipeline stages plus publishing when the job asked for it."""
+    stages, _ = pipeline.build_stages(job.duration)
+    if job.publish:
+        stages.append(Stage('publish', None, inputs=('final',), kind='publish'))
+    return stages
+
+
+def advance(pipeline, queue: TaskQueue, job_id: str) -> Optional[str]:
+    """Enqueues every stage whose inputs are checkpointed; returns the job status once it is settled.
+
+    Safe to call from several workers at once: a (job, stage) pair is enqueued
+    at most once.
+    """
+    jobs = pipeline.jobs
+    job = jobs.get(job_id)
+    if job is None:
+        return None
+    done = job.checkpoints
+    tasks = {task.stage: task for task in queue.tasks(job.id)}
+
+    failed = [task for task in tasks.values() if task.status == 'failed']
+    if failed:
+        if job.status != 'failed':
+            jobs.finish(job.id, 'failed', '; '.join(f'{task.stage}: {task.error}' for task in failed))
+        return 'failed'
+
+    settled = True
+    for stage in job_stages(pipeline, job):
+        task = tasks.get(stage.name)
+        produced = all(name in done for name in stage.outputs)
+        if produced and (task is None or task.status == 'done'):
+            continue
+        settled = False
+        if task is not None and task.status == 'done':
+            # Finished earlier but its artifact was invalidated since
+            queue.requeue(job.id, stage.name)
+        elif task is None and all(name == 'topic' or name in done for name in stage.inputs):
+            queue.enqueue(job.id, stage.name, stage.kind)
+
+    if settled:
+        if job.status != 'done':
+            jobs.finish(job.id, 'done')
+        return 'done'
+    return None
+
+
+class Worker:
+    """Claims and runs stage tasks of the given kinds, one at a time, in its own process."""
+
+    def __init__(self, config: Dict[str, Any], kinds: Sequence[str], name: Optional[str] = None):
+        self.config = config
+        self.kinds = list(kinds)
+        self.name = name or f'{"+".join(self.kinds)}-{os.getpid()}'
+        self.queue = TaskQueue(config)
+        self.poll_interval = config.get('worker_poll', 0.5)
+        self.retry_delay = config.get('task_retry_delay', 5.0)
+        self.processed = 0
+        self._checked_kinds = set()
+        self._stop = asyncio.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    async def run(self, idle_exit: Optional[float] = None):
+        """Processes tasks until stopped; with idle_exit, also returns once idle that long with the queue drained."""
+        from .pipeline import ContentPipeline
+
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+        logger.info(f'Worker {self.name} ({", ".join(self.kinds)}) started')
+        async with ContentPipeline(self.config) as pipeline:
+            idle_since = time.monotonic()
+            while not self._stop.is_set():
+                task = await run_blocking(self.queue.claim, self.kinds, self.name)
+                if task is None:
+                    if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                        if not await run_blocking(self.queue.pending):
+                            break
+                        idle_since = time.monotonic()
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                await self._process(pipeline, task)
+                idle_since = time.monotonic()
+        logger.info(f'Worker {self.name} stopped after {self.processed} tasks')
+
+    async def _heartbeat(self, task: Task, work: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.queue.lease / 3)
+            if not await run_blocking(self.queue.heartbeat, task.id, self.name):
+                # The lease ran out and the task went back to the queue, possibly to another worker
+                logger.warning(f'{self.name}: lost the lease on {task.stage} for job {task.job_id}, abandoning it')
+                work.cancel()
+                return
+
+    async def _process(self, pipeline, task: Task):
+        logger.info(f'{self.name}: {task.stage} for job {task.job_id} (attempt {task.attempts})')
+        work = asyncio.create_task(self._execute(pipeline, task))
+        heartbeat = asyncio.create_task(self._heartbeat(task, work))
+        try:
+            await work
+            await run_blocking(self.queue.complete, task.id)
+            self.processed += 1
+        except asyncio.CancelledError:
+            if not heartbeat.done() or heartbeat.cancelled():
+                raise
+            # Abandoned: the task is no longer ours to checkpoint, complete or fail
+            return
+        except MissingInputs as e:
+            # Not the stage's fault: drop the task, advance() queues the
+            # upstream stage again and this one once its inputs are back
+            logger.warning(f'{self.name}: {task.stage} waiting for {e}')
+            await run_blocking(self.queue.drop, task.id)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            retry = await run_blocking(self.queue.fail, task, error, self.retry_delay * task.attempts)
+            logger.error(f'{self.name}: {task.stage} failed ({error}){", will retry" if retry else ""}')
+        finally:
+            heartbeat.cancel()
+        await run_blocking(advance, pipeline, self.queue, task.job_id)
+        await pipeline.collect_outputs()
+
+    async def _execute(self, pipeline, task: Task):
+        if task.kind not in self._checked_kinds:
+            absent = deps.missing([task.kind], self.config)
+            if absent:
+                raise RuntimeError(f'missing dependencies: {", ".join(absent)} ({deps.describe(absent)})')
+            self._checked_kinds.add(task.kind)
+
+        jobs = pipeline.jobs
+        job = await run_blocking(jobs.get, task.job_id)
+        checkpoints = await run_blocking(jobs.restore, task.job_id, pipeline.downstream)
+        if task.kind == 'llm':
+            # The scheduler plans how long Ollama keeps the model loaded; calls from here send what is left
+            llm.LLMClient(self.config).keep_loaded(await run_blocking(jobs.state, 'llm_keep_until'))
+
+        with tracing.span(task.stage, kind=task.kind, job=task.job_id):
+            if task.stage == 'publish':
+                if 'final' not in checkpoints:
+                    raise MissingInputs('final')
+                from .publisher import publish_error
+                results = await pipeline.publish(checkpoints['final'].value, update_job=False)
+                error = publish_error(results)
+                if error:
+                    raise RuntimeError(error)
+                return
+
+            stages, voice_synth = pipeline.build_stages(job.duration)
+            stage = next(stage for stage in stages if stage.name == task.stage)
+            missing = [name for name in stage.inputs if name != 'topic' and name not in checkpoints]
+            if missing:
+                raise MissingInputs(', '.join(missing))
+            if 'audio' in checkpoints:
+                voice_synth.segments = [tuple(segment) for segment in checkpoints['audio'].meta.get('segments', [])]
+
+            inputs = {name: job.topic if name == 'topic' else checkpoints[name].value for name in stage.inputs}
+            with llm.deadline(self.config.get('video_budget')):
+                value = await stage.run(**inputs)
+
+        values = value if stage.provides else (value,)
+        if value is None or any(v is None for v in values):
+            if not stage.optional:
+                raise StageFailed(stage.name)
+            values = (None,) * len(stage.outputs)
+        for name, output in zip(stage.outputs, values):
+            if hasattr(output, 'to_file'):
+                # Stages hand over through files between processes, so in-memory audio is written out
+                output = await run_blocking(output.to_file)
+            meta = {'segments': voice_synth.segments} if name == 'audio' else None
+            await run_blocking(jobs.checkpoint, job.id, name, output, meta)
+
+
+def _load(target: Optional[str]) -> Optional[Callable]:
+    """Resolves 'package.module:function' so it can be passed to spawned processes."""
+    if not target:
+        return None
+    module, _, name = target.partition(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def run_worker(config: Dict[str, Any], kinds: Sequence[str], name: str,
+               idle_exit: Optional[float] = None, initializer: Optional[str] = None):
+    """Process entry point for one worker."""
+    logging.basicConfig(
+        level=logging.DEBUG if config.get('debug') else logging.INFO,
+        format=f'%(asctime)s [{name}] %(name)s: %(message)s'
+    )
+    init = _load(initializer)
+    if init:
+        init()
+    asyncio.run(Worker(config, kinds, name).run(idle_exit=idle_exit))
+
+
+class WorkerPool:
+    """Starts and supervises worker processes, ``counts`` per stage kind (e.g. {'tts': 2, 'render': 1}).
+
+    ``initializer`` is a 'module:function' run first in every worker.
+    """
+
+    def __init__(self, config: Dict[str, Any], counts: Dict[str, int],
+                 idle_exit: Optional[float] = None, initializer: Optional[str] = None):
+        self.config = config
+        self.counts = {kind: count for kind, count in counts.items() if count > 0}
+        self.idle_exit = idle_exit
+        self.initializer = initializer
+        self.processes: Dict[str, multiprocessing.Process] = {}
+        self._context = multiprocessing.get_context('spawn')
+        self._stopping = False
+
+    def _spawn(self, name: str, kind: str):
+        process = self._context.Process(
+            target=run_worker,
+            args=(self.config, [kind], name, self.idle_exit, self.initializer),
+            name=name,
+            daemon=False
+        )
+        process.start()
+        self.processes[name] = process
+
+    def start(self):
+        for kind, count in self.counts.items():
+            for i in range(count):
+                self._spawn(f'{kind}-{i + 1}', kind)
+        logger.info(f'Workers: {", ".join(f"{kind}×{count}" for kind, count in self.counts.items())}')
+
+    def check(self) -> int:
+        """Restarts workers that died (e.g. a torch crash); returns how many were restarted."""
+        if self._stopping or self.idle_exit is not None:
+            return 0
+        restarted = 0
+        for name, process in list(self.processes.items()):
+            if not process.is_alive():
+                logger.warning(f'Worker {name} exited with {process.exitcode}, restarting')
+                self._spawn(name, name.rsplit('-', 1)[0])
+                restarted += 1
+        return restarted
+
+    def stop(self, timeout: float = 30.0):
+        self._stopping = True
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        self.join(timeout)
+
+    def join(self, timeout: Optional[float] = None):
+        for process in self.processes.values():
+            process.join(timeout)
+
+
+class Coordinator:
+    """Submits video jobs to the task queue and waits for workers to finish them."""
+
+    def __init__(self, pipeline, pool: Optional[WorkerPool] = None):
+        self.pipeline = pipeline
+        self.queue = TaskQueue(pipeline.config)
+        self.pool = pool
+        self.poll_interval = pipeline.config.get('worker_poll', 0.5)
+
+    async def submit(self, topic: str, duration: int = 45, publish: Optional[bool] = None) -> str:
+        if publish is None:
+            publish = self.pipeline.config.get('auto_publish', False)
+        jobs = self.pipeline.jobs
+        job = await run_blocking(jobs.create, topic, duration, publish)
+        await run_blocking(jobs.start, job.id)
+        await run_blocking(advance, self.pipeline, self.queue, job.id)
+        logger.info(f'Queued job {job.id}: {topic}')
+        return job.id
+
+    async def resume(self, job_id: str) -> Optional[str]:
+        """Re-queues a job from its checkpoints (failed tasks are dropped)."""
+        jobs = self.pipeline.jobs
+        job = await run_blocking(jobs.get, job_id)
+        if job is None:
+            return None
+        await run_blocking(self.queue.clear, job.id)
+        await run_blocking(jobs.start, job.id)
+        await run_blocking(advance, self.pipeline, self.queue, job.id)
+        return job.id
+
+    async def wait(self, job_ids: Sequence[str], timeout: Optional[float] = None,
+                   on_done: Optional[Callable[[Job], None]] = None) -> Dict[str, Job]:
+        pending = set(job_ids)
+        finished: Dict[str, Job] = {}
+        deadline = time.monotonic() + timeout if timeout else None
+        while pending:
+            if self.pool is not None:
+                self.pool.check()
+            for job_id in list(pending):
+                job = await run_blocking(self.pipeline.jobs.get, job_id)
+                if job is None or job.status in ('done', 'failed'):
+                    pending.discard(job_id)
+                    if job is not None:
+                        finished[job_id] = job
+                        if on_done:
+                            on_done(job)
+            if pending:
+                if deadline and time.monotonic() > deadline:
+                    break
+                await asyncio.sleep(self.poll_interval)
+        return finished